@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""
+Benchmark of the fixer dispatch in ``libfuturize.tool.FuturizeRefactoringTool``
+(which uses ``libfuturize.dispatch.FixerIndex``) against ``lib2to3``'s
+per-node-type dispatch in ``StdoutRefactoringTool``.
+
+Both tools refactor the same synthetic corpus in memory with the fixer sets
+used by ``futurize --both-stages --all-imports`` and by ``pasteurize
+--all-imports``. The outputs are checked to be identical.
+
+Usage:
+
+    $ python benchmarks/bench_dispatch.py [--modules N] [--repeat N]
+"""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import optparse
+import os
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import module_source
+
+warnings.simplefilter('ignore', DeprecationWarning)
+from lib2to3.main import StdoutRefactoringTool
+
+from libfuturize.fixes import (lib2to3_fix_names_stage1,
+                               lib2to3_fix_names_stage2,
+                               libfuturize_fix_names_stage1,
+                               libfuturize_fix_names_stage2)
+from libfuturize.tool import FuturizeRefactoringTool
+from libpasteurize.fixes import fix_names as pasteurize_fix_names
+from future.utils import text_type
+
+
+ALL_IMPORTS = set(['libpasteurize.fixes.fix_add_all__future__imports',
+                   'libpasteurize.fixes.fix_add_future_standard_library_import',
+                   'libpasteurize.fixes.fix_add_all_future_builtins'])
+
+CONFIGURATIONS = [
+    # (label, fixer names, options, Python 2 sources?)
+    ('futurize --both-stages --all-imports',
+     (lib2to3_fix_names_stage1 | lib2to3_fix_names_stage2 |
+      libfuturize_fix_names_stage1 | libfuturize_fix_names_stage2 |
+      ALL_IMPORTS),
+     {}, True),
+    ('pasteurize --all-imports',
+     pasteurize_fix_names | ALL_IMPORTS,
+     {'print_function': True}, False),
+]
+
+
+def time_tool(tool_class, fixers, options, sources, repeat):
+    rt = tool_class(sorted(fixers), options, [], True, False)
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        output = [text_type(rt.refactor_string(source, '<benchmark>'))
+                  for source in sources]
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, output
+
+
+def main():
+    parser = optparse.OptionParser(usage='%prog [options]')
+    parser.add_option('--modules', type='int', default=40,
+                      help='number of generated modules (default: 40)')
+    parser.add_option('--repeat', type='int', default=3,
+                      help='report the best of this many runs (default: 3)')
+    options, args = parser.parse_args()
+
+    print('{0:<40} {1:>10} {2:>10} {3:>8}'.format(
+        'configuration', 'lib2to3', 'indexed', 'speedup'))
+    for label, fixers, flags, py2 in CONFIGURATIONS:
+        sources = [module_source(i, py2=py2, repeat=3) + '\n'
+                   for i in range(options.modules)]
+        baseline, expected = time_tool(StdoutRefactoringTool, fixers, flags,
+                                       sources, options.repeat)
+        indexed, output = time_tool(FuturizeRefactoringTool, fixers, flags,
+                                    sources, options.repeat)
+        assert output == expected, 'refactored output differs'
+        print('{0:<40} {1:>9.3f}s {2:>9.3f}s {3:>7.2f}x'.format(
+            label, baseline, indexed, baseline / indexed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+"""
+Microbenchmark of attribute lookups and method calls on ``newbytes`` and
+``newstr``, which hide their ``encode`` and ``decode`` methods with
+``future.types.disabled_method`` descriptors, against subclasses that hide
+them with the ``__getattribute__`` override used previously, which ran on
+every attribute lookup.
+
+The results of the statements are checked to be the same for both.
+
+Usage:
+
+    $ python benchmarks/bench_getattribute.py [--number N] [--repeat N]
+"""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import optparse
+import timeit
+
+
+SETUP = '''
+from future.types.newbytes import newbytes
+from future.types.newstr import newstr
+
+class previous_newbytes(newbytes):
+    def __getattribute__(self, name):
+        if name in ['encode', u'encode']:
+            raise AttributeError("encode method has been disabled in newbytes")
+        return super(newbytes, self).__getattribute__(name)
+
+class previous_newstr(newstr):
+    def __getattribute__(self, name):
+        if name in ['decode', u'decode']:
+            raise AttributeError("decode method has been disabled in newstr")
+        return super(newstr, self).__getattribute__(name)
+
+x = {0}
+'''
+
+CASES = [
+    # (label, the object for the current and the previous types, statement)
+    ('newbytes attribute', ('newbytes(b"abcdef")',
+                            'previous_newbytes(b"abcdef")'), 'x.isalpha'),
+    ('newbytes.isalpha()', ('newbytes(b"abcdef")',
+                            'previous_newbytes(b"abcdef")'), 'x.isalpha()'),
+    ('newbytes.decode()', ('newbytes(b"abcdef")',
+                           'previous_newbytes(b"abcdef")'), 'x.decode()'),
+    ('hasattr encode', ('newbytes(b"abcdef")',
+                        'previous_newbytes(b"abcdef")'),
+     'hasattr(x, "encode")'),
+    ('newstr attribute', ('newstr(u"abcdef")', 'previous_newstr(u"abcdef")'),
+     'x.isalpha'),
+    ('newstr.isalpha()', ('newstr(u"abcdef")', 'previous_newstr(u"abcdef")'),
+     'x.isalpha()'),
+    ('newstr.upper()', ('newstr(u"abcdef")', 'previous_newstr(u"abcdef")'),
+     'x.upper()'),
+    ('hasattr decode', ('newstr(u"abcdef")', 'previous_newstr(u"abcdef")'),
+     'hasattr(x, "decode")'),
+]
+
+
+def main():
+    parser = optparse.OptionParser(usage='%prog [options]')
+    parser.add_option('--number', type='int', default=100000,
+                      help='statements per timing run (default: 100000)')
+    parser.add_option('--repeat', type='int', default=5,
+                      help='report the best of this many runs (default: 5)')
+    options, args = parser.parse_args()
+
+    print('{0:<22} {1:>12} {2:>12} {3:>8}'.format(
+        'statement', 'override', 'descriptor', 'speedup'))
+    for label, (current, previous), stmt in CASES:
+        best = {}
+        results = set()
+        # Alternate between the types, so that they run under the same
+        # conditions
+        for _ in range(options.repeat):
+            for key, obj in (('previous', previous), ('current', current)):
+                setup = SETUP.format(obj)
+                namespace = {}
+                exec(setup, namespace)
+                result = eval(stmt, namespace)
+                if callable(result):
+                    result = result.__name__
+                results.add(repr(result).replace('previous_', ''))
+                seconds = (timeit.Timer(stmt, setup).timeit(options.number) /
+                           options.number)
+                best[key] = min(best.get(key, seconds), seconds)
+        assert len(results) == 1, 'results differ: {0}'.format(results)
+        print('{0:<22} {1:>10.0f}ns {2:>10.0f}ns {3:>7.2f}x'.format(
+            label, best['previous'] * 1e9, best['current'] * 1e9,
+            best['previous'] / best['current']))
+
+
+if __name__ == '__main__':
+    main()
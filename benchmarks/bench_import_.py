@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+"""
+Microbenchmark of the per-call cost of ``future.standard_library.import_()``
+and ``from_import()`` for modules that are already imported, with the
+resolution cache and with the cache cleared before each call (as the
+functions behaved before the cache was added).
+
+The results of the calls are checked to be the same in both
+configurations.
+
+On Python 3, both functions only call ``__import__()``, so this is only
+meaningful on Python 2.
+
+Usage:
+
+    $ python benchmarks/bench_import_.py [--calls N] [--repeat N]
+"""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import gc
+import optparse
+import sys
+import time
+
+from future import standard_library
+from future.standard_library import import_, from_import
+
+
+CALLS = [
+    ('import_', lambda: import_('http.client')),
+    ('import_ backport', lambda: import_('http.client', backport=True)),
+    ('from_import', lambda: from_import('urllib.parse', 'quote', 'urlsplit')),
+]
+
+
+def bench(call, calls, cached):
+    """
+    Returns the time per call and the result of the last call.
+    """
+    cache = standard_library._import_cache
+    result = call()
+    gc.collect()
+    start = time.time()
+    if cached:
+        for _ in range(calls):
+            result = call()
+    else:
+        for _ in range(calls):
+            cache.clear()
+            result = call()
+    return (time.time() - start) / calls, result
+
+
+def main():
+    parser = optparse.OptionParser(usage='%prog [options]')
+    parser.add_option('--calls', type='int', default=20000,
+                      help='number of calls to time (default: 20000)')
+    parser.add_option('--repeat', type='int', default=3,
+                      help='report the best of this many runs (default: 3)')
+    options, args = parser.parse_args()
+
+    if sys.version_info[0] >= 3:
+        print('Note: import_() and from_import() are not cached on Python 3')
+    print('{0:<18} {1:>12} {2:>12} {3:>8}'.format(
+        'function', 'uncached', 'cached', 'speedup'))
+    for label, call in CALLS:
+        best = {}
+        results = set()
+        # Alternate between the configurations, so that they run under the
+        # same conditions
+        for _ in range(options.repeat):
+            for cached in (False, True):
+                seconds, result = bench(call, options.calls, cached)
+                best[cached] = min(best.get(cached, seconds), seconds)
+                results.add(repr(result))
+        assert len(results) == 1, 'results differ'
+        print('{0:<18} {1:>10.2f}us {2:>10.2f}us {3:>7.2f}x'.format(
+            label, best[False] * 1e6, best[True] * 1e6,
+            best[False] / best[True]))
+
+
+if __name__ == '__main__':
+    main()
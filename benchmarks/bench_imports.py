@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+"""
+Benchmark of the import helpers in ``libfuturize.fixer_util``
+(``touch_import_top()`` and ``future_import()``) on a module with thousands
+of top-level statements, many of which make a fixer add an import.
+
+The module is refactored in memory with the fixers that use these helpers,
+once with the per-tree ``ImportIndex`` and once with the index replaced by
+calls to ``lib2to3.fixer_util.does_tree_import()``, which walks the module
+from the top on each lookup. Both the total time and the time spent in the
+lookups are reported. The outputs are checked to be identical.
+
+Usage:
+
+    $ python benchmarks/bench_imports.py [--statements N]
+"""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import gc
+import optparse
+import time
+import warnings
+
+warnings.simplefilter('ignore', DeprecationWarning)
+from lib2to3.fixer_util import does_tree_import, find_root
+from libfuturize import fixer_util
+from libfuturize.tool import FuturizeRefactoringTool
+from future.utils import text_type
+
+
+FIXERS = ['libfuturize.fixes.fix_basestring',
+          'libfuturize.fixes.fix_division_safe',
+          'libfuturize.fixes.fix_future_builtins',
+          'libfuturize.fixes.fix_print_with_import',
+          'libfuturize.fixes.fix_xrange_with_import']
+
+BUILTINS = ['chr', 'hex', 'oct', 'map', 'filter', 'zip', 'input', 'ascii',
+            'bytes', 'str']
+
+STATEMENTS = [
+    'def ratio_{0}(total, count):\n    return total / count\n',
+    'def show_{0}(value):\n    print "value", value\n',
+    'def count_{0}(n):\n    for i in xrange(n):\n        yield i\n',
+    'def names_{0}(name):\n'
+    '    if isinstance(name, basestring):\n'
+    '        name = [name]\n'
+    '    return name\n',
+    'def convert_{0}(value):\n    return {1}(value)\n',
+    'LIMIT_{0} = {0}\n',
+    'class Item{0}(object):\n    size = {0}\n',
+]
+
+
+def module_source(n_statements):
+    lines = ['"""\nGenerated module with {0} statements.\n"""\n'.format(
+                 n_statements),
+             'import os\n', 'import sys\n']
+    for i in range(n_statements):
+        lines.append(STATEMENTS[i % len(STATEMENTS)].format(
+            i, BUILTINS[i % len(BUILTINS)]))
+    return ''.join(lines)
+
+
+class ScanningIndex(object):
+    """
+    Stands in for ``ImportIndex`` with the previous behaviour.
+    """
+    def __init__(self, root):
+        self.root = root
+
+    def imports(self, package, name):
+        return does_tree_import(package, name, self.root)
+
+    def inserted(self, stmt):
+        pass
+
+
+class TimedIndex(object):
+    """
+    Adds up the time spent in the lookups of an index.
+    """
+    total = 0.0
+
+    def __init__(self, index):
+        self.index = index
+
+    def imports(self, package, name):
+        start = time.time()
+        try:
+            return self.index.imports(package, name)
+        finally:
+            TimedIndex.total += time.time() - start
+
+    def inserted(self, stmt):
+        self.index.inserted(stmt)
+
+
+def run(source, make_index):
+    """
+    Returns the total time and the lookup time of one run, and the output.
+    """
+    saved = fixer_util.import_index
+    fixer_util.import_index = lambda node: TimedIndex(make_index(node))
+    try:
+        rt = FuturizeRefactoringTool(FIXERS, {}, [], True, False)
+        gc.collect()
+        TimedIndex.total = 0.0
+        start = time.time()
+        output = text_type(rt.refactor_string(source, 'module.py'))
+        return (time.time() - start, TimedIndex.total), output
+    finally:
+        fixer_util.import_index = saved
+
+
+def main():
+    parser = optparse.OptionParser(usage='%prog [options]')
+    parser.add_option('--statements', type='int', default=3000,
+                      help='number of top-level statements (default: 3000)')
+    parser.add_option('--repeat', type='int', default=3,
+                      help='report the best of this many runs (default: 3)')
+    options, args = parser.parse_args()
+
+    source = module_source(options.statements)
+    configurations = [
+        ('does_tree_import()', lambda node: ScanningIndex(find_root(node))),
+        ('ImportIndex', fixer_util.import_index),
+    ]
+    best = [None] * len(configurations)
+    outputs = set()
+    # Alternate between the configurations, so that they run under the same
+    # conditions
+    for _ in range(options.repeat):
+        for i, (label, make_index) in enumerate(configurations):
+            times, output = run(source, make_index)
+            best[i] = times if best[i] is None else min(best[i], times)
+            outputs.add(output)
+    assert len(outputs) == 1, 'refactored output differs'
+
+    print('{0:<20} {1:>10} {2:>10}'.format(
+        '{0} statements'.format(options.statements), 'total', 'lookups'))
+    for (label, _), (total, lookups) in zip(configurations, best):
+        print('{0:<20} {1:>9.3f}s {2:>9.3f}s'.format(label, total, lookups))
+    print('{0:<20} {1:>9.2f}x {2:>9.2f}x'.format(
+        'speedup', best[0][0] / best[1][0], best[0][1] / best[1][1]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""
+Benchmark of ``future.standard_library.install_aliases()`` with the module
+aliases (``urllib.request``, ``test.support``, ``dbm.dumb`` etc.) installed
+lazily, as by default, and eagerly (``lazy=False``).
+
+Each run is a fresh Python process, which reports the time taken by
+``install_aliases()`` and the number of modules it imported. The aliases
+are then used, and the results are checked to be the same in both
+configurations.
+
+On Python 3, ``install_aliases()`` does nothing, so this is only meaningful
+on Python 2.
+
+Usage:
+
+    $ python benchmarks/bench_install_aliases.py [--repeat N]
+"""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import json
+import optparse
+import subprocess
+import sys
+
+
+SCRIPT = '''\
+import json, sys, time
+start = time.time()
+modules = len(sys.modules)
+from future import standard_library
+standard_library.install_aliases(lazy={0})
+seconds = time.time() - start
+modules = len(sys.modules) - modules
+import urllib.parse, urllib.request
+check = [urllib.parse.quote('a b'), urllib.request.urlopen.__name__]
+print(json.dumps([seconds, modules, check]))
+'''
+
+
+def run(lazy):
+    command = [sys.executable, '-c', SCRIPT.format(lazy)]
+    output = subprocess.check_output(command)
+    return json.loads(output.decode('utf-8'))
+
+
+def main():
+    parser = optparse.OptionParser(usage='%prog [options]')
+    parser.add_option('--repeat', type='int', default=10,
+                      help='report the best of this many runs (default: 10)')
+    options, args = parser.parse_args()
+
+    if sys.version_info[0] >= 3:
+        print('Note: install_aliases() does nothing on Python 3')
+    configurations = [('eager', False), ('lazy', True)]
+    best = {}
+    modules = {}
+    checks = set()
+    # Alternate between the configurations, so that they run under the same
+    # conditions
+    for _ in range(options.repeat):
+        for label, lazy in configurations:
+            seconds, modules[label], check = run(lazy)
+            best[label] = min(best.get(label, seconds), seconds)
+            checks.add(json.dumps(check))
+    assert len(checks) == 1, 'the aliases differ'
+
+    print('{0:<8} {1:>10} {2:>10}'.format('', 'time', 'modules'))
+    for label, _ in configurations:
+        print('{0:<8} {1:>8.1f}ms {2:>10}'.format(label, best[label] * 1e3,
+                                                 modules[label]))
+    if best['lazy']:
+        print('{0:<8} {1:>9.2f}x'.format('speedup',
+                                         best['eager'] / best['lazy']))
+
+
+if __name__ == '__main__':
+    main()
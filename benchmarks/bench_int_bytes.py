@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""
+Benchmark of packing integers into bytes and unpacking them with the batch
+functions ``ints_to_bytes()`` and ``ints_from_bytes()`` in
+``future.types.newint``, against the per-item ``int.to_bytes()`` and
+``int.from_bytes()`` (of ``newint`` on Py2).
+
+The packed bytes and the unpacked integers are checked to be the same.
+
+Usage:
+
+    $ python benchmarks/bench_int_bytes.py [--values N] [--repeat N]
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import array
+import gc
+import optparse
+import random
+import time
+
+from future.builtins import int
+from future.types.newint import ints_to_bytes, ints_from_bytes
+from future.utils import native
+
+
+CONFIGURATIONS = [
+    # (label, length, byteorder, signed, as an array?)
+    ('uint32 big', 4, 'big', False, False),
+    ('int64 little', 8, 'little', True, False),
+    ('uint16 array', 2, 'little', False, True),
+    ('int24 big', 3, 'big', True, False),
+]
+
+
+def per_item_to_bytes(values, length, byteorder, signed):
+    return b''.join([native(int(value).to_bytes(length, byteorder,
+                                                signed=signed))
+                     for value in values])
+
+
+def per_item_from_bytes(data, length, byteorder, signed):
+    return [int.from_bytes(data[i:i + length], byteorder, signed=signed)
+            for i in range(0, len(data), length)]
+
+
+def best_time(repeat, function, *args):
+    """
+    Returns the best time of the function and its result.
+    """
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.time()
+        result = function(*args)
+        seconds = time.time() - start
+        best = seconds if best is None else min(best, seconds)
+    return best, result
+
+
+def main():
+    parser = optparse.OptionParser(usage='%prog [options]')
+    parser.add_option('--values', type='int', default=100000,
+                      help='number of integers to pack (default: 100000)')
+    parser.add_option('--repeat', type='int', default=5,
+                      help='report the best of this many runs (default: 5)')
+    options, args = parser.parse_args()
+
+    random.seed(0)
+    print('{0:<14} {1:<6} {2:>10} {3:>10} {4:>8}'.format(
+        'values', '', 'per item', 'batch', 'speedup'))
+    for label, length, byteorder, signed, use_array in CONFIGURATIONS:
+        bits = length * 8
+        if signed:
+            low, high = -(1 << (bits - 1)), (1 << (bits - 1)) - 1
+        else:
+            low, high = 0, (1 << bits) - 1
+        values = [random.randint(low, high) for _ in range(options.values)]
+        if use_array:
+            values = array.array('H', values)
+        args = (length, byteorder, signed)
+
+        per_item, expected = best_time(options.repeat, per_item_to_bytes,
+                                       values, *args)
+        batch, data = best_time(options.repeat, ints_to_bytes, values, *args)
+        assert native(data) == expected, 'packed bytes differ'
+        print('{0:<14} {1:<6} {2:>8.1f}ms {3:>8.1f}ms {4:>7.2f}x'.format(
+            label, 'pack', per_item * 1e3, batch * 1e3, per_item / batch))
+
+        data = native(data)
+        per_item, expected = best_time(options.repeat, per_item_from_bytes,
+                                       data, *args)
+        batch, result = best_time(options.repeat, ints_from_bytes, data,
+                                  *args)
+        assert result == expected == list(values), 'unpacked values differ'
+        print('{0:<14} {1:<6} {2:>8.1f}ms {3:>8.1f}ms {4:>7.2f}x'.format(
+            '', 'unpack', per_item * 1e3, batch * 1e3, per_item / batch))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+"""
+Benchmark of integer-heavy loops on ``future.types.newint``, against native
+ints and against the previous ``newint``, a copy of the module from before
+its arithmetic methods called the methods of ``long`` directly (in
+``previous_newint.py``).
+
+It also compares the batch functions ``newints()`` and ``newint_sum()``
+with the equivalent loops.
+
+The results of each workload are checked to be the same for all the
+types.
+
+It only runs on Python 2, where ``int`` from ``builtins`` is ``newint``. The
+previous ``newint`` doesn't work on Python 3.
+
+Usage:
+
+    $ python benchmarks/bench_newint.py [--values N] [--repeat N]
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import gc
+import optparse
+import time
+
+from future.types.newint import newint, newints, newint_sum
+from future.utils import PY3
+
+from previous_newint import newint as previous_newint
+
+if PY3:
+    long = int
+
+
+def checksum(values, int_type):
+    c = int_type(0)
+    for value in values:
+        c = (c * 31 + value) & 0xFFFFFFFF
+    return c
+
+
+def counter(values, int_type):
+    n = int_type(0)
+    for value in values:
+        if value % 3:
+            n += 1
+    return n
+
+
+def hashing(values, int_type):
+    h = int_type(0x811c9dc5)
+    for value in values:
+        h = ((h ^ value) * 0x01000193) & 0xFFFFFFFF
+        h = (h << 1 | h >> 31) & 0xFFFFFFFF
+    return h
+
+
+def digits(values, int_type):
+    total = int_type(0)
+    for value in values:
+        while value:
+            total += value % 10
+            value //= 10
+    return total
+
+
+WORKLOADS = [('checksum', checksum), ('counter', counter),
+             ('hashing', hashing), ('digits', digits)]
+
+TYPES = [('native', long), ('previous newint', previous_newint),
+         ('newint', newint)]
+
+
+def best_time(repeat, function, *args):
+    """
+    Returns the best time of the function and its result.
+    """
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.time()
+        result = function(*args)
+        seconds = time.time() - start
+        best = seconds if best is None else min(best, seconds)
+    return best, result
+
+
+def main():
+    parser = optparse.OptionParser(usage='%prog [options]')
+    parser.add_option('--values', type='int', default=20000,
+                      help='number of values per workload (default: 20000)')
+    parser.add_option('--repeat', type='int', default=5,
+                      help='report the best of this many runs (default: 5)')
+    options, args = parser.parse_args()
+    if PY3:
+        parser.error('newint is only used on Python 2; run this with Python 2')
+
+    native_values = [(i * 2654435761) % 1000003
+                     for i in range(options.values)]
+    print('{0:<12} {1:>10} {2:>16} {3:>10} {4:>8}'.format(
+        'workload', 'native', 'previous newint', 'newint', 'speedup'))
+    for label, workload in WORKLOADS:
+        times = []
+        results = set()
+        for _, int_type in TYPES:
+            values = [int_type(value) for value in native_values]
+            seconds, result = best_time(options.repeat, workload, values,
+                                        int_type)
+            times.append(seconds)
+            results.add(result)
+        assert len(results) == 1, 'results differ'
+        print('{0:<12} {1:>8.1f}ms {2:>14.1f}ms {3:>8.1f}ms {4:>7.2f}x'
+              .format(label, times[0] * 1e3, times[1] * 1e3,
+                      times[2] * 1e3, times[1] / times[2]))
+
+    print()
+    print('{0:<12} {1:>10} {2:>10} {3:>8}'.format(
+        'batch', 'loop', 'batch', 'speedup'))
+    loop, loop_result = best_time(
+        options.repeat, lambda: [newint(value) for value in native_values])
+    batch, batch_result = best_time(options.repeat, newints, native_values)
+    assert loop_result == batch_result, 'results differ'
+    print('{0:<12} {1:>8.1f}ms {2:>8.1f}ms {3:>7.2f}x'.format(
+        'newints', loop * 1e3, batch * 1e3, loop / batch))
+    values = newints(native_values)
+    loop, loop_result = best_time(options.repeat, sum, values, newint(0))
+    batch, batch_result = best_time(options.repeat, newint_sum, values)
+    assert loop_result == batch_result, 'results differ'
+    print('{0:<12} {1:>8.1f}ms {2:>8.1f}ms {3:>7.2f}x'.format(
+        'newint_sum', loop * 1e3, batch * 1e3, loop / batch))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+"""
+Benchmark of the token-level pre-filter (``futurize --prefilter``, see
+``libfuturize.prefilter``) on a corpus in which most modules are already
+Python 3-clean.
+
+The corpus is refactored in memory with the stage 1 fixers, with and without
+the pre-filter. The outputs are checked to be identical.
+
+Usage:
+
+    $ python benchmarks/bench_prefilter.py [--modules N] [--py2-fraction F]
+"""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import optparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import make_corpus, read_corpus
+
+warnings.simplefilter('ignore', DeprecationWarning)
+from libfuturize.fixes import (lib2to3_fix_names_stage1,
+                               libfuturize_fix_names_stage1)
+from libfuturize.tool import FuturizeRefactoringTool
+from future.utils import text_type
+
+
+def time_tool(filenames, sources, prefilter, repeat):
+    fixers = sorted(lib2to3_fix_names_stage1 | libfuturize_fix_names_stage1)
+    best = None
+    for _ in range(repeat):
+        rt = FuturizeRefactoringTool(fixers, {}, [], True, False,
+                                     prefilter=prefilter)
+        start = time.time()
+        output = [text_type(rt.refactor_string(source, filename))
+                  for filename, source in zip(filenames, sources)]
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, output, rt
+
+
+def main():
+    parser = optparse.OptionParser(usage='%prog [options]')
+    parser.add_option('--modules', type='int', default=100,
+                      help='number of generated modules (default: 100)')
+    parser.add_option('--py2-fraction', type='float', default=0.2,
+                      help='fraction of modules that need changes '
+                           '(default: 0.2)')
+    parser.add_option('--repeat', type='int', default=3,
+                      help='report the best of this many runs (default: 3)')
+    options, args = parser.parse_args()
+
+    tempdir = tempfile.mkdtemp()
+    try:
+        filenames = make_corpus(tempdir, options.modules,
+                                py2_fraction=options.py2_fraction)
+        sources = read_corpus(filenames)
+        baseline, expected, _ = time_tool(filenames, sources, False,
+                                          options.repeat)
+        filtered, output, rt = time_tool(filenames, sources, True,
+                                         options.repeat)
+    finally:
+        shutil.rmtree(tempdir)
+    assert output == expected, 'refactored output differs'
+
+    print('without pre-filter: {0:.3f}s'.format(baseline))
+    print('with pre-filter:    {0:.3f}s ({1:.2f}x)'.format(
+        filtered, baseline / filtered))
+    print(rt.prefilter.summary())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+"""
+Benchmark of the startup time of ``futurize`` and ``pasteurize`` on a single
+file, as in a pre-commit hook, with and without the cache of compiled fixer
+patterns in ``--cache-dir`` (see ``libfuturize.patcache``).
+
+Each run is a fresh Python process. The result cache in ``--cache-dir`` is
+cleared before each run, so that only the pattern cache is reused. The
+outputs of the runs with and without the cache are checked to be identical.
+
+Usage:
+
+    $ python benchmarks/bench_startup.py [--repeat N]
+"""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import optparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import module_source
+
+
+SCRIPT = ('import sys, warnings; '
+          'warnings.simplefilter("ignore", DeprecationWarning); '
+          'from {0}.main import main; sys.exit(main())')
+
+CONFIGURATIONS = [
+    # (label, package, arguments, Python 2 source?)
+    ('futurize --stage1', 'libfuturize', ['--stage1'], True),
+    ('futurize --both-stages', 'libfuturize', [], True),
+    ('pasteurize', 'libpasteurize', [], False),
+]
+
+
+def run(package, args, filename, cache_dir=None):
+    if cache_dir is not None:
+        for name in os.listdir(cache_dir):
+            # Keep only the pattern cache
+            path = os.path.join(cache_dir, name)
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+        args = args + ['--cache-dir', cache_dir]
+    command = [sys.executable, '-c', SCRIPT.format(package)]
+    start = time.time()
+    process = subprocess.Popen(command + args + [filename],
+                               stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE)
+    stdout, stderr = process.communicate()
+    return time.time() - start, stdout
+
+
+def best_of(repeat, *args):
+    results = [run(*args) for _ in range(repeat)]
+    return min(t for t, _ in results), results[0][1]
+
+
+def main():
+    parser = optparse.OptionParser(usage='%prog [options]')
+    parser.add_option('--repeat', type='int', default=5,
+                      help='report the best of this many runs (default: 5)')
+    options, args = parser.parse_args()
+
+    tempdir = tempfile.mkdtemp()
+    try:
+        print('{0:<26} {1:>10} {2:>10} {3:>8}'.format(
+            'configuration', 'no cache', 'cached', 'speedup'))
+        for i, (label, package, extra_args, py2) in enumerate(CONFIGURATIONS):
+            filename = os.path.join(tempdir, 'module.py')
+            with open(filename, 'w') as f:
+                f.write(module_source(0, py2=py2))
+            cache_dir = os.path.join(tempdir, 'cache{0}'.format(i))
+            os.mkdir(cache_dir)
+            run(package, extra_args, filename, cache_dir)  # fill the cache
+            uncached, expected = best_of(options.repeat, package, extra_args,
+                                         filename)
+            cached, output = best_of(options.repeat, package, extra_args,
+                                     filename, cache_dir)
+            assert output == expected, 'output differs'
+            print('{0:<26} {1:>9.3f}s {2:>9.3f}s {3:>7.2f}x'.format(
+                label, uncached, cached, uncached / cached))
+    finally:
+        shutil.rmtree(tempdir)
+
+
+if __name__ == '__main__':
+    main()
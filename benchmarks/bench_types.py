@@ -0,0 +1,318 @@
+#!/usr/bin/env python
+"""
+Benchmark suite of the ``future.types`` wrappers (``newint``, ``newbytes``,
+``newstr``, ``newlist``, ``newdict``, ``newrange`` and ``newobject``)
+against the native types they stand in for.
+
+Each case times one operation (construction, arithmetic, slicing,
+iteration, comparison, hashing, ``isinstance()`` checks and ``__native__()``
+round-trips) on a native object and on the corresponding ``future.types``
+object, with ``timeit``, and reports the best time per operation in
+nanoseconds and the ratio of the two.
+
+The results can be written as JSON with ``--json``. The file has sorted
+keys and no timestamps, so that results from different releases can be
+diffed or compared with ``--compare``, which reports the cases whose ratio
+changed by more than ``--threshold`` and exits with status 1 if any case got
+slower. Cases that fail (some operations aren't supported by every type on
+every version of Python) are reported with their errors.
+
+Usage:
+
+    $ python benchmarks/bench_types.py [--number N] [--repeat N] [-k PATTERN]
+          [--json results.json] [--compare baseline.json]
+"""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import json
+import optparse
+import platform
+import sys
+import timeit
+
+import future
+
+
+# The setup for each type: the native type is N and the future.types type is
+# T; each case then creates its objects x and y from one of them, as X. z is
+# always a native object.
+SETUP = {
+    'newint': '''
+from future.types.newint import newint as T
+try:
+    N = long
+except NameError:
+    N = int
+X = {0}
+x = X(12345678)
+y = X(1234)
+z = N(12345678)
+''',
+    'newbytes': '''
+from future.types.newbytes import newbytes as T
+N = type(b'')
+X = {0}
+x = X(b'abcdefgh' * 8)
+y = X(b'abcdefgh' * 8)
+z = N(b'abcdefgh' * 8)
+''',
+    'newstr': '''
+from future.types.newstr import newstr as T
+N = type(u'')
+X = {0}
+x = X(u'abcdefgh' * 8)
+y = X(u'abcdefgh' * 8)
+z = N(u'abcdefgh' * 8)
+''',
+    'newlist': '''
+from future.types.newlist import newlist as T
+N = list
+X = {0}
+x = X(range(100))
+y = X(range(100))
+z = N(range(100))
+''',
+    'newdict': '''
+from future.types.newdict import newdict as T
+N = dict
+X = {0}
+pairs = [(i, i) for i in range(100)]
+x = X(pairs)
+y = X(pairs)
+z = N(pairs)
+''',
+    'newrange': '''
+from future.types.newrange import newrange as T
+try:
+    N = xrange
+except NameError:
+    N = range
+X = {0}
+x = X(1000)
+z = N(1000)
+''',
+    'newobject': '''
+from future.types.newobject import newobject
+class T(newobject):
+    pass
+class N(object):
+    pass
+X = {0}
+x = X()
+y = X()
+z = N()
+''',
+}
+
+# (type, operation, statement), with the statement run on objects of type X.
+# A pair of statements is (native, future). 'isinstance_native' is the cost of
+# checking a native object against the type, as in ``isinstance(1, int)``
+# after ``from builtins import int`` on Py2.
+ISINSTANCE_NATIVE = ('isinstance(z, N)', 'isinstance(z, T)')
+
+CASES = [
+    ('newint', 'construct', 'X(12345678)'),
+    ('newint', 'add', 'x + y'),
+    ('newint', 'multiply', 'x * y'),
+    ('newint', 'floordiv', 'x // y'),
+    ('newint', 'truediv', 'x / y'),
+    ('newint', 'compare', 'x < y'),
+    ('newint', 'hash', 'hash(x)'),
+    ('newint', 'isinstance', 'isinstance(x, X)'),
+    ('newint', 'isinstance_native', ISINSTANCE_NATIVE),
+    ('newint', 'native', ('X(x)', 'X(x.__native__())')),
+
+    ('newbytes', 'construct', 'X(b"abcdefgh")'),
+    ('newbytes', 'slice', 'x[8:24]'),
+    ('newbytes', 'index', 'x[5]'),
+    ('newbytes', 'iterate', 'for c in x: pass'),
+    ('newbytes', 'concatenate', 'x + y'),
+    ('newbytes', 'compare', 'x == y'),
+    ('newbytes', 'hash', 'hash(x)'),
+    ('newbytes', 'isinstance', 'isinstance(x, X)'),
+    ('newbytes', 'isinstance_native', ISINSTANCE_NATIVE),
+    ('newbytes', 'native', ('X(x)', 'X(x.__native__())')),
+
+    ('newstr', 'construct', 'X(u"abcdefgh")'),
+    ('newstr', 'slice', 'x[8:24]'),
+    ('newstr', 'index', 'x[5]'),
+    ('newstr', 'iterate', 'for c in x: pass'),
+    ('newstr', 'concatenate', 'x + y'),
+    ('newstr', 'compare', 'x == y'),
+    ('newstr', 'hash', 'hash(x)'),
+    ('newstr', 'isinstance', 'isinstance(x, X)'),
+    ('newstr', 'isinstance_native', ISINSTANCE_NATIVE),
+    ('newstr', 'method', 'x.upper()'),
+    ('newstr', 'native', ('X(x)', 'X(x.__native__())')),
+
+    ('newlist', 'construct', 'X(range(100))'),
+    ('newlist', 'slice', 'x[10:50]'),
+    ('newlist', 'index', 'x[50]'),
+    ('newlist', 'iterate', 'for i in x: pass'),
+    ('newlist', 'concatenate', 'x + y'),
+    ('newlist', 'compare', 'x == y'),
+    ('newlist', 'isinstance', 'isinstance(x, X)'),
+    ('newlist', 'isinstance_native', ISINSTANCE_NATIVE),
+    ('newlist', 'native', ('X(x)', 'X(x.__native__())')),
+
+    ('newdict', 'construct', 'X(pairs)'),
+    ('newdict', 'lookup', 'x[50]'),
+    ('newdict', 'iterate', 'for k in x: pass'),
+    ('newdict', 'items', 'for k, v in x.items(): pass'),
+    ('newdict', 'compare', 'x == y'),
+    ('newdict', 'isinstance', 'isinstance(x, X)'),
+    ('newdict', 'isinstance_native', ISINSTANCE_NATIVE),
+    ('newdict', 'native', ('X(x)', 'X(x.__native__())')),
+
+    ('newrange', 'construct', 'X(1000)'),
+    ('newrange', 'index', 'x[500]'),
+    ('newrange', 'slice', 'x[10:500:2]'),
+    ('newrange', 'iterate', 'for i in x: pass'),
+    ('newrange', 'contains', '500 in x'),
+    ('newrange', 'len', 'len(x)'),
+    ('newrange', 'isinstance', 'isinstance(x, X)'),
+    ('newrange', 'isinstance_native', ISINSTANCE_NATIVE),
+
+    ('newobject', 'construct', 'X()'),
+    ('newobject', 'compare', 'x == y'),
+    ('newobject', 'hash', 'hash(x)'),
+    ('newobject', 'isinstance', 'isinstance(x, X)'),
+    ('newobject', 'isinstance_native', ISINSTANCE_NATIVE),
+    ('newobject', 'native', ('x', 'x.__native__()')),
+]
+
+
+def time_statement(stmt, setup, number, repeat):
+    """
+    Returns the best time per run of the statement, in nanoseconds.
+    """
+    timer = timeit.Timer(stmt, setup)
+    return min(timer.repeat(repeat, number)) / number * 1e9
+
+
+def run_case(type_name, stmt, number, repeat):
+    """
+    Returns the times of the statement for the native type and for the
+    future.types type. The two runs are interleaved, so that they run under
+    the same conditions.
+    """
+    if isinstance(stmt, tuple):
+        native_stmt, future_stmt = stmt
+    else:
+        native_stmt = future_stmt = stmt
+    native = future_ = None
+    for _ in range(repeat):
+        t = time_statement(native_stmt, SETUP[type_name].format('N'),
+                           number, 1)
+        native = t if native is None else min(native, t)
+        t = time_statement(future_stmt, SETUP[type_name].format('T'),
+                           number, 1)
+        future_ = t if future_ is None else min(future_, t)
+    return native, future_
+
+
+def run(number, repeat, pattern=None):
+    """
+    Runs the cases whose name ('type.operation') contains ``pattern`` and
+    returns the results as a dict that can be written as JSON.
+    """
+    results = {}
+    for type_name, operation, stmt in CASES:
+        name = '{0}.{1}'.format(type_name, operation)
+        if pattern and pattern not in name:
+            continue
+        try:
+            native, future_ = run_case(type_name, stmt, number, repeat)
+        except Exception as e:
+            # Some operations aren't supported by every type on every
+            # version of Python
+            results[name] = {'error': '{0}: {1}'.format(type(e).__name__, e)}
+            continue
+        results[name] = {'native_ns': round(native, 1),
+                         'future_ns': round(future_, 1),
+                         'ratio': round(future_ / native, 3)}
+    return {
+        'environment': {
+            'future': future.__version__,
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'number': number,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    Prints the cases whose ratio to the native type differs from that in
+    the baseline results by more than ``threshold`` (a fraction). Returns
+    the number of cases that got slower.
+    """
+    slower = 0
+    print()
+    print('Compared with the baseline (future {0}, Python {1}):'.format(
+        baseline['environment']['future'], baseline['environment']['python']))
+    for name in sorted(results['results']):
+        if ('ratio' not in results['results'][name] or
+                'ratio' not in baseline['results'].get(name, {})):
+            continue
+        old = baseline['results'][name]['ratio']
+        new = results['results'][name]['ratio']
+        change = new / old - 1
+        if abs(change) > threshold:
+            if change > 0:
+                slower += 1
+            print('{0:<28} {1:>8.2f}x -> {2:>6.2f}x ({3:+.0%})'.format(
+                name, old, new, change))
+    if not slower:
+        print('No case is slower by more than {0:.0%}'.format(threshold))
+    return slower
+
+
+def main():
+    parser = optparse.OptionParser(usage='%prog [options]')
+    parser.add_option('--number', type='int', default=20000,
+                      help='operations per timing run (default: 20000)')
+    parser.add_option('--repeat', type='int', default=5,
+                      help='report the best of this many runs (default: 5)')
+    parser.add_option('-k', dest='pattern',
+                      help='only run the cases whose name contains this')
+    parser.add_option('--json', dest='json_file',
+                      help='write the results to this file as JSON')
+    parser.add_option('--compare', dest='baseline',
+                      help='compare the results with a JSON file written '
+                           'by --json')
+    parser.add_option('--threshold', type='float', default=0.1,
+                      help='the change in ratio that --compare reports '
+                           '(default: 0.1)')
+    options, args = parser.parse_args()
+
+    results = run(options.number, options.repeat, options.pattern)
+    print('{0:<28} {1:>10} {2:>10} {3:>8}'.format(
+        'case', 'native', 'future', 'ratio'))
+    for name in sorted(results['results']):
+        result = results['results'][name]
+        if 'error' in result:
+            print('{0:<28} {1}'.format(name, result['error']))
+            continue
+        print('{0:<28} {1:>8.0f}ns {2:>8.0f}ns {3:>7.2f}x'.format(
+            name, result['native_ns'], result['future_ns'], result['ratio']))
+
+    if options.json_file:
+        with open(options.json_file, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True,
+                      separators=(',', ': '))
+            f.write('\n')
+    if options.baseline:
+        with open(options.baseline) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, options.threshold):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
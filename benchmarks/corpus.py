@@ -0,0 +1,140 @@
+"""
+Helpers for the ``futurize`` / ``pasteurize`` benchmarks: a synthetic corpus
+of Python 2 modules that exercises most of the fixers, plus a number of
+already Python 3-clean modules (which make up the bulk of many real code
+bases part-way through a migration).
+"""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import io
+import os
+import random
+
+
+PY2_TEMPLATE = '''\
+"""
+Module {index}: generated Python 2 code for benchmarking futurize.
+"""
+import os
+import sys
+import ConfigParser
+import cPickle
+from StringIO import StringIO
+
+
+class Record{index}:
+    __metaclass__ = type
+
+    def __init__(self, name, values):
+        self.name = name
+        self.values = values
+
+    def next(self):
+        return self.values.pop()
+
+    def __nonzero__(self):
+        return bool(self.values)
+
+    def total(self):
+        result = 0L
+        for i in xrange(len(self.values)):
+            result += self.values[i]
+        return result
+
+
+def process_{index}(records, mapping):
+    if mapping.has_key('debug'):
+        print >>sys.stderr, "debugging", len(records)
+    for key, value in mapping.iteritems():
+        if isinstance(value, basestring):
+            print "string value:", key, value
+        elif isinstance(value, (int, long)):
+            print "number:", key, value / 2
+    try:
+        data = cPickle.loads(mapping['blob'])
+    except KeyError, e:
+        raise ValueError, "missing blob: %s" % e
+    names = map(lambda r: r.name, records)
+    keys = mapping.keys()
+    keys.sort()
+    text = unicode(raw_input("> "))
+    return filter(None, names), keys, text, data
+'''
+
+PY3_TEMPLATE = '''\
+"""
+Module {index}: generated Python 3-clean code for benchmarking futurize.
+"""
+import os
+import sys
+
+
+class Point{index}(object):
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+    def __repr__(self):
+        return 'Point{index}({{0}}, {{1}})'.format(self.x, self.y)
+
+    def scaled(self, factor):
+        return Point{index}(self.x * factor, self.y * factor)
+
+
+def centroid_{index}(points):
+    n = len(points)
+    if not n:
+        raise ValueError('no points')
+    sx = sum(p.x for p in points)
+    sy = sum(p.y for p in points)
+    return Point{index}(sx / n, sy / n)
+
+
+def describe_{index}(points, stream=sys.stdout):
+    for i, point in enumerate(points):
+        stream.write('%d: %r\\n' % (i, point))
+    return os.linesep.join(repr(p) for p in points)
+'''
+
+
+def module_source(index, py2=True, repeat=1):
+    """
+    Returns the source of one generated module. Pass ``repeat`` to make it
+    longer (the body is repeated with distinct names).
+    """
+    template = PY2_TEMPLATE if py2 else PY3_TEMPLATE
+    return ''.join(template.format(index='{0}_{1}'.format(index, r))
+                   for r in range(repeat))
+
+
+def make_corpus(dirname, n_modules=100, py2_fraction=0.3, seed=0):
+    """
+    Writes a corpus of ``n_modules`` modules into ``dirname`` and returns the
+    list of file names. A fraction ``py2_fraction`` of the modules needs
+    changes; the rest are already Python 3-clean. Module sizes vary.
+    """
+    rng = random.Random(seed)
+    if not os.path.isdir(dirname):
+        os.makedirs(dirname)
+    filenames = []
+    for index in range(n_modules):
+        py2 = rng.random() < py2_fraction
+        source = module_source(index, py2=py2, repeat=rng.randint(1, 4))
+        filename = os.path.join(dirname, 'module_{0:05d}.py'.format(index))
+        with io.open(filename, 'w', encoding='utf-8') as f:
+            f.write(source)
+        filenames.append(filename)
+    return filenames
+
+
+def read_corpus(filenames):
+    """
+    Returns the sources of the given files with the trailing newline that
+    ``RefactoringTool.refactor_file()`` adds.
+    """
+    sources = []
+    for filename in filenames:
+        with io.open(filename, encoding='utf-8') as f:
+            sources.append(f.read() + '\n')
+    return sources
@@ -338,6 +338,14 @@ if PY2:
     assert len(set(RENAMES.values()) & set(sys.builtin_module_names)) == 0
 
 
+# Maps the names and files of the modules checked by is_py2_stdlib_module()
+# to the results, which depend on nothing else, so that each module is only
+# inspected once. The module objects themselves aren't kept, so that the
+# modules removed from sys.modules (e.g. by scrub_py2_sys_modules()) can be
+# garbage-collected.
+_py2_stdlib_index = {}
+
+
 def is_py2_stdlib_module(m):
     """
     Tries to infer whether the module m is from the Python 2 standard library.
@@ -345,6 +353,15 @@ def is_py2_stdlib_module(m):
     """
     if PY3:
         return False
+    key = (m.__name__, getattr(m, '__file__', None))
+    result = _py2_stdlib_index.get(key)
+    if result is None:
+        result = _is_py2_stdlib_module(m)
+        _py2_stdlib_index[key] = result
+    return result
+
+
+def _is_py2_stdlib_module(m):
     if not 'stdlib_path' in is_py2_stdlib_module.__dict__:
         stdlib_files = [contextlib.__file__, os.__file__, copy.__file__]
         stdlib_paths = [os.path.split(f)[0] for f in stdlib_files]
@@ -368,6 +385,10 @@ def is_py2_stdlib_module(m):
     return False
 
 
+# The modules that scrub_py2_sys_modules() may remove
+_SCRUBBED_MODULES = frozenset(REPLACED_MODULES & set(RENAMES.keys()))
+
+
 def scrub_py2_sys_modules():
     """
     Removes any Python 2 standard library modules from ``sys.modules`` that
@@ -380,12 +401,11 @@ def scrub_py2_sys_modules():
     if PY3:
         return {}
     scrubbed = {}
-    for modulename in REPLACED_MODULES & set(RENAMES.keys()):
-        if not modulename in sys.modules:
+    for modulename in _SCRUBBED_MODULES:
+        module = sys.modules.get(modulename)
+        if module is None:
             continue
 
-        module = sys.modules[modulename]
-
         if is_py2_stdlib_module(module):
             flog.debug('Deleting (Py2) {} from sys.modules'.format(modulename))
             scrubbed[modulename] = sys.modules[modulename]
@@ -430,19 +450,94 @@ def restore_sys_modules(scrubbed):
     Add any previously scrubbed modules back to the sys.modules cache,
     but only if it's safe to do so.
     """
-    clash = set(sys.modules) & set(scrubbed)
+    clash = [name for name in scrubbed if name in sys.modules]
     if len(clash) != 0:
         # If several, choose one arbitrarily to raise an exception about
-        first = list(clash)[0]
+        first = clash[0]
         raise ImportError('future module {} clashes with Py2 module'
                           .format(first))
     sys.modules.update(scrubbed)
 
 
-def install_aliases():
+class _LazyModule(types.ModuleType):
+    """
+    Stands in for a module alias installed by ``install_aliases()``, such as
+    ``urllib.request`` for ``future.backports.urllib.request``, in
+    ``sys.modules`` and in its parent package. The module is imported on the
+    first access to one of its attributes, and then replaces the stand-in.
+    """
+    def __init__(self, name, target):
+        super(_LazyModule, self).__init__(name)
+        self.__dict__['_lazy_name'] = name
+        self.__dict__['_lazy_target'] = target
+
+    def _load(self):
+        module = self.__dict__.get('_lazy_module')
+        if module is None:
+            name = self.__dict__['_lazy_name']
+            target = self.__dict__['_lazy_target']
+            __import__(target)
+            module = sys.modules[target]
+            # For anyone still holding the stand-in:
+            self.__dict__.update(module.__dict__)
+            self.__dict__['_lazy_module'] = module
+            if sys.modules.get(name) is self:
+                sys.modules[name] = module
+            parent_name, _, attr = name.rpartition('.')
+            parent = sys.modules.get(parent_name)
+            if parent is not None and getattr(parent, attr, None) is self:
+                setattr(parent, attr, module)
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def _module_exists(name, path=None):
+    """
+    Returns whether the module can be found, without importing it.
+    """
+    try:
+        f, _, _ = imp.find_module(name, path)
+    except ImportError:
+        return False
+    if f is not None:
+        f.close()
+    return True
+
+
+def _alias_module(name, target, lazy):
+    """
+    Makes the module ``target`` available as ``name`` (a submodule of a
+    module that is already imported), in ``sys.modules`` and as an attribute
+    of its parent. With ``lazy``, ``target`` is only imported when it is
+    first used.
+    """
+    if lazy:
+        if name in sys.modules:
+            return
+        module = _LazyModule(name, target)
+    else:
+        __import__(target)
+        module = sys.modules[target]
+    parent_name, _, attr = name.rpartition('.')
+    setattr(sys.modules[parent_name], attr, module)
+    sys.modules[name] = module
+
+
+def install_aliases(lazy=True):
     """
     Monkey-patches the standard library in Py2.6/7 to provide
     aliases for better Py3 compatibility.
+
+    The aliases for whole modules (``urllib.request``, ``dbm.dumb`` etc.)
+    are lazy by default: the backported modules are only imported when they
+    are first used. Pass ``lazy=False`` to import them all now. The
+    ``test.support`` alias is always imported now, since Py2.7's
+    ``test.test_support`` imports ``test.support`` itself.
     """
     if PY3:
         return
@@ -463,34 +558,23 @@ def install_aliases():
 
     # Hack for urllib so it appears to have the same structure on Py2 as on Py3
     import urllib
-    from future.backports.urllib import request
-    from future.backports.urllib import response
-    from future.backports.urllib import parse
-    from future.backports.urllib import error
-    from future.backports.urllib import robotparser
-    urllib.request = request
-    urllib.response = response
-    urllib.parse = parse
-    urllib.error = error
-    urllib.robotparser = robotparser
-    sys.modules['urllib.request'] = request
-    sys.modules['urllib.response'] = response
-    sys.modules['urllib.parse'] = parse
-    sys.modules['urllib.error'] = error
-    sys.modules['urllib.robotparser'] = robotparser
+    for name in ['request', 'response', 'parse', 'error', 'robotparser']:
+        _alias_module('urllib.' + name, 'future.backports.urllib.' + name,
+                      lazy)
 
     # Patch the test module so it appears to have the same structure on Py2 as on Py3
     try:
         import test
     except ImportError:
         pass
-    try:
-        from future.moves.test import support
-    except ImportError:
-        pass
     else:
-        test.support = support
-        sys.modules['test.support'] = support
+        # Not lazily: on Py2.7.18, test.test_support (which
+        # future.moves.test.support imports) itself imports test.support, and
+        # would get the stand-in
+        try:
+            _alias_module('test.support', 'future.moves.test.support', False)
+        except ImportError:
+            pass
 
     # Patch the dbm module so it appears to have the same structure on Py2 as on Py3
     try:
@@ -498,23 +582,19 @@ def install_aliases():
     except ImportError:
         pass
     else:
-        from future.moves.dbm import dumb
-        dbm.dumb = dumb
-        sys.modules['dbm.dumb'] = dumb
-        try:
-            from future.moves.dbm import gnu
-        except ImportError:
-            pass
-        else:
-            dbm.gnu = gnu
-            sys.modules['dbm.gnu'] = gnu
-        try:
-            from future.moves.dbm import ndbm
-        except ImportError:
-            pass
-        else:
-            dbm.ndbm = ndbm
-            sys.modules['dbm.ndbm'] = ndbm
+        _alias_module('dbm.dumb', 'future.moves.dbm.dumb', lazy)
+        # future.moves.dbm.gnu and .ndbm import gdbm and dbm
+        for name, py2_name in [('gnu', 'gdbm'), ('ndbm', 'dbm')]:
+            if lazy:
+                if _module_exists(py2_name):
+                    _alias_module('dbm.' + name, 'future.moves.dbm.' + name,
+                                  lazy)
+            else:
+                try:
+                    _alias_module('dbm.' + name, 'future.moves.dbm.' + name,
+                                  lazy)
+                except ImportError:
+                    pass
 
     # install_aliases.run_already = True
 
@@ -624,6 +704,34 @@ def cache_py2_modules():
     # sys.py2_modules['dbm'] = dbm
 
 
+# Maps (module_name, backport) to the names of the modules resolved by
+# import_() and from_import() on Py2, so that repeated calls needn't import
+# anything. The modules are looked up in sys.modules, rather than kept here,
+# so that they can be garbage-collected once removed from it.
+_import_cache = {}
+
+
+def _cached_modules(key):
+    """
+    Returns the modules named in the cache under the key if they are all in
+    sys.modules and each is still an attribute of its parent package (as set
+    by import_()), otherwise None.
+    """
+    names = _import_cache.get(key)
+    if names is None:
+        return None
+    modules = []
+    for name in names:
+        module = sys.modules.get(name)
+        if module is None:
+            return None
+        if modules and (getattr(modules[-1], name.rsplit('.', 1)[1], None)
+                        is not module):
+            return None
+        modules.append(module)
+    return modules
+
+
 def import_(module_name, backport=False):
     """
     Pass a (potentially dotted) module name of a Python 3 standard library
@@ -667,31 +775,39 @@ def import_(module_name, backport=False):
         >>> from future.backports import http.client
 
     """
-    # Python 2.6 doesn't have importlib in the stdlib, so it requires
-    # the backported ``importlib`` package from PyPI as a dependency to use
-    # this function:
-    import importlib
-
     if PY3:
         return __import__(module_name)
     else:
         # client.blah = blah
         # Then http.client = client
         # etc.
+        key = ('import_', module_name, bool(backport))
+        modules = _cached_modules(key)
+        if modules is not None:
+            return modules[2]
+
+        # Python 2.6 doesn't have importlib in the stdlib, so it requires
+        # the backported ``importlib`` package from PyPI as a dependency to
+        # use this function:
+        import importlib
+
         if backport:
             prefix = 'future.backports'
         else:
             prefix = 'future.moves'
         parts = prefix.split('.') + module_name.split('.')
 
+        names = []
         modules = []
         for i, part in enumerate(parts):
             sofar = '.'.join(parts[:i+1])
+            names.append(sofar)
             modules.append(importlib.import_module(sofar))
         for i, part in reversed(list(enumerate(parts))):
             if i == 0:
                 break
             setattr(modules[i-1], part, modules[i])
+        _import_cache[key] = names
 
         # Return the next-most top-level module after future.backports / future.moves:
         return modules[2]
@@ -722,12 +838,21 @@ def from_import(module_name, *symbol_names, **kwargs):
     if PY3:
         return __import__(module_name)
     else:
-        if 'backport' in kwargs and bool(kwargs['backport']):
-            prefix = 'future.backports'
+        backport = bool(kwargs.get('backport'))
+        key = ('from_import', module_name, backport)
+        modules = _cached_modules(key)
+        if modules is not None:
+            module = modules[0]
         else:
-            prefix = 'future.moves'
-        parts = prefix.split('.') + module_name.split('.')
-        module = importlib.import_module(prefix + '.' + module_name)
+            import importlib
+            if backport:
+                prefix = 'future.backports'
+            else:
+                prefix = 'future.moves'
+            name = prefix + '.' + module_name
+            module = importlib.import_module(name)
+            _import_cache[key] = [name]
+        # The symbols are looked up on each call, in case they are rebound
         output = [getattr(module, name) for name in symbol_names]
         if len(output) == 1:
             return output[0]
@@ -1,5 +1,6 @@
 from __future__ import print_function, absolute_import
 import os
+import shutil
 import tempfile
 import unittest
 import sys
@@ -158,6 +159,9 @@ class CodeHandler(unittest.TestCase):
         else:
             self.env = {'PYTHONPATH': os.getcwd()}
 
+    def tearDown(self):
+        shutil.rmtree(self.tempdir, ignore_errors=True)
+
     def convert(self, code, stages=(1, 2), all_imports=False, from3=False,
                 reformat=True, run=True, conservative=False):
         """
@@ -286,18 +290,41 @@ class CodeHandler(unittest.TestCase):
         """
         Dedents the given code (a multiline string) and writes it out to
         a file in a temporary folder like /tmp/tmpUDCn7x/mytestscript.py.
+        The filename can include subfolders, like pkg/mymodule.py, which
+        are created as needed.
+
+        Returns the absolute path of the file.
         """
         if isinstance(code, bytes):
             code = code.decode('utf-8')
+        fn = self.tempdir + filename
+        dirname = os.path.dirname(fn)
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname)
         # Be explicit about encoding the temp file as UTF-8 (issue #63):
-        with io.open(self.tempdir + filename, 'wt', encoding='utf-8') as f:
+        with io.open(fn, 'wt', encoding='utf-8') as f:
             f.write(dedent(code))
+        return fn
 
     def _read_test_script(self, filename='mytestscript.py'):
         with io.open(self.tempdir + filename, 'rt', encoding='utf-8') as f:
             newsource = f.read()
         return newsource
 
+    def _refactoring_tool(self, fixers, options=None,
+                          tool_class=None, **kwargs):
+        """
+        Returns a ``FuturizeRefactoringTool`` (or ``tool_class``) with the
+        given fixers, for testing it in-process rather than by running the
+        ``futurize`` script. Any keyword arguments, like ``cache_dir``, are
+        passed on to the tool.
+        """
+        from libfuturize.tool import FuturizeRefactoringTool
+        if tool_class is None:
+            tool_class = FuturizeRefactoringTool
+        return tool_class(sorted(fixers), options or {}, [], True, False,
+                          **kwargs)
+
     def _futurize_test_script(self, filename='mytestscript.py', stages=(1, 2),
                               all_imports=False, from3=False,
                               conservative=False):
@@ -213,6 +213,28 @@ def issubset(list1, list2):
     return False
 
 
+class disabled_method(object):
+    """
+    A descriptor that hides a method inherited from a native type, so that
+    getting it raises an AttributeError and ``hasattr`` returns False, as for
+    a method that doesn't exist. Unlike overriding ``__getattribute__``, this
+    doesn't slow down access to any other attribute.
+
+    Example use:
+
+    >>> class newbytes(bytes):
+    ...     encode = disabled_method('encode method has been disabled')
+
+    >>> hasattr(newbytes(b'1234'), 'encode')
+    False
+    """
+    def __init__(self, message):
+        self.message = message
+
+    def __get__(self, instance, owner=None):
+        raise AttributeError(self.message)
+
+
 if utils.PY3:
     import builtins
     bytes = builtins.bytes
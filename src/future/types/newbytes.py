@@ -11,7 +11,7 @@ import string
 import copy
 
 from future.utils import istext, isbytes, PY3, with_metaclass
-from future.types import no, issubset
+from future.types import no, issubset, disabled_method
 from future.types.newobject import newobject
 
 
@@ -200,8 +200,8 @@ class newbytes(with_metaclass(BaseNewBytes, _builtin_bytes)):
     def replace(self, old, new, *args):
         return newbytes(super(newbytes, self).replace(old, new, *args))
 
-    def encode(self, *args):
-        raise AttributeError("encode method has been disabled in newbytes")
+    # Hidden, so that hasattr(b, 'encode') is False, as on Py3
+    encode = disabled_method("encode method has been disabled in newbytes")
 
     def decode(self, encoding='utf-8', errors='strict'):
         """
@@ -374,15 +374,6 @@ class newbytes(with_metaclass(BaseNewBytes, _builtin_bytes)):
         # newbytes.__str__() returns e.g. "b'blah'", consistent with Py3 bytes.
         return super(newbytes, self).__str__()
 
-    def __getattribute__(self, name):
-        """
-        A trick to cause the ``hasattr`` builtin-fn to return False for
-        the 'encode' method on Py2.
-        """
-        if name in ['encode', u'encode']:
-            raise AttributeError("encode method has been disabled in newbytes")
-        return super(newbytes, self).__getattribute__(name)
-
     @no(unicode)
     def rstrip(self, bytes_to_strip=None):
         """
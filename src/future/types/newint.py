@@ -7,8 +7,12 @@ They are very similar. The most notable difference is:
 """
 from __future__ import division
 
-import struct
+import array
 import collections
+import functools
+import operator
+import struct
+import sys
 
 from future.types.newbytes import newbytes
 from future.types.newobject import newobject
@@ -18,6 +22,23 @@ from future.utils import PY3, isint, istext, isbytes, with_metaclass, native
 if PY3:
     long = int
 
+# Creates a newint from a native int without the checks in newint.__new__()
+_new_newint = long.__new__
+
+_native_int_types = (int, long)
+
+_long_bool = long.__bool__ if PY3 else long.__nonzero__
+
+# Converts an int, long or newint to a native long (int on Py3) in C.
+# operator.index() returns newints as they are, and adding those to a sum
+# calls newint.__radd__() for each one.
+_native_long = long.__index__ if PY3 else long
+
+
+def _unsupported_operands(op, a, b):
+    raise TypeError("unsupported operand type(s) for %s: '%s' and '%s'" %
+                    (op, type(a).__name__, type(b).__name__))
+
 
 class BaseNewInt(type):
     def __instancecheck__(cls, instance):
@@ -53,6 +74,8 @@ class newint(with_metaclass(BaseNewInt, long)):
         |  4
 
         """
+        if base == 10 and type(x) in _native_int_types:
+            return _new_newint(cls, x)
         try:
             val = x.__int__()
         except AttributeError:
@@ -94,45 +117,45 @@ class newint(with_metaclass(BaseNewInt, long)):
         assert value[-1] == 'L'
         return value[:-1]
 
+    # The arithmetic methods call the methods of ``long`` directly rather
+    # than through super(), and wrap native results with _new_newint() rather
+    # than newint(), for speed.
+
     def __add__(self, other):
-        value = super(newint, self).__add__(other)
+        value = long.__add__(self, other)
         if value is NotImplemented:
             return long(self) + other
-        return newint(value)
+        return _new_newint(newint, value)
 
     def __radd__(self, other):
-        value = super(newint, self).__radd__(other)
+        value = long.__radd__(self, other)
         if value is NotImplemented:
             return other + long(self)
-        return newint(value)
+        return _new_newint(newint, value)
 
     def __sub__(self, other):
-        value = super(newint, self).__sub__(other)
+        value = long.__sub__(self, other)
         if value is NotImplemented:
             return long(self) - other
-        return newint(value)
+        return _new_newint(newint, value)
 
     def __rsub__(self, other):
-        value = super(newint, self).__rsub__(other)
+        value = long.__rsub__(self, other)
         if value is NotImplemented:
             return other - long(self)
-        return newint(value)
+        return _new_newint(newint, value)
 
     def __mul__(self, other):
-        value = super(newint, self).__mul__(other)
-        if isint(value):
-            return newint(value)
-        elif value is NotImplemented:
+        value = long.__mul__(self, other)
+        if value is NotImplemented:
             return long(self) * other
-        return value
+        return _new_newint(newint, value)
 
     def __rmul__(self, other):
-        value = super(newint, self).__rmul__(other)
-        if isint(value):
-            return newint(value)
-        elif value is NotImplemented:
+        value = long.__rmul__(self, other)
+        if value is NotImplemented:
             return other * long(self)
-        return value
+        return _new_newint(newint, value)
 
     def __div__(self, other):
         # We override this rather than e.g. relying on object.__div__ or
@@ -161,13 +184,13 @@ class newint(with_metaclass(BaseNewInt, long)):
             return value
 
     def __truediv__(self, other):
-        value = super(newint, self).__truediv__(other)
+        value = long.__truediv__(self, other)
         if value is NotImplemented:
             value = long(self) / other
         return value
 
     def __rtruediv__(self, other):
-        return super(newint, self).__rtruediv__(other)
+        return long.__rtruediv__(self, other)
 
     def __itruediv__(self, other):
         # long has no __itruediv__ method
@@ -176,101 +199,101 @@ class newint(with_metaclass(BaseNewInt, long)):
         return mylong
 
     def __floordiv__(self, other):
-        return newint(super(newint, self).__floordiv__(other))
+        value = long.__floordiv__(self, other)
+        if value is NotImplemented:
+            return long(self) // other
+        return _new_newint(newint, value)
 
     def __rfloordiv__(self, other):
-        return newint(super(newint, self).__rfloordiv__(other))
-
-    def __ifloordiv__(self, other):
-        # long has no __ifloordiv__ method
-        mylong = long(self)
-        mylong //= other
-        return newint(mylong)
+        value = long.__rfloordiv__(self, other)
+        if value is NotImplemented:
+            return other // long(self)
+        return _new_newint(newint, value)
 
     def __mod__(self, other):
-        value = super(newint, self).__mod__(other)
+        value = long.__mod__(self, other)
         if value is NotImplemented:
             return long(self) % other
-        return newint(value)
+        return _new_newint(newint, value)
 
     def __rmod__(self, other):
-        value = super(newint, self).__rmod__(other)
+        value = long.__rmod__(self, other)
         if value is NotImplemented:
             return other % long(self)
-        return newint(value)
+        return _new_newint(newint, value)
 
     def __divmod__(self, other):
-        value = super(newint, self).__divmod__(other)
+        value = long.__divmod__(self, other)
         if value is NotImplemented:
             mylong = long(self)
             return (mylong // other, mylong % other)
-        return (newint(value[0]), newint(value[1]))
+        return (_new_newint(newint, value[0]), _new_newint(newint, value[1]))
 
     def __rdivmod__(self, other):
-        value = super(newint, self).__rdivmod__(other)
+        value = long.__rdivmod__(self, other)
         if value is NotImplemented:
             mylong = long(self)
             return (other // mylong, other % mylong)
-        return (newint(value[0]), newint(value[1]))
+        return (_new_newint(newint, value[0]), _new_newint(newint, value[1]))
 
-    def __pow__(self, other):
-        value = super(newint, self).__pow__(other)
+    def __pow__(self, other, modulo=None):
+        value = long.__pow__(self, other, modulo)
         if value is NotImplemented:
-            return long(self) ** other
-        return newint(value)
+            return pow(long(self), other, modulo)
+        if isinstance(value, (int, long)):
+            return _new_newint(newint, value)
+        # A negative exponent gives a float, as on Py3
+        return value
 
     def __rpow__(self, other):
-        value = super(newint, self).__rpow__(other)
+        value = long.__rpow__(self, other)
         if value is NotImplemented:
             return other ** long(self)
-        return newint(value)
+        if isinstance(value, (int, long)):
+            return _new_newint(newint, value)
+        return value
 
     def __lshift__(self, other):
-        if not isint(other):
-            raise TypeError(
-                "unsupported operand type(s) for <<: '%s' and '%s'" %
-                (type(self).__name__, type(other).__name__))
-        return newint(super(newint, self).__lshift__(other))
+        value = long.__lshift__(self, other)
+        if value is NotImplemented:
+            _unsupported_operands('<<', self, other)
+        return _new_newint(newint, value)
 
     def __rshift__(self, other):
-        if not isint(other):
-            raise TypeError(
-                "unsupported operand type(s) for >>: '%s' and '%s'" %
-                (type(self).__name__, type(other).__name__))
-        return newint(super(newint, self).__rshift__(other))
+        value = long.__rshift__(self, other)
+        if value is NotImplemented:
+            _unsupported_operands('>>', self, other)
+        return _new_newint(newint, value)
 
     def __and__(self, other):
-        if not isint(other):
-            raise TypeError(
-                "unsupported operand type(s) for &: '%s' and '%s'" %
-                (type(self).__name__, type(other).__name__))
-        return newint(super(newint, self).__and__(other))
+        value = long.__and__(self, other)
+        if value is NotImplemented:
+            _unsupported_operands('&', self, other)
+        return _new_newint(newint, value)
 
     def __or__(self, other):
-        if not isint(other):
-            raise TypeError(
-                "unsupported operand type(s) for |: '%s' and '%s'" %
-                (type(self).__name__, type(other).__name__))
-        return newint(super(newint, self).__or__(other))
+        value = long.__or__(self, other)
+        if value is NotImplemented:
+            _unsupported_operands('|', self, other)
+        return _new_newint(newint, value)
 
     def __xor__(self, other):
-        if not isint(other):
-            raise TypeError(
-                "unsupported operand type(s) for ^: '%s' and '%s'" %
-                (type(self).__name__, type(other).__name__))
-        return newint(super(newint, self).__xor__(other))
+        value = long.__xor__(self, other)
+        if value is NotImplemented:
+            _unsupported_operands('^', self, other)
+        return _new_newint(newint, value)
 
     def __neg__(self):
-        return newint(super(newint, self).__neg__())
+        return _new_newint(newint, long.__neg__(self))
 
     def __pos__(self):
-        return newint(super(newint, self).__pos__())
+        return _new_newint(newint, long.__pos__(self))
 
     def __abs__(self):
-        return newint(super(newint, self).__abs__())
+        return _new_newint(newint, long.__abs__(self))
 
     def __invert__(self):
-        return newint(super(newint, self).__invert__())
+        return _new_newint(newint, long.__invert__(self))
 
     def __int__(self):
         return self
@@ -282,7 +305,7 @@ class newint(with_metaclass(BaseNewInt, long)):
         """
         So subclasses can override this, Py3-style
         """
-        return super(newint, self).__nonzero__()
+        return _long_bool(self)
 
     def __native__(self):
         return long(self)
@@ -369,6 +392,213 @@ class newint(with_metaclass(BaseNewInt, long)):
         return cls(num)
 
 
+def newints(values):
+    """
+    Returns a list of newints for an iterable of integers. This is faster
+    than ``[newint(value) for value in values]``, but doesn't accept strings
+    or floats.
+    """
+    return list(map(functools.partial(_new_newint, newint),
+                    map(operator.index, values)))
+
+
+def newint_sum(values, start=0):
+    """
+    Returns the sum of an iterable of integers as a newint. This is faster
+    than ``sum(values, newint(start))``, as the values and intermediate sums
+    are native ints rather than newints.
+    """
+    return _new_newint(newint, sum(map(_native_long,
+                                       map(operator.index, values)),
+                                   _native_long(operator.index(start))))
+
+
+# The struct format codes for unsigned ints of each width; the signed ones
+# are the lower-case codes
+_STRUCT_CODES = {1: 'B', 2: 'H', 4: 'I', 8: 'Q'}
+
+# The array typecodes for unsigned ints of each width on this platform
+_ARRAY_CODES = {}
+for _code in 'BHILQ':
+    try:
+        _ARRAY_CODES.setdefault(array.array(_code).itemsize, _code)
+    except ValueError:
+        # 'Q' is missing before Py3.3
+        pass
+
+# Maps each byte to the byte that extends its sign to the left
+_SIGN_EXTENSION = bytes(bytearray([0xff if b & 0x80 else 0
+                                   for b in range(256)]))
+
+
+def _check_byteorder(byteorder):
+    if byteorder not in ('little', 'big'):
+        raise ValueError("byteorder must be either 'little' or 'big'")
+
+
+def _struct_format(count, length, byteorder, signed):
+    code = _STRUCT_CODES[length]
+    return '{0}{1}{2}'.format('<' if byteorder == 'little' else '>', count,
+                              code.lower() if signed else code)
+
+
+def _wide_length(length):
+    """
+    Returns the smallest width of at least ``length`` bytes that struct can
+    pack, or None if there is none.
+    """
+    for wide in sorted(_STRUCT_CODES):
+        if wide >= length:
+            return wide
+    return None
+
+
+def ints_to_bytes(values, length, byteorder='big', signed=False):
+    """
+    Returns the bytes representing a sequence of integers, each of them
+    packed into ``length`` bytes as by ``int.to_bytes(length, byteorder,
+    signed)``, one after the other.
+
+    ``values`` may be any iterable of integers, such as a list or an
+    ``array.array``. For widths of up to 8 bytes, the integers are packed in
+    a single call to ``struct.pack()`` (and moved to their final positions
+    with slice assignments for widths other than 1, 2, 4 and 8), or copied
+    directly from an array whose items have the right width and signedness.
+
+    An OverflowError is raised if any integer can't be represented in
+    ``length`` bytes.
+    """
+    _check_byteorder(byteorder)
+    if length < 0:
+        raise ValueError("length argument must be non-negative")
+    code = _ARRAY_CODES.get(length)
+    if code is not None and signed:
+        code = code.lower()
+    if isinstance(values, array.array) and values.typecode == code:
+        items = array.array(code, values)
+        if byteorder != sys.byteorder:
+            items.byteswap()
+        data = items.tobytes() if PY3 else items.tostring()
+    elif 0 < length <= 8:
+        if not isinstance(values, (list, tuple, array.array)):
+            values = list(values)
+        try:
+            data = _pack(values, length, byteorder, signed)
+        except (struct.error, OverflowError):
+            data = None
+        if data is None:
+            # Raise the same error as to_bytes() for the first value that
+            # doesn't fit
+            data = _ints_to_bytes(values, length, byteorder, signed)
+    else:
+        data = _ints_to_bytes(values, length, byteorder, signed)
+    return data if PY3 else newbytes(data)
+
+
+def _pack(values, length, byteorder, signed):
+    """
+    Packs the values with struct, or returns None if a value doesn't fit.
+    """
+    count = len(values)
+    wide = _wide_length(length)
+    packed = struct.pack(_struct_format(count, wide, byteorder, signed),
+                         *values)
+    if wide == length:
+        return packed
+    # Drop the most significant wide - length bytes of each value, after
+    # checking that they only extend the sign of the rest
+    if byteorder == 'big':
+        kept, padding = wide - length, range(wide - length)
+        top = kept
+    else:
+        kept, padding = 0, range(length, wide)
+        top = length - 1
+    if signed:
+        extension = packed[top::wide].translate(_SIGN_EXTENSION)
+    else:
+        extension = b'\0' * count
+    for i in padding:
+        if packed[i::wide] != extension:
+            return None
+    data = bytearray(count * length)
+    for i in range(length):
+        data[i::length] = packed[kept + i::wide]
+    return bytes(data)
+
+
+def _ints_to_bytes(values, length, byteorder, signed):
+    if PY3:
+        return b''.join([long.to_bytes(value, length, byteorder,
+                                       signed=signed)
+                         for value in values])
+    return b''.join([native(newint(value).to_bytes(length, byteorder, signed))
+                     for value in values])
+
+
+def ints_from_bytes(data, length, byteorder='big', signed=False):
+    """
+    Returns the list of integers represented by a bytes-like object in which
+    each integer takes ``length`` bytes, as by ``int.from_bytes(chunk,
+    byteorder, signed)``: the reverse of ``ints_to_bytes()``.
+
+    The integers are returned as newints on Py2. For widths of up to 8
+    bytes, they are unpacked in a single call.
+
+    A ValueError is raised if the length of the data isn't a multiple of
+    ``length``.
+    """
+    _check_byteorder(byteorder)
+    if length <= 0:
+        raise ValueError("length argument must be positive")
+    if isinstance(data, newbytes):
+        data = native(data)
+    elif not PY3 and not isinstance(data, bytes):
+        # Py2's array and struct modules want a str
+        data = bytes(bytearray(data))
+    if len(data) % length:
+        raise ValueError("the data length is not a multiple of {0}".format(
+            length))
+    count = len(data) // length
+    wide = _wide_length(length)
+    if wide is None:
+        if PY3:
+            return [long.from_bytes(data[i:i + length], byteorder,
+                                    signed=signed)
+                    for i in range(0, len(data), length)]
+        return [newint.from_bytes(data[i:i + length], byteorder, signed)
+                for i in range(0, len(data), length)]
+    if wide != length:
+        # Widen each value by extending its sign (or with zeros)
+        wide_data = bytearray(count * wide)
+        if byteorder == 'big':
+            kept, padding = wide - length, range(wide - length)
+            top = 0
+        else:
+            kept, padding = 0, range(length, wide)
+            top = length - 1
+        for i in range(length):
+            wide_data[kept + i::wide] = data[i::length]
+        if signed:
+            extension = bytes(data[top::length]).translate(_SIGN_EXTENSION)
+            for i in padding:
+                wide_data[i::wide] = extension
+        data = bytes(wide_data)
+    code = _ARRAY_CODES.get(wide)
+    if code is not None:
+        items = array.array(code.lower() if signed else code)
+        if PY3:
+            items.frombytes(data)
+        else:
+            items.fromstring(data)
+        if byteorder != sys.byteorder:
+            items.byteswap()
+        values = items.tolist()
+    else:
+        values = struct.unpack(_struct_format(count, wide, byteorder, signed),
+                               data)
+    return values if PY3 else newints(values)
+
+
 # def _twos_comp(val, bits):
 #     """compute the 2's compliment of int value val"""
 #     if( (val&(1<<(bits-1))) != 0 ):
@@ -376,4 +606,5 @@ class newint(with_metaclass(BaseNewInt, long)):
 #     return val
 
 
-__all__ = ['newint']
+__all__ = ['newint', 'newints', 'newint_sum', 'ints_to_bytes',
+           'ints_from_bytes']
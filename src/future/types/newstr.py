@@ -44,7 +44,7 @@ from collections import Iterable
 from numbers import Number
 
 from future.utils import PY3, istext, with_metaclass, isnewbytes
-from future.types import no, issubset
+from future.types import no, issubset, disabled_method
 from future.types.newobject import newobject
 
 
@@ -173,8 +173,8 @@ class newstr(with_metaclass(BaseNewStr, unicode)):
     def replace(self, old, new, *args):
         return newstr(super(newstr, self).replace(old, new, *args))
 
-    def decode(self, *args):
-        raise AttributeError("decode method has been disabled in newstr")
+    # Hidden, so that hasattr(s, 'decode') is False, as on Py3
+    decode = disabled_method("decode method has been disabled in newstr")
 
     def encode(self, encoding='utf-8', errors='strict'):
         """
@@ -321,15 +321,6 @@ class newstr(with_metaclass(BaseNewStr, unicode)):
             raise TypeError(self.unorderable_err.format(type(other)))
         return super(newstr, self).__ge__(other)
 
-    def __getattribute__(self, name):
-        """
-        A trick to cause the ``hasattr`` builtin-fn to return False for
-        the 'decode' method on Py2.
-        """
-        if name in ['decode', u'decode']:
-            raise AttributeError("decode method has been disabled in newstr")
-        return super(newstr, self).__getattribute__(name)
-
     def __native__(self):
         """
         A hook for the future.utils.native() function.
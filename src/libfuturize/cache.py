@@ -0,0 +1,182 @@
+"""
+A persistent on-disk cache of refactoring results for ``futurize`` and
+``pasteurize``.
+
+Each entry is keyed by a hash of the source text together with everything
+else that can influence the output of the refactoring tool: the ``future``
+version, the selected fixers and the refactoring options. A file whose
+source, fixer set and options are unchanged since a previous run can then
+be skipped without parsing it again.
+
+Entries are stored as small JSON files, one per key, so that several
+processes (e.g. with ``futurize -j 4``) can read and write the cache
+concurrently without locking.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import hashlib
+import io
+import json
+import os
+import tempfile
+
+from future import __version__
+from future.utils import text_type
+
+
+# Bump this if the layout of the cache entries changes:
+CACHE_FORMAT = 1
+
+
+class CachedTree(object):
+    """
+    A stand-in for a refactored ``lib2to3`` tree that was loaded from the
+    cache. It supports just enough of the tree interface (``was_changed``
+    and ``str()``) for ``RefactoringTool.refactor_file()`` and
+    ``refactor_stdin()`` to process it like a freshly refactored tree.
+    """
+    def __init__(self, text, was_changed, messages=(), fixers=None):
+        self.text = text
+        self.was_changed = was_changed
+        self.messages = list(messages)
+        self.fixers = fixers    # names of the fixers that changed it
+
+    def __str__(self):
+        return self.text
+
+    __unicode__ = __str__
+
+
+class _Counter(object):
+    """
+    A trivial counter with the same interface as ``multiprocessing.Value``.
+    """
+    def __init__(self):
+        self.value = 0
+
+    def increment(self):
+        self.value += 1
+
+
+class _SharedCounter(object):
+    """
+    A counter that is shared with child processes forked by
+    ``MultiprocessRefactoringTool.refactor()``.
+    """
+    def __init__(self, value=0):
+        import multiprocessing
+        self._value = multiprocessing.Value('l', value)
+
+    @property
+    def value(self):
+        return self._value.value
+
+    def increment(self):
+        with self._value.get_lock():
+            self._value.value += 1
+
+
+class RefactoringCache(object):
+    """
+    Maps hashes of source texts to the output of the refactoring tool.
+
+    Usage::
+
+        >>> cache = RefactoringCache('.futurize-cache', fixer_names, options)
+        >>> key = cache.key(source)
+        >>> tree = cache.get(key)
+        >>> if tree is None:
+        ...     tree = rt.refactor_string(source, filename)
+        ...     cache.put(key, tree)
+    """
+    def __init__(self, cache_dir, fixer_names, options=None, explicit=()):
+        self.cache_dir = cache_dir
+        self.hits = _Counter()
+        self.misses = _Counter()
+        options = options or {}
+        signature = '\n'.join([
+            'format=%d' % CACHE_FORMAT,
+            'version=%s' % __version__,
+            'fixers=%s' % ','.join(sorted(fixer_names)),
+            'explicit=%s' % ','.join(sorted(explicit)),
+            'options=%s' % ','.join('%s=%r' % (k, options[k])
+                                    for k in sorted(options)),
+        ])
+        self._signature = hashlib.sha1(signature.encode('utf-8'))
+
+    def share_counters(self):
+        """
+        Makes the hit/miss counters visible across forked worker processes.
+        """
+        if not isinstance(self.hits, _SharedCounter):
+            self.hits = _SharedCounter(self.hits.value)
+            self.misses = _SharedCounter(self.misses.value)
+
+    def key(self, source, context=()):
+        """
+        Returns the cache key for the given source text. ``context`` is a
+        sequence of strings that describe anything else outside the source
+        text that the result depends on, e.g. the sibling modules of the
+        file for ``fix_absolute_import``.
+        """
+        h = self._signature.copy()
+        for item in context:
+            h.update(('context=%s\n' % item).encode('utf-8',
+                                                      'backslashreplace'))
+        h.update(source.encode('utf-8', 'backslashreplace'))
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + '.json')
+
+    def get(self, key, with_fixers=False):
+        """
+        Returns a ``CachedTree`` for the key, or None if there is no usable
+        entry for it. With ``with_fixers``, entries that don't record which
+        fixers changed the file are not usable.
+        """
+        try:
+            with io.open(self._path(key), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            tree = CachedTree(entry['text'], entry['changed'],
+                              entry['messages'], entry.get('fixers'))
+            if with_fixers and tree.fixers is None:
+                raise KeyError('fixers')
+        except (IOError, OSError, ValueError, KeyError, TypeError):
+            # Missing, unreadable or corrupt entry
+            self.misses.increment()
+            return None
+        self.hits.increment()
+        return tree
+
+    def put(self, key, tree, messages=(), fixers=None):
+        """
+        Stores the refactored tree under the given key, together with any
+        warnings the fixers logged while refactoring it and, if known, the
+        names of the fixers that changed it.
+        """
+        entry = {'changed': bool(tree.was_changed),
+                 'text': text_type(tree),
+                 'messages': list(messages),
+                 'fixers': fixers}
+        path = self._path(key)
+        dirname = os.path.dirname(path)
+        tmpname = None
+        try:
+            if not os.path.isdir(dirname):
+                os.makedirs(dirname)
+            fd, tmpname = tempfile.mkstemp(dir=dirname, suffix='.tmp')
+            with io.open(fd, 'w', encoding='utf-8') as f:
+                f.write(text_type(json.dumps(entry)))
+            os.rename(tmpname, path)
+        except (IOError, OSError):
+            # The cache is an optimization only: e.g. another process may
+            # have created the directory or entry first, or the cache
+            # directory may be read-only.
+            if tmpname is not None and os.path.exists(tmpname):
+                os.remove(tmpname)
+
+    def summary(self):
+        return 'Cache: {0} hits, {1} misses ({2})'.format(
+            self.hits.value, self.misses.value, self.cache_dir)
@@ -0,0 +1,144 @@
+"""
+A dispatch index for the fixers that ``lib2to3``'s bottom-up matcher cannot
+handle.
+
+``lib2to3.refactor.RefactoringTool`` drives all "BM-compatible" fixers with a
+single bottom-up pass over the leaves of each tree. The remaining fixers are
+matched node by node during a pre-order and a post-order traversal, using a
+dictionary from node types to fixers. A fixer whose pattern starts with a
+specific leaf, like ``'getfullargspec'``, is then tried on every ``NAME`` leaf
+in the module, and a fixer without a pattern is tried on every node.
+
+``FixerIndex`` refines this by also keying on leaf values. It is computed once
+per refactoring tool, when the fixers are loaded, so that a single traversal
+calls ``match()`` only on the fixers that can possibly match each node.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+from itertools import chain
+
+from lib2to3 import pygram, pytree
+
+
+class _EveryNode(Exception):
+    pass
+
+
+def _head_keys(pattern):
+    """
+    Returns the set of (type, value) pairs for the nodes that the given
+    compiled pattern can match first. The value is None if the pattern can
+    match a node of that type with any value (e.g. for any non-leaf node).
+    The type is None if the pattern matches a leaf of any type with the
+    given value (e.g. ``name='queue'``).
+
+    Raises _EveryNode if the pattern can match any node.
+
+    Like ``lib2to3.refactor._get_head_types()``, this errs on the side of
+    returning too many keys for wildcard patterns.
+    """
+    if isinstance(pattern, pytree.LeafPattern):
+        if pattern.type is None and pattern.content is None:
+            raise _EveryNode
+        return set([(pattern.type, pattern.content)])
+
+    if isinstance(pattern, pytree.NodePattern):
+        if pattern.type is None:
+            raise _EveryNode
+        return set([(pattern.type, None)])
+
+    if isinstance(pattern, pytree.NegatedPattern):
+        if pattern.content:
+            return _head_keys(pattern.content)
+        raise _EveryNode
+
+    if isinstance(pattern, pytree.WildcardPattern):
+        if pattern.content is None:
+            raise _EveryNode
+        keys = set()
+        for alternative in pattern.content:
+            for subpattern in alternative:
+                keys.update(_head_keys(subpattern))
+        return keys
+
+    raise _EveryNode
+
+
+def fixer_head_keys(fixer):
+    """
+    Returns the set of (type, value) pairs for the nodes that the fixer
+    can match, or None if it can match any node.
+    """
+    try:
+        if fixer.pattern:
+            return _head_keys(fixer.pattern)
+    except _EveryNode:
+        return None
+    if fixer._accept_type is not None:
+        return set([(fixer._accept_type, None)])
+    return None
+
+
+class FixerIndex(object):
+    """
+    Maps node types and leaf values to the list of fixers that can match
+    nodes with them. The fixers in each list keep their relative order from
+    the list passed in.
+
+    ``fixers_for(node)`` is a drop-in replacement for the ``fixers[node.type]``
+    lookup in ``RefactoringTool.traverse_by()``.
+    """
+    def __init__(self, fixers):
+        self.fixers = list(fixers)
+        every = []
+        by_type = {}     # type -> fixers that match any value of the type
+        by_leaf = {}     # (type, value) -> fixers that match only this value
+        for fixer in self.fixers:
+            keys = fixer_head_keys(fixer)
+            if keys is None:
+                every.append(fixer)
+                continue
+            for (node_type, value) in keys:
+                if value is None:
+                    by_type.setdefault(node_type, []).append(fixer)
+                elif node_type is None:
+                    # A leaf with this value, of any token type
+                    for token_type in pygram.python_grammar.tokens:
+                        by_leaf.setdefault((token_type, value),
+                                           []).append(fixer)
+                else:
+                    by_leaf.setdefault((node_type, value), []).append(fixer)
+
+        def ordered(*lists):
+            members = set(chain(*lists))
+            return [f for f in self.fixers if f in members and f not in every]
+
+        self._every = list(every)
+        self._by_type = {}
+        for node_type in chain(pygram.python_grammar.symbol2number.values(),
+                               pygram.python_grammar.tokens):
+            self._by_type[node_type] = (ordered(by_type.get(node_type, ())) +
+                                        self._every)
+        self._by_leaf = {}
+        for (node_type, value), leaf_fixers in by_leaf.items():
+            self._by_leaf[(node_type, value)] = (
+                ordered(by_type.get(node_type, ()), leaf_fixers) + self._every)
+
+    def __len__(self):
+        return len(self.fixers)
+
+    def __nonzero__(self):
+        return bool(self.fixers)
+
+    __bool__ = __nonzero__
+
+    def fixers_for(self, node):
+        """
+        Returns the list of fixers that can match the given node.
+        """
+        if isinstance(node, pytree.Leaf):
+            fixers = self._by_leaf.get((node.type, node.value))
+            if fixers is not None:
+                return fixers
+        return self._by_type.get(node.type, self._every)
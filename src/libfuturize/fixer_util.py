@@ -9,11 +9,13 @@ python-modernize licence: BSD (from python-modernize/LICENSE)
 """
 
 from lib2to3.fixer_util import (FromImport, Newline, is_import,
-                                find_root, does_tree_import, Comma)
+                                find_root, does_tree_import, Comma,
+                                _find, _is_import_binding)
 from lib2to3.pytree import Leaf, Node
 from lib2to3.pygram import python_symbols as syms, python_grammar
 from lib2to3.pygram import token
 from lib2to3.fixer_util import (Node, Call, Name, syms, Comma, Number)
+import operator
 import re
 
 
@@ -232,8 +234,9 @@ def future_import(feature, node):
     This seems to work
     """
     root = find_root(node)
+    index = import_index(root)
 
-    if does_tree_import(u"__future__", feature, node):
+    if index.imports(u"__future__", feature):
         return
 
     # Look for a shebang or encoding line
@@ -264,7 +267,9 @@ def future_import(feature, node):
         # End the __future__ import line with a newline and add a blank line
         # afterwards:
     children = [import_ , Newline()]
-    root.insert_child(idx, Node(syms.simple_stmt, children))
+    stmt = Node(syms.simple_stmt, children)
+    root.insert_child(idx, stmt)
+    index.inserted(stmt)
 
 
 def future_import2(feature, node):
@@ -272,8 +277,9 @@ def future_import2(feature, node):
     An alternative to future_import() which might not work ...
     """
     root = find_root(node)
+    index = import_index(root)
     
-    if does_tree_import(u"__future__", feature, node):
+    if index.imports(u"__future__", feature):
         return
 
     insert_pos = 0
@@ -297,7 +303,9 @@ def future_import2(feature, node):
     import_ = FromImport(u"__future__", [Leaf(token.NAME, feature, prefix=u" ")])
 
     children = [import_, Newline()]
-    root.insert_child(insert_pos, Node(syms.simple_stmt, children, prefix=prefix))
+    stmt = Node(syms.simple_stmt, children, prefix=prefix)
+    root.insert_child(insert_pos, stmt)
+    index.inserted(stmt)
 
 def parse_args(arglist, scheme):
     u"""
@@ -330,6 +338,170 @@ def is_import_stmt(node):
             is_import(node.children[0]))
 
 
+# Kinds of entries in an ImportIndex:
+_IMPORT, _STMT, _FOR, _BLOCK, _TRY = range(5)
+
+
+def _has_import(simple_stmt):
+    return any(is_import(small) for small in simple_stmt.children)
+
+
+def _same_children(node, snapshot):
+    children = node.children
+    return (len(children) == len(snapshot) and
+            all(map(operator.is_, children, snapshot)))
+
+
+class ImportIndex(object):
+    """
+    The statements of a tree that ``lib2to3.fixer_util.find_binding()``
+    looks at when it searches for an import from a package, i.e. the
+    ``from ... import ...`` statements at the top level and in the bodies
+    of top-level ``if``, ``while``, ``for`` and ``try`` statements, plus the
+    ``for`` loops (which find_binding() also counts).
+
+    ``does_tree_import(package, name, node)`` walks the whole module on each
+    call, and fixers such as fix_division_safe and fix_print_with_import call
+    it (through touch_import_top() and future_import()) for every node they
+    change, which is quadratic in the size of the module. ``imports()``
+    gives the same answer by looking only at the indexed statements.
+
+    The index is built the first time it is used for a tree, and
+    touch_import_top() and future_import() add the statements they insert.
+    Each lookup first checks that the indexed statements are still in place,
+    and rebuilds the index if another fixer has inserted, removed or
+    replaced any of them, or inserted or removed a top-level statement. (A
+    top-level statement without imports that is replaced by one with
+    imports is not noticed; no fixer does this.) Use ``import_index(node)``
+    to get the index of the tree a node belongs to.
+    """
+    def __init__(self, root):
+        self.root = root
+        self.builds = 0
+        self.build()
+
+    def build(self):
+        self._containers = []    # (node, snapshot of node.children) pairs
+        self._bodies = []        # (statement, index, body) triples
+        self._n_top = len(self.root.children)
+        self.entries = self._scan(self.root, watch=False)
+        self.builds += 1
+
+    def _scan(self, node, watch=True):
+        # Mirrors the traversal of lib2to3.fixer_util.find_binding()
+        if watch:
+            self._containers.append((node, list(node.children)))
+        entries = []
+        for child in node.children:
+            if child.type == syms.for_stmt:
+                body = self._scan_body(child, len(child.children) - 1)
+                entries.append((_FOR, child, [body]))
+            elif child.type in (syms.if_stmt, syms.while_stmt):
+                body = self._scan_body(child, len(child.children) - 1)
+                entries.append((_BLOCK, child, [body]))
+            elif child.type == syms.try_stmt:
+                bodies = [self._scan_body(child, 2)]
+                for i, kid in enumerate(child.children[3:]):
+                    if kid.type == token.COLON and kid.value == u":":
+                        bodies.append(self._scan_body(child, i + 4))
+                entries.append((_TRY, child, bodies))
+            elif child.type == syms.import_from:
+                entries.append((_IMPORT, child, None))
+            elif child.type == syms.simple_stmt and _has_import(child):
+                entries.append((_STMT, child, [self._scan(child)]))
+        return entries
+
+    def _scan_body(self, stmt, index):
+        # Only the body is watched: fixers often replace the other children
+        # of a compound statement (e.g. the test of an ``if``).
+        body = stmt.children[index]
+        self._bodies.append((stmt, index, body))
+        if body.type == syms.suite:
+            return self._scan(body)
+        # A one-line body, which find_binding() wraps in a suite
+        if body.type == syms.simple_stmt and _has_import(body):
+            return [(_STMT, body, [self._scan(body)])]
+        return []
+
+    def is_valid(self):
+        """
+        Returns whether the indexed statement lists are unchanged.
+        """
+        # The top level can have thousands of statements, so only its length
+        # and the indexed statements in it are checked.
+        root = self.root
+        if len(root.children) != self._n_top:
+            return False
+        for kind, node, bodies in self.entries:
+            if node.parent is not root:
+                return False
+        for node, snapshot in self._containers:
+            if not _same_children(node, snapshot):
+                return False
+        for stmt, index, body in self._bodies:
+            children = stmt.children
+            if len(children) <= index or children[index] is not body:
+                return False
+        return True
+
+    def inserted(self, stmt):
+        """
+        Records a statement that touch_import_top() or future_import() has
+        just inserted at the top level of the tree (after a lookup, so the
+        rest of the index is known to be valid).
+        """
+        self._n_top = len(self.root.children)
+        if is_import_stmt(stmt):
+            self.entries.append((_STMT, stmt, [self._scan(stmt)]))
+
+    def imports(self, package, name):
+        """
+        Equivalent to ``does_tree_import(package, name, self.root)`` for a
+        package other than None.
+        """
+        assert package is not None
+        if not self.is_valid():
+            self.build()
+        return bool(self._find_binding(self.entries, package, name))
+
+    def _find_binding(self, entries, package, name):
+        # The same logic as find_binding(), on the indexed statements only
+        for kind, node, suites in entries:
+            ret = None
+            if kind == _IMPORT:
+                ret = _is_import_binding(node, name, package)
+            elif kind == _STMT:
+                ret = self._find_binding(suites[0], package, name)
+            elif kind == _FOR:
+                if _find(name, node.children[1]):
+                    return node
+                ret = self._find_binding(suites[0], package, name)
+            elif kind == _BLOCK:
+                ret = self._find_binding(suites[0], package, name)
+            elif kind == _TRY:
+                ret = self._find_binding(suites[0], package, name)
+                if not ret:
+                    for suite in suites[1:]:
+                        n = self._find_binding(suite, package, name)
+                        if n:
+                            ret = n
+            if ret and is_import(ret):
+                return ret
+        return None
+
+
+def import_index(node):
+    """
+    Returns the ImportIndex of the tree that the node belongs to, creating
+    it if necessary.
+    """
+    root = find_root(node)
+    index = getattr(root, '_import_index', None)
+    if index is None:
+        index = root._import_index = ImportIndex(root)
+    return index
+
+
 def touch_import_top(package, name_to_import, node):
     """Works like `does_tree_import` but adds an import statement at the
     top if it was not imported (but below any __future__ imports) and below any
@@ -344,8 +516,12 @@ def touch_import_top(package, name_to_import, node):
     """
 
     root = find_root(node)
+    index = import_index(root)
 
-    if does_tree_import(package, name_to_import, root):
+    if package is None:
+        if does_tree_import(package, name_to_import, root):
+            return
+    elif index.imports(package, name_to_import):
         return
 
     # Ideally, we would look for whether futurize --all-imports has been run,
@@ -356,7 +532,7 @@ def touch_import_top(package, name_to_import, node):
     found = False
     for name in ['absolute_import', 'division', 'print_function',
                  'unicode_literals']:
-        if does_tree_import('__future__', name, root):
+        if index.imports('__future__', name):
             found = True
             break
     if found:
@@ -421,9 +597,13 @@ def touch_import_top(package, name_to_import, node):
     children_import = [import_, Newline()]
     old_prefix = root.children[insert_pos].prefix
     root.children[insert_pos].prefix = u''
-    root.insert_child(insert_pos, Node(syms.simple_stmt, children_import, prefix=old_prefix))
+    stmt = Node(syms.simple_stmt, children_import, prefix=old_prefix)
+    root.insert_child(insert_pos, stmt)
+    index.inserted(stmt)
     if len(children_hooks) > 0:
-        root.insert_child(insert_pos + 1, Node(syms.simple_stmt, children_hooks))
+        stmt = Node(syms.simple_stmt, children_hooks)
+        root.insert_child(insert_pos + 1, stmt)
+        index.inserted(stmt)
 
 
 ## The following functions are from python-modernize by Armin Ronacher:
@@ -17,7 +17,8 @@ becomes:
     from . import spam
 """
 
-from os.path import dirname, join, exists, sep
+import os
+from os.path import dirname, join, exists, isdir, sep, splitext
 from lib2to3.fixes.fix_import import FixImport
 from lib2to3.fixer_util import FromImport, syms
 from lib2to3.fixes.fix_import import traverse_imports
@@ -90,3 +91,24 @@ class FixAbsoluteImport(FixImport):
                 return True
         return False
 
+    def file_triggers(self, filename):
+        """
+        For ``libfuturize.prefilter``: returns the names of the modules that
+        an import in the given file could refer to as a local import, or
+        None if they can't be determined.
+        """
+        base_path = dirname(filename)
+        if not exists(join(base_path, "__init__.py")):
+            return frozenset()
+        try:
+            entries = os.listdir(base_path or os.curdir)
+        except OSError:
+            return None
+        names = set()
+        for entry in entries:
+            name, ext = splitext(entry)
+            if ext in [".py", ".pyc", ".so", ".sl", ".pyd", ".pyx"]:
+                names.add(name)
+            elif isdir(join(base_path, entry)):
+                names.add(entry)
+        return frozenset(names)
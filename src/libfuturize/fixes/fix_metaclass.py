@@ -156,6 +156,7 @@ def fixup_indent(suite):
 
 class FixMetaclass(fixer_base.BaseFix):
     BM_compatible = True
+    TRIGGERS = frozenset([u'__metaclass__'])
 
     PATTERN = """
     classdef<any*>
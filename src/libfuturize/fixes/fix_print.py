@@ -28,6 +28,7 @@ parend_expr = patcomp.compile_pattern(
 class FixPrint(fixer_base.BaseFix):
 
     BM_compatible = True
+    TRIGGERS = frozenset([u'print'])
 
     PATTERN = """
               simple_stmt< any* bare='print' any* > | print_stmt
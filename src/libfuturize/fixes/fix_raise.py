@@ -26,9 +26,12 @@ from lib2to3 import pytree, fixer_base
 from lib2to3.pgen2 import token
 from lib2to3.fixer_util import Name, Call, is_tuple
 
+from libfuturize.prefilter import PY2_RAISE
+
 class FixRaise(fixer_base.BaseFix):
 
     BM_compatible = True
+    TRIGGERS = frozenset([PY2_RAISE])
     PATTERN = """
     raise_stmt< 'raise' exc=any [',' val=any] >
     """
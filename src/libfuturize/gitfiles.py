@@ -0,0 +1,99 @@
+"""
+Support for ``futurize --since REV`` and ``pasteurize --since REV``: asks
+``git`` which Python files have changed since a revision, so that only
+those are refactored.
+
+A file counts as changed if its contents differ between the revision and the
+working tree (which includes committed, staged and unstaged changes), or if
+it is new and not ignored by git. Deleted files are left out. Only the
+output of ``git`` is used; the directories passed on the command line are
+not walked.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import os
+import subprocess
+import sys
+
+from future.utils import PY3
+
+
+class GitError(Exception):
+    """
+    Raised if ``git`` can't be run or fails, e.g. outside a git repository or
+    for an unknown revision.
+    """
+
+
+def _git(args, cwd=None):
+    try:
+        process = subprocess.Popen(['git'] + args, cwd=cwd,
+                                   stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE)
+    except OSError as e:
+        raise GitError('could not run git: {0}'.format(e))
+    stdout, stderr = process.communicate()
+    if process.returncode != 0:
+        message = stderr.decode('utf-8', 'replace').strip()
+        raise GitError(message or 'git {0} failed'.format(args[0]))
+    return stdout
+
+
+def _names(output):
+    # The output of git commands with -z: NUL-terminated paths
+    names = [name for name in output.split(b'\0') if name]
+    if PY3:
+        names = [name.decode(sys.getfilesystemencoding(), 'surrogateescape')
+                 for name in names]
+    return names
+
+
+def is_python_file(filename):
+    """
+    Returns whether ``RefactoringTool.refactor_dir()`` would refactor the
+    file: a ``.py`` file with no component starting with a dot.
+    """
+    if not filename.endswith('.py'):
+        return False
+    parts = os.path.normpath(filename).split(os.sep)
+    return not any(part.startswith('.') and part not in ('.', '..')
+                   for part in parts)
+
+
+def changed_files(rev, paths, cwd=None):
+    """
+    Returns the Python files under ``paths`` (files or directories) that
+    have changed since the git revision ``rev``, sorted.
+
+    Each file name starts with the path it was found under, as given, so
+    that ``--output-dir`` can mirror the layout of the input directories.
+    """
+    if cwd is None:
+        cwd = os.getcwd()
+    top = _git(['rev-parse', '--show-toplevel'], cwd).strip()
+    if PY3:
+        top = top.decode(sys.getfilesystemencoding(), 'surrogateescape')
+    top = os.path.realpath(top)
+    pathspecs = ['--'] + [os.path.join(cwd, path) for path in paths]
+    names = set(_names(_git(['diff', '--name-only', '-z', '--no-renames',
+                             '--diff-filter=ACMRT', rev] + pathspecs, cwd)))
+    names.update(_names(_git(['ls-files', '-z', '--full-name', '--others',
+                              '--exclude-standard'] + pathspecs, cwd)))
+
+    result = set()
+    roots = [(path, os.path.realpath(os.path.join(cwd, path)))
+             for path in paths]
+    for name in names:
+        full = os.path.join(top, *name.split('/'))
+        for path, root in roots:
+            if full == root:
+                # A file given on the command line
+                result.add(path)
+                break
+            if full.startswith(os.path.join(root, '')):
+                relative = os.path.relpath(full, root)
+                if is_python_file(relative):
+                    result.add(os.path.join(path, relative))
+                break
+    return sorted(result)
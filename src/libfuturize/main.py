@@ -70,13 +70,15 @@ import logging
 import optparse
 import os
 
-from lib2to3.main import main, warn, StdoutRefactoringTool
+from lib2to3.main import main, warn
 from lib2to3 import refactor
 
 from libfuturize.fixes import (lib2to3_fix_names_stage1,
                                lib2to3_fix_names_stage2,
                                libfuturize_fix_names_stage1,
                                libfuturize_fix_names_stage2)
+from libfuturize.gitfiles import GitError, changed_files
+from libfuturize.tool import FuturizeRefactoringTool
 
 fixer_pkg = 'libfuturize.fixes'
 
@@ -135,6 +137,41 @@ def main(args=None):
                       help="Append this string to all output filenames."
                       " Requires -n if non-empty. For Python >= 2.7 only."
                       "ex: --add-suffix='3' will generate .py3 files.")
+    parser.add_option("--cache-dir", action="store", type="str", default="",
+                      help="Cache refactoring results in this directory and "
+                      "skip files whose results are known from a previous "
+                      "run with the same fixers and options.")
+    parser.add_option("--prefilter", action="store_true",
+                      help="Tokenize each file first and skip parsing files "
+                      "that contain none of the names and operators the "
+                      "selected fixers look for.")
+    parser.add_option("--profile-fixers", action="store", type="choice",
+                      choices=["table", "json"], default=None,
+                      metavar="FORMAT",
+                      help="Report the time spent in each fixer, the number "
+                      "of nodes it was tried on and the number of matches, "
+                      "as a 'table' or as 'json'.")
+    parser.add_option("--profile-output", action="store", type="str",
+                      default=None, metavar="FILE",
+                      help="Write the --profile-fixers report to this file.")
+    parser.add_option("--check", action="store_true",
+                      help="Don't print diffs or write files; only report "
+                      "the files that would change. Exits with status 1 if "
+                      "any file would change and 2 on errors.")
+    parser.add_option("--fail-fast", action="store_true",
+                      help="With --check, stop at the first file that would "
+                      "change.")
+    parser.add_option("--report-jsonl", action="store", type="str",
+                      default=None, metavar="FILE",
+                      help="Write a JSON-lines report with one record per "
+                      "file (path, fixers applied, changed lines, time and "
+                      "errors) to FILE as each file is done. Use '-' for "
+                      "standard output; this turns off the diffs.")
+    parser.add_option("--since", action="store", type="str", default=None,
+                      metavar="REV",
+                      help="Only refactor the Python files that have changed "
+                      "since the git revision REV (including uncommitted "
+                      "changes and new files).")
 
     # Parse command line arguments
     flags = {}
@@ -153,7 +190,17 @@ def main(args=None):
     if options.add_suffix and not options.nobackups:
         parser.error("Can't use --add-suffix without -n.")
 
-    if not options.write and options.no_diffs:
+    if options.check and options.write:
+        parser.error("Can't use --check with -w or -W")
+    if options.fail_fast and not options.check:
+        parser.error("Can't use --fail-fast without --check")
+    if options.since and "-" in args:
+        parser.error("Can't use --since with stdin")
+    if options.report_jsonl == "-":
+        # Keep standard output machine-readable
+        options.no_diffs = True
+    if (not options.write and options.no_diffs and not options.check
+            and not options.report_jsonl):
         warn("not writing files and not printing diffs; that's not very useful")
     if not options.write and options.nobackups:
         parser.error("Can't use -n without -w")
@@ -288,6 +335,16 @@ def main(args=None):
         logger.info('Output in %r will mirror the input directory %r layout.',
                     options.output_dir, input_base_dir)
 
+    if options.since:
+        # Only the changed files; the directories are not walked
+        try:
+            args = changed_files(options.since, args)
+        except GitError as e:
+            print("futurize: --since: {0}".format(e), file=sys.stderr)
+            return 2
+        logger.info('%d Python files changed since %s', len(args),
+                    options.since)
+
     # Initialize the refactoring tool
     if future.utils.PY26:
         extra_kwargs = {}
@@ -298,9 +355,17 @@ def main(args=None):
                         'input_base_dir': input_base_dir,
                        }
 
-    rt = StdoutRefactoringTool(
+    rt = FuturizeRefactoringTool(
             sorted(fixer_names), flags, sorted(explicit),
-            options.nobackups, not options.no_diffs,
+            options.nobackups,
+            not (options.no_diffs or options.check),
+            cache_dir=options.cache_dir,
+            prefilter=options.prefilter,
+            profile_fixers=options.profile_fixers,
+            profile_output=options.profile_output,
+            check=options.check,
+            fail_fast=options.fail_fast,
+            report_output=options.report_jsonl,
             **extra_kwargs)
 
     # Refactor all files and directories passed as arguments
@@ -318,5 +383,11 @@ def main(args=None):
                 return 1
         rt.summarize()
 
+    if options.check:
+        # 0: no changes needed; 1: some files would change; 2: errors
+        if rt.errors:
+            return 2
+        return int(bool(rt.files))
+
     # Return error status (0 if rt.errors is zero)
     return int(bool(rt.errors))
@@ -0,0 +1,169 @@
+"""
+A persistent cache of compiled fixer patterns, to cut the startup time of
+``futurize`` and ``pasteurize``.
+
+When a refactoring tool is created, every fixer compiles its ``PATTERN``
+string with ``lib2to3``'s pattern compiler, and ``lib2to3``'s bottom-up
+matcher reduces each pattern tree to a linear path. For a run on one or two
+files (e.g. in a pre-commit hook), this takes longer than the refactoring
+itself.
+
+``PatternCache`` stores the results in a single pickle file, keyed by the
+pattern strings. The file is versioned by ``PATTERN_CACHE_FORMAT``, the
+``future`` version and the Python version (which determines the ``lib2to3``
+grammar). It is read the first time a pattern is looked up, and each entry
+is unpickled only when it is used.
+
+The cache is only used while ``with patterns_from(cache):`` is active, e.g.
+around the creation of a ``lib2to3.refactor.RefactoringTool``.
+
+As with any pickle file, the cache must not be writable by anyone you don't
+trust.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import contextlib
+import os
+import pickle
+import sys
+import tempfile
+
+from lib2to3 import btm_matcher, fixer_base
+from lib2to3.btm_utils import reduce_tree
+from lib2to3.patcomp import PatternCompiler
+
+from future import __version__
+
+
+# Bump this if the layout of the cache file changes:
+PATTERN_CACHE_FORMAT = 1
+
+
+class PatternCache(object):
+    """
+    Maps pattern strings to their compiled patterns, pattern trees and the
+    linear paths used by the bottom-up matcher.
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        self.version = (PATTERN_CACHE_FORMAT, __version__,
+                        tuple(sys.version_info[:2]))
+        self._entries = None      # pattern -> pickled (pattern, tree)
+        self._linear = None       # pattern -> pickled linear path
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+
+    def _load(self):
+        if self._entries is not None:
+            return
+        self._entries, self._linear = {}, {}
+        try:
+            with open(self.filename, 'rb') as f:
+                version, entries, linear = pickle.load(f)
+        except Exception:
+            # Missing, unreadable or corrupt cache file
+            return
+        if version == self.version:
+            self._entries, self._linear = entries, linear
+
+    def compiled(self, pattern):
+        """
+        Returns the (compiled pattern, pattern tree) pair for the pattern
+        string, or None if it isn't cached.
+        """
+        self._load()
+        try:
+            result = pickle.loads(self._entries[pattern])
+        except KeyError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result
+
+    def add_compiled(self, pattern, result):
+        self._load()
+        self._entries[pattern] = pickle.dumps(result, -1)
+        self.dirty = True
+
+    def linear(self, pattern):
+        """
+        Returns the linear path of the pattern string for the bottom-up
+        matcher, or None if it isn't cached.
+        """
+        self._load()
+        try:
+            return pickle.loads(self._linear[pattern])
+        except KeyError:
+            return None
+
+    def add_linear(self, pattern, linear):
+        self._load()
+        self._linear[pattern] = pickle.dumps(linear, -1)
+        self.dirty = True
+
+    def save(self):
+        """
+        Writes the cache file if there are new entries. Errors are ignored:
+        the cache is only an optimization.
+        """
+        if not self.dirty:
+            return
+        dirname = os.path.dirname(self.filename) or os.curdir
+        try:
+            if not os.path.isdir(dirname):
+                os.makedirs(dirname)
+            fd, tmp = tempfile.mkstemp(dir=dirname, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump((self.version, self._entries, self._linear), f,
+                            -1)
+            if os.path.exists(self.filename) and os.name == 'nt':
+                os.remove(self.filename)
+            os.rename(tmp, self.filename)
+        except (IOError, OSError):
+            return
+        self.dirty = False
+
+
+def _caching_pattern_compiler(cache):
+    class CachingPatternCompiler(PatternCompiler):
+        def compile_pattern(self, input, debug=False, with_tree=False):
+            result = cache.compiled(input)
+            if result is None:
+                result = super(CachingPatternCompiler, self).compile_pattern(
+                    input, debug, with_tree=True)
+                cache.add_compiled(input, result)
+            return result if with_tree else result[0]
+    return CachingPatternCompiler
+
+
+def _caching_bottom_matcher(cache):
+    class CachingBottomMatcher(btm_matcher.BottomMatcher):
+        def add_fixer(self, fixer):
+            # Like BottomMatcher.add_fixer(), but with a cached linear path
+            self.fixers.append(fixer)
+            linear = cache.linear(fixer.PATTERN)
+            if linear is None:
+                linear = reduce_tree(fixer.pattern_tree).get_linear_subpattern()
+                cache.add_linear(fixer.PATTERN, linear)
+            for match_node in self.add(linear, start=self.root):
+                match_node.fixers.append(fixer)
+    return CachingBottomMatcher
+
+
+@contextlib.contextmanager
+def patterns_from(cache):
+    """
+    Makes the fixers and bottom-up matchers created in this context look up
+    their patterns in the given ``PatternCache``, and saves any new entries
+    at the end.
+    """
+    saved = fixer_base.PatternCompiler, btm_matcher.BottomMatcher
+    fixer_base.PatternCompiler = _caching_pattern_compiler(cache)
+    btm_matcher.BottomMatcher = _caching_bottom_matcher(cache)
+    try:
+        yield cache
+    finally:
+        fixer_base.PatternCompiler, btm_matcher.BottomMatcher = saved
+    cache.save()
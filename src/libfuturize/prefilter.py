@@ -0,0 +1,292 @@
+"""
+A token-level pre-filter for ``futurize`` and ``pasteurize``.
+
+Building a ``lib2to3`` parse tree is the most expensive step of refactoring a
+file that needs no changes. Before parsing, the pre-filter tokenizes the
+source and checks whether it contains any of the *trigger* tokens of the
+selected fixers. If none appears, no fixer can match and the parse is
+skipped.
+
+A fixer's triggers are a set of token strings, at least one of which appears
+in any source code the fixer can change. For example, the triggers of
+``libfuturize.fixes.fix_xrange_with_import`` are ``{'xrange'}``. Fixers can
+declare them with a ``TRIGGERS`` class attribute::
+
+    class FixXrangeWithImport(fixer_base.BaseFix):
+        TRIGGERS = frozenset(['xrange'])
+
+Otherwise they are derived from the fixer's ``PATTERN`` where possible (see
+``pattern_triggers()``), or looked up in ``LIB2TO3_TRIGGERS`` for the
+``lib2to3`` fixers that have no pattern. A fixer with ``TRIGGERS = None``, or
+whose triggers cannot be determined, disables the pre-filter: every file is
+then parsed.
+
+Besides the strings of NAME and operator tokens, the scan produces these
+pseudo-tokens for Python 2 constructs that aren't identified by a single
+token:
+
+- ``PY2_NUMBER``: a Python 2-only number literal, like ``10L`` or ``0755``
+- ``EXCEPT_COMMA``: an ``except`` clause like ``except ValueError, e:``
+- ``PY2_RAISE``: a ``raise`` statement like ``raise E, V``, ``raise (E, F)``
+  or ``raise 'message'``
+- ``COMP_TUPLE``: a comprehension over an unparenthesized tuple, like
+  ``[x for x in 1, 2]``
+- ``TUPLE_PARAMS``: a bracket inside the parameters of a ``def``, or a
+  bracket right after ``lambda``, as in ``def f(a, (b, c)):``
+
+Some fixers can only change a module depending on the files next to it
+(e.g. ``fix_absolute_import``). They can define a ``file_triggers(filename)``
+method instead, which returns the triggers for the given file, or None.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import io
+import keyword
+import re
+
+from lib2to3 import pytree
+from lib2to3.pgen2 import token, tokenize
+
+from libfuturize.cache import _Counter, _SharedCounter
+
+
+#: A Python 2-only number literal, like ``10L`` or ``0755``
+PY2_NUMBER = '<py2 number>'
+#: A Python 2-only exception clause, like ``except ValueError, e:``
+EXCEPT_COMMA = '<except comma>'
+#: A Python 2-only raise statement, like ``raise E, V``, ``raise (E, F)`` or
+#: ``raise 'message'``
+PY2_RAISE = '<py2 raise>'
+#: A comprehension over an unparenthesized tuple, like ``[x for x in 1, 2]``
+COMP_TUPLE = '<comprehension tuple>'
+#: A possible Python 2-only tuple parameter, like ``def f(a, (b, c)):``
+TUPLE_PARAMS = '<tuple parameters>'
+
+
+# Triggers for the lib2to3 fixers that have no PATTERN, or whose PATTERN also
+# matches code that they leave unchanged:
+LIB2TO3_TRIGGERS = {
+    'lib2to3.fixes.fix_except': frozenset([EXCEPT_COMMA]),
+    'lib2to3.fixes.fix_exitfunc': frozenset(['exitfunc']),
+    'lib2to3.fixes.fix_ne': frozenset(['<>']),
+    'lib2to3.fixes.fix_numliterals': frozenset([PY2_NUMBER]),
+    'lib2to3.fixes.fix_paren': frozenset([COMP_TUPLE]),
+    'lib2to3.fixes.fix_renames': frozenset(['maxint']),
+    'lib2to3.fixes.fix_sys_exc': frozenset(['exc_type', 'exc_value',
+                                            'exc_traceback']),
+    'lib2to3.fixes.fix_tuple_params': frozenset([TUPLE_PARAMS]),
+}
+
+# Tokens that appear in almost every module, and so make poor triggers:
+_COMMON = frozenset(keyword.kwlist + ['print', 'exec'])
+
+
+_py2_number = re.compile(r'(.*[lL]$)|(0+[0-9]+$)')
+
+
+def source_tokens(source):
+    """
+    Returns the set of token strings (and pseudo-tokens) in the source text,
+    or None if the source cannot be tokenized.
+    """
+    found = set()
+    depth = 0              # number of open brackets
+    except_depth = None    # depth of the current "except" clause, if any
+    raise_depth = None     # depth of the current "raise" statement, if any
+    def_depth = None       # depth inside the current "def" parameters
+    comprehensions = {}    # depth -> last keyword of a comprehension there
+    previous = None
+    if isinstance(source, bytes):
+        # E.g. a native str on Py2
+        source = source.decode('utf-8', 'replace')
+    readline = io.StringIO(source).readline
+    try:
+        for (tok_type, value, _, _, _) in tokenize.generate_tokens(readline):
+            if tok_type == token.NAME:
+                found.add(value)
+                if value == 'except':
+                    except_depth = depth
+                elif value == 'raise':
+                    raise_depth = depth
+                elif value == 'for' and depth > 0:
+                    comprehensions[depth] = 'for'
+                elif value == 'in' and comprehensions.get(depth) == 'for':
+                    comprehensions[depth] = 'in'
+                elif value == 'if':
+                    comprehensions.pop(depth, None)
+                elif value == 'def':
+                    def_depth = depth
+            elif tok_type == token.OP:
+                found.add(value)
+                if value in '([{':
+                    if previous == 'raise' and value == '(':
+                        found.add(PY2_RAISE)
+                    if previous == 'lambda' or (def_depth is not None and
+                                                depth > def_depth):
+                        found.add(TUPLE_PARAMS)
+                    depth += 1
+                elif value in ')]}':
+                    comprehensions.pop(depth, None)
+                    depth -= 1
+                elif value == ':':
+                    if depth == except_depth:
+                        except_depth = None
+                    if depth == def_depth:
+                        def_depth = None
+                elif value == ',':
+                    if depth == except_depth:
+                        found.add(EXCEPT_COMMA)
+                        except_depth = None
+                    if depth == raise_depth:
+                        found.add(PY2_RAISE)
+                        raise_depth = None
+                    if comprehensions.get(depth) == 'in':
+                        found.add(COMP_TUPLE)
+                elif value == ';' and depth == raise_depth:
+                    raise_depth = None
+            elif tok_type == token.NEWLINE:
+                raise_depth = None
+            elif tok_type == token.NUMBER:
+                if _py2_number.match(value):
+                    found.add(PY2_NUMBER)
+            elif tok_type == token.STRING:
+                if previous == 'raise':
+                    # A string exception, which fix_raise warns about
+                    found.add(PY2_RAISE)
+            previous = value
+    except (tokenize.TokenError, IndentationError):
+        return None
+    return found
+
+
+def _sequence_triggers(patterns):
+    """
+    Returns triggers for a sequence of patterns that must all match, i.e. a
+    trigger set of any one of them. Prefers the smallest set of uncommon
+    names.
+    """
+    candidates = []
+    for pattern in patterns:
+        triggers = pattern_triggers(pattern)
+        if triggers is not None:
+            candidates.append(triggers)
+    if not candidates:
+        return None
+
+    def selectivity(triggers):
+        # Keywords and punctuation such as '(' or ',' appear in almost
+        # every module, so prefer sets that consist of other names.
+        common = any(t in _COMMON or not (t[:1].isalpha() or t[:1] == '_')
+                     for t in triggers)
+        return (common, len(triggers))
+    return min(candidates, key=selectivity)
+
+
+def pattern_triggers(pattern):
+    """
+    Returns a set of token strings, at least one of which is contained in
+    any node matched by the compiled ``lib2to3`` pattern, or None if there
+    is no such set (e.g. the pattern ``any``).
+    """
+    if isinstance(pattern, pytree.LeafPattern):
+        if pattern.content is None:
+            return None
+        return frozenset([pattern.content])
+
+    if isinstance(pattern, pytree.NodePattern):
+        if pattern.content is None:
+            return None
+        return _sequence_triggers(pattern.content)
+
+    if isinstance(pattern, pytree.WildcardPattern):
+        if pattern.content is None or pattern.min == 0:
+            return None
+        triggers = set()
+        for alternative in pattern.content:
+            alt_triggers = _sequence_triggers(alternative)
+            if alt_triggers is None:
+                return None
+            triggers.update(alt_triggers)
+        return frozenset(triggers)
+
+    # NegatedPattern etc.
+    return None
+
+
+def fixer_triggers(fixer, fixer_name=None):
+    """
+    Returns the triggers of a fixer instance, or None if it can't be skipped
+    based on the tokens in a module.
+    """
+    if hasattr(fixer, 'TRIGGERS'):
+        return fixer.TRIGGERS
+    if fixer_name in LIB2TO3_TRIGGERS:
+        return LIB2TO3_TRIGGERS[fixer_name]
+    if fixer.pattern is not None:
+        return pattern_triggers(fixer.pattern)
+    return None
+
+
+class PreFilter(object):
+    """
+    Decides from the tokens of a module whether any of the given fixers can
+    change it.
+
+    ``fixers`` is a sequence of (fixer name, fixer instance) pairs.
+    """
+    def __init__(self, fixers):
+        self.triggers = set()
+        self.file_fixers = []  # fixers with a file_triggers() method
+        self.unfiltered = []   # names of fixers that disable the pre-filter
+        for (name, fixer) in fixers:
+            if hasattr(fixer, 'file_triggers'):
+                self.file_fixers.append(fixer)
+                continue
+            triggers = fixer_triggers(fixer, name)
+            if triggers is None:
+                self.unfiltered.append(name)
+            else:
+                self.triggers.update(triggers)
+        self.triggers = frozenset(self.triggers)
+        self.checked = _Counter()
+        self.skipped = _Counter()
+
+    @property
+    def enabled(self):
+        return not self.unfiltered
+
+    def share_counters(self):
+        """
+        Makes the statistics visible across forked worker processes.
+        """
+        if not isinstance(self.checked, _SharedCounter):
+            self.checked = _SharedCounter(self.checked.value)
+            self.skipped = _SharedCounter(self.skipped.value)
+
+    def can_skip(self, source, filename=None):
+        """
+        Returns True if no fixer can change the given source text, which was
+        read from the given file.
+        """
+        if not self.enabled:
+            return False
+        self.checked.increment()
+        triggers = self.triggers
+        for fixer in self.file_fixers:
+            file_triggers = fixer.file_triggers(filename)
+            if file_triggers is None:
+                return False
+            triggers = triggers.union(file_triggers)
+        tokens = source_tokens(source)
+        if tokens is None or not triggers.isdisjoint(tokens):
+            return False
+        self.skipped.increment()
+        return True
+
+    def summary(self):
+        if not self.enabled:
+            return ('Pre-filter disabled by fixers without triggers: ' +
+                    ', '.join(sorted(self.unfiltered)))
+        return ('Pre-filter: {0} of {1} files skipped without parsing'
+                .format(self.skipped.value, self.checked.value))
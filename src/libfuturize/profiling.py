@@ -0,0 +1,149 @@
+"""
+Per-fixer profiling for ``futurize --profile-fixers`` and ``pasteurize
+--profile-fixers``.
+
+``FixerProfiler.instrument(fixer)`` wraps the ``match()`` and
+``transform()`` methods of a fixer instance to record, for each fixer:
+
+- ``nodes``: the number of nodes it was tried on (calls to ``match()``)
+- ``matches``: the number of those nodes it matched
+- ``match_time`` and ``transform_time``: the wall time spent in ``match()``
+  and ``transform()``, in seconds
+
+The time spent in helpers such as ``libfuturize.fixer_util.touch_import_top``
+counts towards the ``transform_time`` of the fixer that calls them. The time
+spent parsing and in ``lib2to3``'s bottom-up matcher (which finds the
+candidate nodes for most fixers in one pass) is recorded separately.
+
+The report is available as a table or as JSON.
+"""
+
+from __future__ import absolute_import, division, unicode_literals
+
+import json
+from timeit import default_timer
+
+
+# Indices into the per-fixer lists of statistics:
+NODES, MATCHES, MATCH_TIME, TRANSFORM_TIME = range(4)
+FIELDS = ('nodes', 'matches', 'match_time', 'transform_time')
+
+
+class FixerProfiler(object):
+    """
+    Collects the statistics for a set of fixers, and for the parser and the
+    bottom-up matcher of a refactoring tool.
+
+    The statistics are plain dicts and lists, so that worker processes can
+    send them to the parent with ``take()`` and ``merge()``.
+    """
+    def __init__(self):
+        self.fixers = {}    # fixer name -> [nodes, matches, times...]
+        self.other = {'parse_time': 0.0, 'bottom_matcher_time': 0.0,
+                      'files': 0}
+
+    def _entry(self, name):
+        if name not in self.fixers:
+            self.fixers[name] = [0, 0, 0.0, 0.0]
+        return self.fixers[name]
+
+    def instrument(self, fixer, name=None):
+        """
+        Replaces the ``match()`` and ``transform()`` methods of the fixer
+        instance with timed versions.
+        """
+        entry = self._entry(name or type(fixer).__module__)
+        match = fixer.match
+        transform = fixer.transform
+
+        def timed_match(node):
+            start = default_timer()
+            try:
+                results = match(node)
+            finally:
+                entry[MATCH_TIME] += default_timer() - start
+            entry[NODES] += 1
+            if results:
+                entry[MATCHES] += 1
+            return results
+
+        def timed_transform(node, results):
+            start = default_timer()
+            try:
+                return transform(node, results)
+            finally:
+                entry[TRANSFORM_TIME] += default_timer() - start
+
+        fixer.match = timed_match
+        fixer.transform = timed_transform
+
+    def timed(self, key, function):
+        """
+        Returns a wrapper of ``function`` that adds its wall time to the
+        statistic ``key`` (e.g. ``'parse_time'``).
+        """
+        def wrapper(*args, **kwargs):
+            start = default_timer()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.other[key] += default_timer() - start
+        return wrapper
+
+    def take(self):
+        """
+        Returns the statistics collected so far and resets them.
+        """
+        result = (dict((name, list(entry))
+                       for name, entry in self.fixers.items()),
+                  dict(self.other))
+        for entry in self.fixers.values():
+            entry[:] = [0, 0, 0.0, 0.0]
+        for key in self.other:
+            self.other[key] = type(self.other[key])()
+        return result
+
+    def merge(self, stats):
+        """
+        Adds statistics returned by ``take()``.
+        """
+        fixers, other = stats
+        for name, values in fixers.items():
+            entry = self._entry(name)
+            for i, value in enumerate(values):
+                entry[i] += value
+        for key, value in other.items():
+            self.other[key] += value
+
+    def rows(self):
+        """
+        Returns (name, nodes, matches, match_time, transform_time) tuples,
+        sorted by decreasing total time.
+        """
+        rows = [(name,) + tuple(entry) for name, entry in self.fixers.items()]
+        rows.sort(key=lambda row: (-(row[3] + row[4]), row[0]))
+        return rows
+
+    def table(self):
+        """
+        Returns the report as a list of lines of text.
+        """
+        lines = ['{0:<52} {1:>9} {2:>8} {3:>9} {4:>10}'.format(
+            'fixer', 'nodes', 'matches', 'match(s)', 'transf.(s)')]
+        for name, nodes, matches, match_time, transform_time in self.rows():
+            lines.append('{0:<52} {1:>9} {2:>8} {3:>9.3f} {4:>10.3f}'.format(
+                name, nodes, matches, match_time, transform_time))
+        lines.append('Parsing: {0:.3f}s; bottom-up matcher: {1:.3f}s; '
+                     '{2} files'.format(self.other['parse_time'],
+                                        self.other['bottom_matcher_time'],
+                                        self.other['files']))
+        return lines
+
+    def to_json(self):
+        """
+        Returns the report as a JSON string.
+        """
+        report = dict(self.other)
+        report['fixers'] = dict((row[0], dict(zip(FIELDS, row[1:])))
+                                for row in self.rows())
+        return json.dumps(report, indent=2, sort_keys=True)
@@ -0,0 +1,84 @@
+"""
+A machine-readable report of a ``futurize`` or ``pasteurize`` run, for
+``--report-jsonl FILE``.
+
+The report has one JSON object per line, written as soon as each file is
+done (so it can be read while the run is going on), with these keys:
+
+- ``path``: the file name, as passed to the refactoring tool
+- ``changed``: whether the refactored text differs from the original
+- ``fixers``: the sorted names of the fixers that changed the file
+- ``lines``: the changed regions, as ``[old_start, old_count, new_start,
+  new_count]`` lists like the ``@@`` headers of a unified diff without
+  context lines (line numbers start at 1; a count of 0 means lines were only
+  added or only removed)
+- ``time``: the wall time spent on the file, in seconds
+- ``errors``: the error messages for the file, if any
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import difflib
+import io
+import json
+import sys
+
+
+def changed_lines(old_text, new_text):
+    """
+    Returns the changed regions between two texts as a list of
+    ``[old_start, old_count, new_start, new_count]`` lists.
+    """
+    old_lines = old_text.splitlines(True)
+    new_lines = new_text.splitlines(True)
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines,
+                                      autojunk=False)
+    regions = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            continue
+        # As in diff, an empty range starts at the line before it
+        regions.append([i1 + 1 if i2 > i1 else i1, i2 - i1,
+                        j1 + 1 if j2 > j1 else j1, j2 - j1])
+    return regions
+
+
+class JSONLinesReport(object):
+    """
+    Writes one JSON record per file to ``filename``, or to standard output
+    if it is ``'-'``. The file is created at the first record, or by
+    ``close()`` if there are none.
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        self._stream = None
+        self.records = 0
+        self.closed = False
+
+    def _open(self):
+        if self._stream is None:
+            if self.filename == '-':
+                self._stream = sys.stdout
+            else:
+                self._stream = io.open(self.filename, 'w', encoding='utf-8')
+        return self._stream
+
+    def write(self, path, changed, fixers, lines, seconds, errors):
+        record = {'path': path, 'changed': bool(changed),
+                  'fixers': sorted(fixers), 'lines': lines,
+                  'time': round(seconds, 6), 'errors': list(errors)}
+        line = json.dumps(record, sort_keys=True)
+        if not isinstance(line, type('')):
+            line = line.decode('utf-8')    # Python 2
+        stream = self._open()
+        stream.write(line + '\n')
+        stream.flush()
+        self.records += 1
+
+    def close(self):
+        if self.closed:
+            return
+        if self._open() is not sys.stdout:
+            self._stream.close()
+        self._stream = None
+        self.closed = True
@@ -0,0 +1,127 @@
+"""
+A work-stealing scheduler for refactoring files in several processes
+(``futurize -j N`` and ``pasteurize -j N``).
+
+``lib2to3``'s ``MultiprocessRefactoringTool`` puts the files in a queue in
+the order in which they are found. A single large module near the end of the
+run then keeps one worker busy while all the others are idle.
+
+Here the files are sorted by size, largest first, and dealt out to the
+workers so that each one starts with about the same number of bytes. Each
+worker takes files from the front of its own list. A worker whose list is
+empty steals a file from the back of the list of the worker with the most
+remaining files. Results are sent back to the parent process as soon as each
+file is done, together with the time it took, so the parent can report the
+slowest files and how busy each worker was.
+"""
+
+from __future__ import absolute_import, division, unicode_literals
+
+import heapq
+import os
+
+
+def assign(sizes, n_workers):
+    """
+    Deals the tasks with the given sizes out to ``n_workers`` lists, largest
+    first, each to the worker with the smallest total so far. Returns a list
+    of lists of task indices, each sorted by decreasing size.
+    """
+    order = sorted(range(len(sizes)), key=lambda i: -sizes[i])
+    assignments = [[] for _ in range(n_workers)]
+    heap = [(0, worker) for worker in range(n_workers)]
+    for i in order:
+        total, worker = heapq.heappop(heap)
+        assignments[worker].append(i)
+        heapq.heappush(heap, (total + sizes[i], worker))
+    return assignments
+
+
+def file_size(filename):
+    try:
+        return os.path.getsize(filename)
+    except OSError:
+        return 0
+
+
+class WorkStealingQueue(object):
+    """
+    Per-worker lists of task indices in shared memory, for processes forked
+    after it is created.
+
+    ``take(worker)`` returns the next task from the front of the worker's own
+    list, or steals one from the back of the longest other list. It returns
+    None when no tasks are left.
+    """
+    def __init__(self, assignments):
+        import multiprocessing
+        tasks = []
+        heads = []
+        tails = []
+        for worker_tasks in assignments:
+            heads.append(len(tasks))
+            tasks.extend(worker_tasks)
+            tails.append(len(tasks))
+        self._lock = multiprocessing.Lock()
+        self._tasks = multiprocessing.Array('l', tasks or [0], lock=False)
+        self._heads = multiprocessing.Array('l', heads, lock=False)
+        self._tails = multiprocessing.Array('l', tails, lock=False)
+        self.steals = multiprocessing.Value('l', 0, lock=False)
+
+    def take(self, worker):
+        with self._lock:
+            if self._heads[worker] < self._tails[worker]:
+                task = self._tasks[self._heads[worker]]
+                self._heads[worker] += 1
+                return task
+            remaining = [self._tails[w] - self._heads[w]
+                         for w in range(len(self._heads))]
+            victim = max(range(len(remaining)), key=remaining.__getitem__)
+            if remaining[victim] == 0:
+                return None
+            self._tails[victim] -= 1
+            self.steals.value += 1
+            return self._tasks[self._tails[victim]]
+
+
+class PoolStats(object):
+    """
+    Timings collected by the parent process during a run with several worker
+    processes.
+    """
+    def __init__(self, n_workers):
+        self.n_workers = n_workers
+        self.file_times = []             # (seconds, filename) pairs
+        self.busy = [0.0] * n_workers    # seconds spent on files per worker
+        self.counts = [0] * n_workers
+        self.wall_time = 0.0
+        self.steals = 0
+
+    def add(self, worker, filename, seconds):
+        self.file_times.append((seconds, filename))
+        self.busy[worker] += seconds
+        self.counts[worker] += 1
+
+    def slowest(self, n=5):
+        """
+        Returns the ``n`` slowest (seconds, filename) pairs, slowest first.
+        """
+        return heapq.nlargest(n, self.file_times)
+
+    def report(self, n_slowest=5):
+        """
+        Returns a list of lines summarizing the run.
+        """
+        lines = ['Slowest files:']
+        for seconds, filename in self.slowest(n_slowest):
+            lines.append('  {0:8.3f}s  {1}'.format(seconds, filename))
+        lines.append('Worker utilisation ({0:.3f}s wall time, {1} files '
+                     'stolen):'.format(self.wall_time, self.steals))
+        for worker in range(self.n_workers):
+            if self.wall_time > 0:
+                utilisation = 100.0 * self.busy[worker] / self.wall_time
+            else:
+                utilisation = 0.0
+            lines.append('  worker {0}: {1:5.1f}% busy, {2} files'.format(
+                worker, utilisation, self.counts[worker]))
+        return lines
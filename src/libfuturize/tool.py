@@ -0,0 +1,527 @@
+"""
+The refactoring tool used by both ``futurize`` and ``pasteurize``.
+
+This extends ``lib2to3``'s ``StdoutRefactoringTool`` with features that are
+useful when converting large code bases, such as a persistent cache of
+refactoring results (see ``libfuturize.cache``), a token-level pre-filter
+that skips parsing files no fixer can change (see ``libfuturize.prefilter``),
+a finer-grained dispatch index for the fixers that are matched node by node
+(see ``libfuturize.dispatch``), a work-stealing scheduler for refactoring
+files in several processes (see ``libfuturize.scheduler``), per-fixer
+profiling (see ``libfuturize.profiling``) and a JSON-lines report with one
+record per file (see ``libfuturize.report``).
+"""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import io
+import os
+import time
+from itertools import chain
+
+from lib2to3.main import StdoutRefactoringTool
+from lib2to3.refactor import MultiprocessingUnsupported
+
+from libfuturize.cache import CachedTree, RefactoringCache
+from libfuturize.dispatch import FixerIndex
+from libfuturize.patcache import PatternCache, patterns_from
+from libfuturize.prefilter import PreFilter
+from libfuturize.profiling import FixerProfiler
+from libfuturize.report import JSONLinesReport, changed_lines
+from libfuturize.scheduler import (PoolStats, WorkStealingQueue, assign,
+                                   file_size)
+from future.utils import text_type
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue    # Python 2
+
+
+# The name of the cache file for compiled patterns in the cache directory:
+PATTERN_CACHE_FILE = 'patterns.pickle'
+
+
+class _WouldChange(Exception):
+    """
+    Raised in check mode at the first transformation that changes a file.
+    """
+
+
+class _StopRun(Exception):
+    """
+    Raised in check mode with ``fail_fast`` at the first file that would
+    change.
+    """
+
+
+def _compare_transform(transform, node, results):
+    """
+    Calls ``transform(node, results)`` and returns the new node (or None)
+    and whether the transformation changed the text of the node, removed the
+    node or added or removed statements at the top level (e.g. imports).
+    """
+    root = node
+    while root.parent is not None:
+        root = root.parent
+    n_statements = len(root.children)
+    parent = node.parent
+    before = text_type(node)
+    new = transform(node, results)
+    if new is not None:
+        changed = text_type(new) != before
+    else:
+        changed = node.parent is not parent or text_type(node) != before
+    return new, changed or len(root.children) != n_statements
+
+
+class FuturizeRefactoringTool(StdoutRefactoringTool):
+    """
+    Like ``lib2to3.main.StdoutRefactoringTool``, but with these extra
+    keyword arguments:
+
+        cache_dir: if given, refactoring results are cached in this
+                   directory, keyed by the content of each file, the
+                   selected fixers and the options. Files whose results are
+                   known from a previous run are not parsed again. The
+                   compiled fixer patterns are cached there too, to speed
+                   up the creation of the tool (see ``libfuturize.patcache``).
+        prefilter: if True, files are tokenized before parsing them, and
+                   files that contain none of the trigger tokens of the
+                   selected fixers are left unchanged without parsing them.
+        profile_fixers: 'table' or 'json' to report the time spent in each
+                   fixer at the end of the run.
+        profile_output: write the profiling report to this file instead of
+                   logging it.
+        check:     if True, only find out which files would change. Each
+                   file is refactored up to the first change. No diffs are
+                   printed and no files are written.
+        fail_fast: in check mode, stop at the first file that would change.
+        report_output: write a JSON-lines report with one record per file
+                   to this file, or to standard output if it is '-' (see
+                   ``libfuturize.report``).
+    """
+    def __init__(self, fixers, options, explicit, nobackups, show_diffs,
+                 cache_dir=None, prefilter=False, profile_fixers=None,
+                 profile_output=None, check=False, fail_fast=False,
+                 report_output=None, **kwargs):
+        if cache_dir:
+            self.pattern_cache = PatternCache(
+                os.path.join(cache_dir, PATTERN_CACHE_FILE))
+            with patterns_from(self.pattern_cache):
+                super(FuturizeRefactoringTool, self).__init__(
+                    fixers, options, explicit, nobackups, show_diffs,
+                    **kwargs)
+        else:
+            self.pattern_cache = None
+            super(FuturizeRefactoringTool, self).__init__(
+                fixers, options, explicit, nobackups, show_diffs, **kwargs)
+        self.bmi_pre_order_heads = FixerIndex(self.bmi_pre_order)
+        self.bmi_post_order_heads = FixerIndex(self.bmi_post_order)
+        if cache_dir:
+            self.cache = RefactoringCache(cache_dir, fixers, self.options,
+                                          explicit or ())
+        else:
+            self.cache = None
+        # Fixers whose output depends on the file as well as its source
+        # text, e.g. on its sibling modules (see libfuturize.prefilter)
+        self.context_fixers = [
+            fixer for fixer in chain(self.pre_order, self.post_order)
+            if hasattr(fixer, 'file_triggers')]
+        if prefilter:
+            self.prefilter = PreFilter(
+                (type(fixer).__module__, fixer)
+                for fixer in chain(self.pre_order, self.post_order))
+        else:
+            self.prefilter = None
+        if profile_fixers:
+            self.profiler = FixerProfiler()
+            for fixer in chain(self.pre_order, self.post_order):
+                self.profiler.instrument(fixer)
+            self.BM.run = self.profiler.timed('bottom_matcher_time',
+                                              self.BM.run)
+            self.driver.parse_string = self.profiler.timed(
+                'parse_time', self.driver.parse_string)
+        else:
+            self.profiler = None
+        self.profile_format = profile_fixers
+        self.profile_output = profile_output
+        if report_output:
+            self.report = JSONLinesReport(report_output)
+            for fixer in chain(self.pre_order, self.post_order):
+                self._record_transform(fixer)
+        else:
+            self.report = None
+        self._applied = None
+        self.check = check
+        self.fail_fast = fail_fast
+        self._check_source = None
+        if check:
+            for fixer in chain(self.pre_order, self.post_order):
+                self._check_transform(fixer)
+        self.pool_stats = None
+        self._collected = None
+
+    def refactor(self, items, write=False, doctests_only=False,
+                 num_processes=1):
+        """
+        Refactors a list of files and directories. With ``num_processes``
+        > 1, the files are refactored by a pool of worker processes (see
+        ``libfuturize.scheduler``), and the diffs are printed and the files
+        written by this process as the results come in.
+        """
+        if num_processes == 1:
+            try:
+                return super(FuturizeRefactoringTool, self).refactor(
+                    items, write, doctests_only)
+            except _StopRun:
+                self.log_message("Stopped at the first file that would change")
+                return
+        try:
+            import multiprocessing
+        except ImportError:
+            raise MultiprocessingUnsupported
+        if self.cache is not None:
+            self.cache.share_counters()
+        if self.prefilter is not None:
+            self.prefilter.share_counters()
+
+        filenames = self._collect_files(items, doctests_only)
+        tasks = WorkStealingQueue(
+            assign([file_size(f) for f in filenames], num_processes))
+        results = multiprocessing.Queue()
+        processes = [multiprocessing.Process(
+                        target=self._pool_worker,
+                        args=(worker, filenames, tasks, results,
+                              doctests_only))
+                     for worker in range(num_processes)]
+        stats = PoolStats(num_processes)
+        start = time.time()
+        for p in processes:
+            p.start()
+        done = set()
+        stopped = False
+        try:
+            running = num_processes
+            while running:
+                try:
+                    result = results.get(timeout=0.5)
+                except queue.Empty:
+                    if not any(p.is_alive() for p in processes):
+                        # A worker has died without running out of files
+                        break
+                    continue
+                if result is None:
+                    # A worker has run out of files
+                    running -= 1
+                    continue
+                try:
+                    self._process_result(result, write, stats)
+                except _StopRun:
+                    self.log_message(
+                        "Stopped at the first file that would change")
+                    for p in processes:
+                        p.terminate()
+                    stopped = True
+                    break
+                done.add(result[1])
+        finally:
+            for p in processes:
+                p.join()
+        if running and not stopped:
+            # The results that the workers put just before exiting
+            while True:
+                try:
+                    result = results.get(timeout=0.1)
+                except queue.Empty:
+                    break
+                if result is not None:
+                    self._process_result(result, write, stats)
+                    done.add(result[1])
+            for worker, p in enumerate(processes):
+                if p.exitcode:
+                    self.log_error("Worker process %d exited with code %s",
+                                   worker, p.exitcode)
+            for filename in filenames:
+                if filename not in done:
+                    self.log_error("Can't refactor %s: its worker process "
+                                   "exited before finishing it", filename)
+        stats.wall_time = time.time() - start
+        stats.steals = tasks.steals.value
+        self.pool_stats = stats
+
+    def _collect_files(self, items, doctests_only):
+        """
+        Returns the files that ``refactor(items)`` would refactor.
+        """
+        self._collected = []
+        try:
+            super(FuturizeRefactoringTool, self).refactor(
+                items, False, doctests_only)
+            return self._collected
+        finally:
+            self._collected = None
+
+    def refactor_file(self, filename, write=False, doctests_only=False):
+        if self._collected is not None:
+            self._collected.append(filename)
+            return
+        if self.report is not None:
+            # The same path as for the worker processes, which collects the
+            # information for the report
+            result = self._refactor_for_pool(0, filename, doctests_only)
+            self._process_result(result, write)
+            return
+        return super(FuturizeRefactoringTool, self).refactor_file(
+            filename, write, doctests_only)
+
+    def _pool_worker(self, worker, filenames, tasks, results, doctests_only):
+        """
+        The main function of the worker processes.
+        """
+        while True:
+            index = tasks.take(worker)
+            if index is None:
+                break
+            results.put(self._refactor_for_pool(worker, filenames[index],
+                                                doctests_only))
+        results.put(None)
+
+    def _refactor_for_pool(self, worker, filename, doctests_only):
+        """
+        Like ``RefactoringTool.refactor_file()``, but returns the result
+        instead of passing it to ``processed_file()``.
+        """
+        log_start = len(self.fixer_log)
+        errors_start = len(self.errors)
+        output = old_text = encoding = None
+        changed = False
+        if self.report is not None:
+            self._applied = set()
+        start = time.time()
+        # As in RefactoringTool.refactor_file(), unexpected errors (e.g. in a
+        # fixer) aren't caught. In a worker process, refactor() reports the
+        # files that it didn't finish.
+        input, encoding = self._read_python_source(filename)
+        if input is not None:
+            input += "\n"  # Silence certain parse errors
+            if doctests_only:
+                output = self.refactor_docstring(input, filename)
+                changed = output != input
+                if self.write_unchanged_files or changed:
+                    old_text = input
+                else:
+                    output = None
+            else:
+                tree = self.refactor_string(input, filename)
+                changed = bool(tree and tree.was_changed)
+                if self.write_unchanged_files or changed:
+                    # The [:-1] is to take off the \n we added earlier
+                    output = text_type(tree)[:-1]
+        elapsed = time.time() - start
+        messages = self.fixer_log[log_start:]
+        # Format the errors here: their arguments may not be picklable
+        errors = [(msg % args if args else msg, (), {})
+                  for (msg, args, kwargs) in self.errors[errors_start:]]
+        del self.fixer_log[log_start:]
+        del self.errors[errors_start:]
+        if self.profiler is not None:
+            profile = self.profiler.take()
+        else:
+            profile = None
+        if self.report is not None:
+            if changed and output is not None:
+                original = old_text if doctests_only else input[:-1]
+                lines = changed_lines(original, output)
+            else:
+                lines = []
+            report = (changed, sorted(self._applied), lines)
+            self._applied = None
+        else:
+            report = None
+        return (worker, filename, elapsed, output, old_text, encoding,
+                messages, errors, profile, report)
+
+    def _process_result(self, result, write, stats=None):
+        (worker, filename, elapsed, output, old_text, encoding,
+         messages, errors, profile, report) = result
+        if stats is not None:
+            stats.add(worker, filename, elapsed)
+        self.fixer_log.extend(messages)
+        self.errors.extend(errors)
+        if profile is not None:
+            self.profiler.merge(profile)
+        if report is not None:
+            changed, fixers, lines = report
+            self.report.write(filename, changed, fixers, lines, elapsed,
+                              [msg for (msg, args, kwargs) in errors])
+        if output is not None:
+            self.processed_file(output, filename, old_text, write, encoding)
+        else:
+            self.log_debug("No changes in %s", filename)
+
+    def refactor_string(self, data, name):
+        """
+        Returns the refactored tree for the source text ``data``, or a
+        ``CachedTree`` if the result is already known from the cache or the
+        pre-filter.
+
+        In check mode, this returns a ``CachedTree`` with the original text,
+        whose ``was_changed`` attribute says whether the text would change.
+        Refactoring stops at the first transformation that changes the text.
+        """
+        if not self.check:
+            return self._refactor_string(data, name)
+        self._check_source = data
+        try:
+            tree = self._refactor_string(data, name)
+        except _WouldChange:
+            self.log_debug("Stopped refactoring %s at the first change", name)
+            return CachedTree(data, True)
+        finally:
+            self._check_source = None
+        if tree is None:
+            return None
+        return CachedTree(data, text_type(tree) != data)
+
+    def _cache_key(self, data, name):
+        """
+        Returns the cache key for the source text of the named file, or None
+        if its result can't be cached. The key includes what the fixers that
+        depend on the file's context see of it.
+        """
+        context = []
+        for fixer in self.context_fixers:
+            triggers = fixer.file_triggers(name)
+            if triggers is None:
+                return None
+            context.append(' '.join(sorted(triggers)))
+        return self.cache.key(data, context)
+
+    def _refactor_string(self, data, name):
+        key = None
+        if self.cache is not None:
+            key = self._cache_key(data, name)
+        if key is not None:
+            tree = self.cache.get(key, with_fixers=self._applied is not None)
+            if tree is not None:
+                self.log_debug("Using cached result for %s", name)
+                self.fixer_log.extend(tree.messages)
+                if self._applied is not None:
+                    self._applied.update(tree.fixers)
+                return tree
+        if self.prefilter is not None and self.prefilter.can_skip(data, name):
+            self.log_debug("No trigger tokens in %s; not parsing it", name)
+            return CachedTree(data, False)
+        if self.profiler is not None:
+            self.profiler.other['files'] += 1
+        start = len(self.fixer_log)
+        tree = super(FuturizeRefactoringTool, self).refactor_string(data, name)
+        if key is not None and tree is not None:
+            # Don't cache parse errors: they should be reported every time
+            if self._applied is not None:
+                fixers = sorted(self._applied)
+            else:
+                fixers = None
+            self.cache.put(key, tree, self.fixer_log[start:], fixers)
+        return tree
+
+    def _check_transform(self, fixer):
+        """
+        Wraps the ``transform()`` method of the fixer instance so that it
+        raises ``_WouldChange`` if the transformation changes the text of the
+        node, removes the node or adds statements at the top level (e.g.
+        imports). Any other change is found by comparing the whole text at
+        the end, in ``refactor_string()``.
+        """
+        transform = fixer.transform
+
+        def checked_transform(node, results):
+            if self._check_source is None:
+                return transform(node, results)
+            new, changed = _compare_transform(transform, node, results)
+            if changed:
+                raise _WouldChange
+            return new
+
+        fixer.transform = checked_transform
+
+    def _record_transform(self, fixer):
+        """
+        Wraps the ``transform()`` method of the fixer instance so that the
+        name of the fixer is added to the set ``self._applied`` if it changes
+        the file, for the report.
+        """
+        transform = fixer.transform
+        name = type(fixer).__module__
+
+        def recorded_transform(node, results):
+            if self._applied is None:
+                return transform(node, results)
+            new, changed = _compare_transform(transform, node, results)
+            if changed:
+                self._applied.add(name)
+            return new
+
+        fixer.transform = recorded_transform
+
+    def processed_file(self, new_text, filename, old_text=None, write=False,
+                       encoding=None):
+        if not self.check:
+            return super(FuturizeRefactoringTool, self).processed_file(
+                new_text, filename, old_text, write, encoding)
+        # In check mode, this is only called for files that would change
+        self.files.append(filename)
+        if self.fail_fast:
+            raise _StopRun
+
+    def traverse_by(self, fixers, traversal):
+        """
+        Like ``RefactoringTool.traverse_by()``, but looks up the fixers for
+        each node in a ``FixerIndex``.
+        """
+        if not fixers:
+            return
+        for node in traversal:
+            for fixer in fixers.fixers_for(node):
+                results = fixer.match(node)
+                if results:
+                    new = fixer.transform(node, results)
+                    if new is not None:
+                        node.replace(new)
+                        node = new
+
+    def summarize(self):
+        super(FuturizeRefactoringTool, self).summarize()
+        if self.cache is not None:
+            self.log_message(self.cache.summary())
+        if self.prefilter is not None:
+            self.log_message(self.prefilter.summary())
+        if self.pool_stats is not None:
+            for line in self.pool_stats.report():
+                self.log_message(line)
+        if self.profiler is not None:
+            self.report_profile()
+        if self.report is not None:
+            self.report.close()
+            if self.report.filename != '-':
+                self.log_message("Report with %d records written to %s",
+                                 self.report.records, self.report.filename)
+
+    def report_profile(self):
+        """
+        Logs the per-fixer profiling report, or writes it to the file given
+        as ``profile_output``.
+        """
+        if self.profile_format == 'json':
+            lines = [self.profiler.to_json()]
+        else:
+            lines = self.profiler.table()
+        if self.profile_output:
+            with io.open(self.profile_output, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(lines) + '\n')
+            self.log_message("Fixer profile written to %s",
+                             self.profile_output)
+        else:
+            for line in lines:
+                self.log_message(line)
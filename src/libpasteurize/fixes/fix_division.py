@@ -16,6 +16,8 @@ def match_division(node):
 
 class FixDivision(fixer_base.BaseFix):
     run_order = 4    # this seems to be ignored?
+    _accept_type = token.SLASH
+    TRIGGERS = frozenset([u'/'])
 
     def match(self, node):
         u"""
@@ -41,10 +41,12 @@ from __future__ import (absolute_import, print_function, unicode_literals)
 import sys
 import logging
 import optparse
-from lib2to3.main import main, warn, StdoutRefactoringTool
+from lib2to3.main import main, warn
 from lib2to3 import refactor
 
 from future import __version__
+from libfuturize.gitfiles import GitError, changed_files
+from libfuturize.tool import FuturizeRefactoringTool
 from libpasteurize.fixes import fix_names
 
 
@@ -77,6 +79,41 @@ def main(args=None):
                       help="Write back modified files")
     parser.add_option("-n", "--nobackups", action="store_true", default=False,
                       help="Don't write backups for modified files.")
+    parser.add_option("--cache-dir", action="store", type="str", default="",
+                      help="Cache refactoring results in this directory and "
+                      "skip files whose results are known from a previous "
+                      "run with the same fixers and options.")
+    parser.add_option("--prefilter", action="store_true",
+                      help="Tokenize each file first and skip parsing files "
+                      "that contain none of the names and operators the "
+                      "selected fixers look for.")
+    parser.add_option("--profile-fixers", action="store", type="choice",
+                      choices=["table", "json"], default=None,
+                      metavar="FORMAT",
+                      help="Report the time spent in each fixer, the number "
+                      "of nodes it was tried on and the number of matches, "
+                      "as a 'table' or as 'json'.")
+    parser.add_option("--profile-output", action="store", type="str",
+                      default=None, metavar="FILE",
+                      help="Write the --profile-fixers report to this file.")
+    parser.add_option("--check", action="store_true",
+                      help="Don't print diffs or write files; only report "
+                      "the files that would change. Exits with status 1 if "
+                      "any file would change and 2 on errors.")
+    parser.add_option("--fail-fast", action="store_true",
+                      help="With --check, stop at the first file that would "
+                      "change.")
+    parser.add_option("--report-jsonl", action="store", type="str",
+                      default=None, metavar="FILE",
+                      help="Write a JSON-lines report with one record per "
+                      "file (path, fixers applied, changed lines, time and "
+                      "errors) to FILE as each file is done. Use '-' for "
+                      "standard output; this turns off the diffs.")
+    parser.add_option("--since", action="store", type="str", default=None,
+                      metavar="REV",
+                      help="Only refactor the Python files that have changed "
+                      "since the git revision REV (including uncommitted "
+                      "changes and new files).")
 
     # Parse command line arguments
     refactor_stdin = False
@@ -86,7 +123,17 @@ def main(args=None):
     avail_fixes = fix_names
     flags["print_function"] = True
 
-    if not options.write and options.no_diffs:
+    if options.check and options.write:
+        parser.error("Can't use --check with -w or -W")
+    if options.fail_fast and not options.check:
+        parser.error("Can't use --fail-fast without --check")
+    if options.since and "-" in args:
+        parser.error("Can't use --since with stdin")
+    if options.report_jsonl == "-":
+        # Keep standard output machine-readable
+        options.no_diffs = True
+    if (not options.write and options.no_diffs and not options.check
+            and not options.report_jsonl):
         warn("not writing files and not printing diffs; that's not very useful")
     if not options.write and options.nobackups:
         parser.error("Can't use -n without -w")
@@ -114,6 +161,16 @@ def main(args=None):
     level = logging.DEBUG if options.verbose else logging.INFO
     logging.basicConfig(format='%(name)s: %(message)s', level=level)
 
+    if options.since:
+        # Only the changed files; the directories are not walked
+        try:
+            args = changed_files(options.since, args)
+        except GitError as e:
+            print("pasteurize: --since: {0}".format(e), file=sys.stderr)
+            return 2
+        logging.getLogger('libpasteurize.main').info(
+            '%d Python files changed since %s', len(args), options.since)
+
     # Initialize the refactoring tool
     unwanted_fixes = set(fixer_pkg + ".fix_" + fix for fix in options.nofix)
 
@@ -126,8 +183,16 @@ def main(args=None):
 
     fixer_names = avail_fixes | extra_fixes - unwanted_fixes
 
-    rt = StdoutRefactoringTool(sorted(fixer_names), flags, set(),
-                               options.nobackups, not options.no_diffs)
+    rt = FuturizeRefactoringTool(sorted(fixer_names), flags, set(),
+                                 options.nobackups,
+                                 not (options.no_diffs or options.check),
+                                 cache_dir=options.cache_dir,
+                                 prefilter=options.prefilter,
+                                 profile_fixers=options.profile_fixers,
+                                 profile_output=options.profile_output,
+                                 check=options.check,
+                                 fail_fast=options.fail_fast,
+                                 report_output=options.report_jsonl)
 
     # Refactor all files and directories passed as arguments
     if not rt.errors:
@@ -144,6 +209,12 @@ def main(args=None):
                 return 1
         rt.summarize()
 
+    if options.check:
+        # 0: no changes needed; 1: some files would change; 2: errors
+        if rt.errors:
+            return 2
+        return int(bool(rt.files))
+
     # Return error status (0 if rt.errors is zero)
     return int(bool(rt.errors))
 
@@ -32,16 +32,32 @@ Author: Ed Schofield.
 Inspired by and based on ``uprefix`` by Vinay M. Sajip.
 """
 
+import atexit
+import collections
 import imp
 import logging
-import marshal
 import os
 import sys
 import copy
+import threading
+from contextlib import contextmanager
+from lib2to3 import pygram
 from lib2to3.pgen2.parse import ParseError
-from lib2to3.refactor import RefactoringTool
+from lib2to3.refactor import RefactoringTool, _detect_future_features
 
 from libfuturize import fixes
+from past.translation.cache import (TranslationCache, DEFAULT_MAX_SIZE,
+                                    default_cache_dir)
+
+try:
+    from importlib.machinery import PathFinder, SourceFileLoader
+except ImportError:     # Python 2 (the import hook is not used there)
+    PathFinder = SourceFileLoader = None
+
+try:
+    from time import perf_counter as _timer
+except ImportError:     # Python < 3.3
+    from time import time as _timer
 
 
 logger = logging.getLogger(__name__)
@@ -150,6 +166,43 @@ class RTs:
             RTs._rtp_py2_detect = RefactoringTool(py2_detect_fixers,
                                                   {'print_function': True})
 
+    # The tools above are shared, so they can't be used by several threads
+    # at once (the fixers keep state while refactoring a tree). The import
+    # hook uses sets of tools from this pool instead.
+    _pool = []
+    _pool_lock = threading.Lock()
+
+    @staticmethod
+    @contextmanager
+    def tools():
+        """
+        A context manager that provides a set of refactoring tools (a
+        ``_ToolSet``) for the exclusive use of the current thread. Sets are
+        reused; a new one is only created if all the others are in use.
+        """
+        with RTs._pool_lock:
+            toolset = RTs._pool.pop() if RTs._pool else None
+        if toolset is None:
+            toolset = _ToolSet()
+        try:
+            yield toolset
+        finally:
+            with RTs._pool_lock:
+                RTs._pool.append(toolset)
+
+
+class _ToolSet(object):
+    """
+    The refactoring tools for translating and for detecting Python 2 code,
+    with and without the print statement, as in ``RTs``.
+    """
+    def __init__(self):
+        self.rt = RefactoringTool(myfixes)
+        self.rtp = RefactoringTool(myfixes, {'print_function': True})
+        self.rt_py2_detect = RefactoringTool(py2_detect_fixers)
+        self.rtp_py2_detect = RefactoringTool(py2_detect_fixers,
+                                              {'print_function': True})
+
 
 # We need to find a prefix for the standard library, as we don't want to
 # process any files there (they will already be Python 3).
@@ -204,44 +257,234 @@ def common_substring(s1, s2):
 # _stdlibprefix = common_substring(math.__file__, urllib.__file__)
 
 
-def detect_python2(source, pathname):
+def _dump_code(debug_dir, pathname, kind, title, code):
     """
-    Returns a bool indicating whether we think the code is Py2
+    Writes code to a file in ``debug_dir`` named after the module's path,
+    e.g. ``home_user_mypy2module.futurized.py`` for the ``futurized`` code of
+    ``/home/user/mypy2module.py``, to help debugging the translation.
     """
-    RTs.setup_detect_python2()
-    try:
-        tree = RTs._rt_py2_detect.refactor_string(source, pathname)
-    except ParseError as e:
-        if e.msg != 'bad input' or e.value != '=':
-            raise
-        tree = RTs._rtp.refactor_string(source, pathname)
+    name = os.path.splitext(os.path.splitdrive(pathname)[1])[0]
+    name = name.strip(os.sep).replace(os.sep, '_')
+    if os.altsep:
+        name = name.replace(os.altsep, '_')
+    if not os.path.isdir(debug_dir):
+        try:
+            os.makedirs(debug_dir)
+        except OSError:
+            # Perhaps created by another thread or process in the meantime
+            if not os.path.isdir(debug_dir):
+                raise
+    filename = os.path.join(debug_dir, '%s.%s.py' % (name, kind))
+    with open(filename, 'w') as f:
+        f.write('### %s: %s\n%s' % (title, pathname, code))
+
+
+def detect_python2(source, pathname, debug_dir=None):
+    """
+    Returns a bool indicating whether we think the code is Py2. With a
+    ``debug_dir``, the original code and the output of the detection fixers
+    are written to files there.
+    """
+    with RTs.tools() as tools:
+        try:
+            tree = tools.rt_py2_detect.refactor_string(source, pathname)
+        except ParseError as e:
+            if e.msg != 'bad input' or e.value != '=':
+                raise
+            tree = tools.rtp.refactor_string(source, pathname)
 
     if source != str(tree)[:-1]:   # remove added newline
         # The above fixers made changes, so we conclude it's Python 2 code
         logger.debug('Detected Python 2 code: {0}'.format(pathname))
-        with open('/tmp/original_code.py', 'w') as f:
-            f.write('### Original code (detected as py2): %s\n%s' % 
-                    (pathname, source))
-        with open('/tmp/py2_detection_code.py', 'w') as f:
-            f.write('### Code after running py3 detection (from %s)\n%s' % 
-                    (pathname, str(tree)[:-1]))
+        if debug_dir:
+            _dump_code(debug_dir, pathname, 'original',
+                       'Original code (detected as py2)', source)
+            _dump_code(debug_dir, pathname, 'py2_detection',
+                       'Code after running py3 detection', str(tree)[:-1])
         return True
     else:
         logger.debug('Detected Python 3 code: {0}'.format(pathname))
-        with open('/tmp/original_code.py', 'w') as f:
-            f.write('### Original code (detected as py3): %s\n%s' % 
-                    (pathname, source))
-        try:
-            os.remove('/tmp/futurize_code.py')
-        except OSError:
-            pass
+        if debug_dir:
+            _dump_code(debug_dir, pathname, 'original',
+                       'Original code (detected as py3)', source)
         return False
 
 
+def _parse(source, pathname, tools):
+    """
+    Parses the source like ``tools.rt.refactor_string()`` does, falling back
+    to the grammar without the print statement like ``Py2Fixer.transform()``
+    does. Returns the tree and the detection and translation refactoring
+    tools of the ``_ToolSet`` that go with the grammar it was parsed with.
+    """
+    features = _detect_future_features(source)
+    driver = tools.rt.driver
+    if 'print_function' in features:
+        driver.grammar = pygram.python_grammar_no_print_statement
+    try:
+        tree = driver.parse_string(source)
+        rts = (tools.rt_py2_detect, tools.rt)
+    except ParseError as e:
+        if e.msg != 'bad input' or e.value != '=':
+            raise
+        tree = tools.rtp.driver.parse_string(source)
+        rts = (tools.rtp_py2_detect, tools.rtp)
+    finally:
+        driver.grammar = tools.rt.grammar
+    tree.future_features = features
+    return tree, rts
+
+
+def _clone_tree(tree):
+    """
+    Returns a copy of a tree returned by ``_parse()`` that can be
+    refactored separately.
+    """
+    clone = tree.clone()
+    # Set by the parser on the root and needed by the fixers:
+    clone.used_names = set(tree.used_names)
+    clone.future_features = tree.future_features
+    return clone
+
+
+def translate(source, pathname, debug_dir=None, timings=None):
+    """
+    Returns the source translated from Python 2 to Python 3, or None if we
+    think it is Python 3 code already.
+
+    This does the work of ``detect_python2()`` and ``Py2Fixer.transform()``
+    with a single parse: the detection fixers run on a copy of the tree,
+    which is much faster than parsing the source again. With a
+    ``debug_dir``, the original, detection and translated code are written
+    to files there. With a ``timings`` dict, the time spent creating the
+    refactoring tools, parsing, detecting and transforming is stored in it
+    under ``'setup'``, ``'parse'``, ``'detect'`` and ``'transform'``.
+    """
+    if timings is None:
+        timings = {}
+    start = _timer()
+    # Creating a set of refactoring tools takes a while
+    with RTs.tools() as tools:
+        ready = _timer()
+        timings['setup'] = ready - start
+        # lib2to3 likes a newline at the end
+        source += '\n'
+        tree, (rt_detect, rt) = _parse(source, pathname, tools)
+        parsed = _timer()
+        timings['parse'] = parsed - ready
+        detected = _clone_tree(tree)
+        rt_detect.refactor_tree(detected, pathname)
+        detected = str(detected)[:-1]
+        done = _timer()
+        timings['detect'] = done - parsed
+        # The same test as in detect_python2(), which parses the source
+        # without the added newline and removes the last character of its
+        # output
+        if detected[:-1] == source[:-1]:
+            logger.debug('Detected Python 3 code: {0}'.format(pathname))
+            if debug_dir:
+                _dump_code(debug_dir, pathname, 'original',
+                           'Original code (detected as py3)', source[:-1])
+            return None
+        logger.debug('Detected Python 2 code: {0}'.format(pathname))
+        rt.refactor_tree(tree, pathname)
+        timings['transform'] = _timer() - done
+    translated = str(tree)[:-1] # remove added newline
+    if debug_dir:
+        _dump_code(debug_dir, pathname, 'original',
+                   'Original code (detected as py2)', source[:-1])
+        _dump_code(debug_dir, pathname, 'py2_detection',
+                   'Code after running py3 detection', detected)
+        _dump_code(debug_dir, pathname, 'futurized', 'Futurized code',
+                   translated)
+    return translated
+
+
+# The phases of loading a module that are timed for stats()
+PHASES = ('find', 'read', 'lookup', 'setup', 'parse', 'detect', 'transform',
+          'compile', 'exec')
+
+# The number of most recently loaded modules whose timings stats() returns
+MAX_RECORDS = 1000
+
+_INCLUDE = 1
+_EXCLUDE = 2
+
+
+class PrefixTrie(object):
+    """
+    Matches module names against the include and exclude prefixes of the
+    import hook in a single pass over the name, however many prefixes there
+    are. A prefix matches the names that start with it, and exclude
+    prefixes take precedence over include prefixes.
+
+    Most names don't start like any prefix, so matching them stops at the
+    first character or two.
+
+    >>> prefixes = PrefixTrie(include=['mypkg'], exclude=['mypkg.py3'])
+    >>> prefixes.match('mypkg.module'), prefixes.match('mypkg.py3.module')
+    (True, False)
+    """
+    def __init__(self, include=(), exclude=()):
+        # Nested dicts, one level per character; the key None holds the
+        # flags of the prefix that ends there
+        self._root = {}
+        for prefix in include:
+            self._add(prefix, _INCLUDE)
+        for prefix in exclude:
+            self._add(prefix, _EXCLUDE)
+
+    def _add(self, prefix, flag):
+        node = self._root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node[None] = node.get(None, 0) | flag
+
+    def match(self, fullname):
+        """
+        Returns True if the module name starts with an include prefix and
+        with no exclude prefix.
+        """
+        node = self._root
+        flags = node.get(None, 0)    # from an empty prefix
+        if flags & _EXCLUDE:
+            return False
+        included = bool(flags)
+        for char in fullname:
+            node = node.get(char)
+            if node is None:
+                break
+            flags = node.get(None)
+            if flags:
+                if flags & _EXCLUDE:
+                    return False
+                included = True
+        return included
+
+
+def _thread_local(name):
+    """
+    Returns a property for an attribute of ``Py2Fixer`` that has a separate
+    value in each thread (None until it is set).
+    """
+    def fget(self):
+        return getattr(self._local, name, None)
+    def fset(self, value):
+        setattr(self._local, name, value)
+    return property(fget, fset)
+
+
 class Py2Fixer(object):
     """
     An import hook class that uses lib2to3 for source-to-source translation of
     Py2 code to Py3.
+
+    It is a meta path finder and loader. Modules whose names don't match the
+    include and exclude paths are left to the other finders straight away.
+
+    Several threads can import modules through the hook at once: the state
+    of each import is kept per thread, and each translation uses its own
+    set of refactoring tools.
     """
 
     # See the comments on :class:future.standard_library.RenameImport.
@@ -249,11 +492,58 @@ class Py2Fixer(object):
     # unambiguously detect whether the import hook is installed:
     PY2FIXER = True
 
+    # The module being found or loaded by the current thread
+    found = _thread_local('found')
+    kind = _thread_local('kind')
+    pathname = _thread_local('pathname')
+
     def __init__(self):
-        self.found = None
+        self._local = threading.local()
+        self._cache_lock = threading.Lock()
         self.base_exclude_paths = ['future', 'past']
         self.exclude_paths = copy.copy(self.base_exclude_paths)
         self.include_paths = []
+        self._prefixes = PrefixTrie(self.include_paths, self.exclude_paths)
+        self.cache_dir = default_cache_dir()
+        self.cache_size = DEFAULT_MAX_SIZE
+        self._cache = None
+        # A directory for the original and translated code of each module,
+        # for debugging; None to write nothing
+        self.debug_dir = None
+        # The timings of the most recent modules loaded by the hook, for
+        # stats(), and the number and total timings of all of them
+        self._records_lock = threading.Lock()
+        self.records = collections.deque(maxlen=MAX_RECORDS)
+        self.n_records = 0
+        self.totals = dict((phase, 0.0) for phase in PHASES)
+
+    @property
+    def cache(self):
+        """
+        The ``TranslationCache`` for the translated modules, created on first
+        use, or None if caching is disabled.
+        """
+        if self._cache is None and self.cache_dir:
+            with self._cache_lock:
+                if self._cache is None:
+                    cls = type(self)
+                    self._cache = TranslationCache(
+                        self.cache_dir, myfixes + py2_detect_fixers,
+                        self.cache_size, translator='%s.%s' % (
+                            cls.__module__,
+                            getattr(cls, '__qualname__', cls.__name__)))
+        return self._cache
+
+    def set_cache(self, cache_dir, max_size=None):
+        """
+        Stores the translated modules in ``cache_dir``, with a total size of
+        at most ``max_size`` bytes. Pass ``cache_dir=False`` to disable the
+        cache.
+        """
+        self.cache_dir = cache_dir
+        if max_size is not None:
+            self.cache_size = max_size
+        self._cache = None
 
     def include(self, paths):
         """
@@ -262,6 +552,7 @@ class Py2Fixer(object):
         specify the module to be transformed from Py2 to Py3.
         """
         self.include_paths += paths
+        self._prefixes = PrefixTrie(self.include_paths, self.exclude_paths)
 
     def exclude(self, paths):
         """
@@ -270,8 +561,80 @@ class Py2Fixer(object):
         the module not to undergo any source transformation.
         """
         self.exclude_paths += paths
+        self._prefixes = PrefixTrie(self.include_paths, self.exclude_paths)
+
+    def match(self, fullname):
+        """
+        Returns True if the module should be translated, according to the
+        include and exclude paths.
+        """
+        return self._prefixes.match(fullname)
+
+    def find_spec(self, fullname, path=None, target=None):
+        """
+        Returns a module spec for loading the module with this hook if it
+        should be translated and is a pure Python module, or None to let
+        the other finders import it as usual.
+        """
+        if not self._prefixes.match(fullname):
+            return None
+        logger.debug('Running find_spec: {0}...'.format(fullname))
+        start = _timer()
+        spec = PathFinder.find_spec(fullname, path)
+        if spec is None or not isinstance(spec.loader, SourceFileLoader):
+            return None
+        # The original loader reads the source for exec_module()
+        spec.loader_state = (spec.loader, _timer() - start)
+        spec.loader = self
+        return spec
+
+    def create_module(self, spec):
+        # Use the default module creation
+        return None
+
+    def exec_module(self, module):
+        spec = module.__spec__
+        logger.debug('Autoconverting {0} ...'.format(spec.name))
+        loader, find_time = spec.loader_state
+        record = self._new_record(spec.name, spec.origin)
+        record['find'] = find_time
+        self.pathname = spec.origin
+        try:
+            start = _timer()
+            source = loader.get_source(spec.name)
+            record['read'] = _timer() - start
+            code = self._get_code(source, record)
+            start = _timer()
+            exec(code, module.__dict__)
+            record['exec'] = _timer() - start
+        finally:
+            self._add_record(record)
+
+    def _new_record(self, fullname, pathname):
+        """
+        Returns a new record of the timings of a module for ``stats()``.
+        """
+        record = {'module': fullname, 'path': pathname, 'cache': None,
+                  'translated': None}
+        for phase in PHASES:
+            record[phase] = 0.0
+        return record
+
+    def _add_record(self, record):
+        """
+        Adds the finished record of a module to ``records``, which keeps the
+        last ``MAX_RECORDS``, and to the totals.
+        """
+        with self._records_lock:
+            self.records.append(record)
+            self.n_records += 1
+            for phase in PHASES:
+                self.totals[phase] += record[phase]
 
     def find_module(self, fullname, path=None):
+        # Used instead of find_spec() before Python 3.4
+        if not self._prefixes.match(fullname):
+            return None
         logger.debug('Running find_module: {0}...'.format(fullname))
         if '.' in fullname:
             parent, child = fullname.rsplit('.', 1)
@@ -303,19 +666,70 @@ class Py2Fixer(object):
         # if that's better for you
 
         # lib2to3 likes a newline at the end
-        RTs.setup()
         source += '\n'
-        try:
-            tree = RTs._rt.refactor_string(source, self.pathname)
-        except ParseError as e:
-            if e.msg != 'bad input' or e.value != '=':
-                raise
-            tree = RTs._rtp.refactor_string(source, self.pathname)
+        with RTs.tools() as tools:
+            try:
+                tree = tools.rt.refactor_string(source, self.pathname)
+            except ParseError as e:
+                if e.msg != 'bad input' or e.value != '=':
+                    raise
+                tree = tools.rtp.refactor_string(source, self.pathname)
         # could optimise a bit for only doing str(tree) if
         # getattr(tree, 'was_changed', False) returns True
         return str(tree)[:-1] # remove added newline
 
+    def translate(self, source, timings=None):
+        """
+        Returns the translation of the source to Python 3, or None if it is
+        Python 3 code already. This parses the source only once, unless a
+        subclass overrides ``transform()``. The times spent are stored in
+        ``timings`` as by ``translate()``.
+        """
+        if type(self).transform is not Py2Fixer.transform:
+            if timings is None:
+                timings = {}
+            start = _timer()
+            is_python2 = detect_python2(source, self.pathname, self.debug_dir)
+            detected = _timer()
+            timings['detect'] = detected - start
+            if is_python2:
+                translated = self.transform(source)
+                timings['transform'] = _timer() - detected
+                if self.debug_dir:
+                    _dump_code(self.debug_dir, self.pathname, 'futurized',
+                               'Futurized code', translated)
+                return translated
+            return None
+        return translate(source, self.pathname, self.debug_dir, timings)
+
+    def _get_code(self, source, record):
+        """
+        Returns the code object for the module's source, translated if it is
+        Python 2 code, from the cache if possible. The timings and whether
+        the cache was hit are stored in the module's ``record``.
+        """
+        cache = self.cache
+        code = None
+        if cache is not None:
+            start = _timer()
+            key = cache.key(source, self.pathname)
+            code = cache.get(key)
+            record['lookup'] = _timer() - start
+            record['cache'] = 'miss' if code is None else 'hit'
+        if code is None:
+            translated = self.translate(source, record)
+            record['translated'] = translated is not None
+            if translated is not None:
+                source = translated
+            start = _timer()
+            code = compile(source, self.pathname, 'exec')
+            record['compile'] = _timer() - start
+            if cache is not None:
+                cache.put(key, code)
+        return code
+
     def load_module(self, fullname):
+        # Used instead of exec_module() before Python 3.4
         logger.debug('Running load_module for {0}...'.format(fullname))
         if fullname in sys.modules:
             mod = sys.modules[fullname]
@@ -330,12 +744,8 @@ class Py2Fixer(object):
             #     # if so.
             #     convert = False
             # in theory, other paths could be configured to be excluded here too
-            elif any([fullname.startswith(path) for path in self.exclude_paths]):
-                convert = False
-            elif any([fullname.startswith(path) for path in self.include_paths]):
-                convert = True
             else:
-                convert = False
+                convert = self._prefixes.match(fullname)
             if not convert:
                 logger.debug('Excluded {0} from translation'.format(fullname))
                 mod = imp.load_module(fullname, *self.found)
@@ -369,48 +779,20 @@ class Py2Fixer(object):
                     mod.__package__ = fullname.rpartition('.')[0]
                     
                 try:
-                    cachename = imp.cache_from_source(self.pathname)
-                    if not os.path.exists(cachename):
-                        update_cache = True
-                    else:
-                        sourcetime = os.stat(self.pathname).st_mtime
-                        cachetime = os.stat(cachename).st_mtime
-                        update_cache = cachetime < sourcetime
-                    # # Force update_cache to work around a problem with it being treated as Py3 code???
-                    # update_cache = True
-                    if not update_cache:
-                        with open(cachename, 'rb') as f:
-                            data = f.read()
-                            try:
-                                code = marshal.loads(data)
-                            except Exception:
-                                # pyc could be corrupt. Regenerate it
-                                update_cache = True
-                    if update_cache:
-                        if self.found[0]:
-                            source = self.found[0].read()
-                        elif self.kind == imp.PKG_DIRECTORY:
-                            with open(self.pathname) as f:
-                                source = f.read()
-
-                        if detect_python2(source, self.pathname):
-                            source = self.transform(source)
-                            with open('/tmp/futurized_code.py', 'w') as f:
-                                f.write('### Futurized code (from %s)\n%s' % 
-                                        (self.pathname, source))
-
-                        code = compile(source, self.pathname, 'exec')
-
-                        dirname = os.path.dirname(cachename)
-                        if not os.path.exists(dirname):
-                            os.makedirs(dirname)
-                        try:
-                            with open(cachename, 'wb') as f:
-                                data = marshal.dumps(code)
-                                f.write(data)
-                        except Exception:   # could be write-protected
-                            pass
-                    exec(code, mod.__dict__)
+                    if self.found[0]:
+                        source = self.found[0].read()
+                    elif self.kind == imp.PKG_DIRECTORY:
+                        with open(self.pathname) as f:
+                            source = f.read()
+
+                    record = self._new_record(fullname, self.pathname)
+                    try:
+                        code = self._get_code(source, record)
+                        start = _timer()
+                        exec(code, mod.__dict__)
+                        record['exec'] = _timer() - start
+                    finally:
+                        self._add_record(record)
                 except Exception as e:
                     # must remove module from sys.modules
                     del sys.modules[fullname]
@@ -423,7 +805,33 @@ class Py2Fixer(object):
 _hook = Py2Fixer()
 
 
-def install_hooks(include_paths=(), exclude_paths=()):
+def install_hooks(include_paths=(), exclude_paths=(), cache_dir=None,
+                  cache_size=None, debug_dir=None, stats_at_exit=False):
+    """
+    Installs the import hook that translates the modules whose names start
+    with one of the ``include_paths`` (and none of the ``exclude_paths``).
+
+    The translated modules are cached in ``cache_dir`` (by default,
+    ``python-future/translation`` in the user's cache directory), which is
+    kept below ``cache_size`` bytes. Pass ``cache_dir=False`` to disable the
+    cache.
+
+    For debugging, pass a ``debug_dir`` to write the original code, the
+    output of the Python 2 detection and the translated code of each module
+    that is translated (i.e. not loaded from the cache) to files there.
+
+    With ``stats_at_exit``, a summary of the time spent loading each module
+    (see ``stats()``) is printed to stderr when the interpreter exits.
+    """
+    global _stats_at_exit
+    if stats_at_exit and not _stats_at_exit:
+        atexit.register(print_stats)
+        _stats_at_exit = True
+    if cache_dir is not None or cache_size is not None:
+        _hook.set_cache(_hook.cache_dir if cache_dir is None else cache_dir,
+                        cache_size)
+    if debug_dir is not None:
+        _hook.debug_dir = debug_dir
     if isinstance(include_paths, str):
         include_paths = (include_paths,)
     if isinstance(exclude_paths, str):
@@ -431,7 +839,6 @@ def install_hooks(include_paths=(), exclude_paths=()):
     assert len(include_paths) + len(exclude_paths) > 0, 'Pass at least one argument'
     _hook.include(include_paths)
     _hook.exclude(exclude_paths)
-    # _hook.debug = debug
     enable = sys.version_info[0] >= 3   # enabled for all 3.x
     if enable and _hook not in sys.meta_path:
         sys.meta_path.insert(0, _hook)  # insert at beginning. This could be made a parameter
@@ -440,6 +847,60 @@ def install_hooks(include_paths=(), exclude_paths=()):
     #return _hook
 
 
+_stats_at_exit = False
+
+
+def stats():
+    """
+    Returns a list with a dict for each of the last ``MAX_RECORDS`` modules
+    loaded by the import hook, in the order they were loaded, with these
+    keys:
+
+    - ``'module'`` and ``'path'``: the module's name and file
+    - ``'find'``, ``'read'``, ``'lookup'``, ``'setup'``, ``'parse'``,
+      ``'detect'``, ``'transform'``, ``'compile'`` and ``'exec'``: the time
+      spent in each phase, in seconds. Phases that were skipped take 0.
+      ``'read'`` is reading the source, ``'lookup'`` is looking it up in the
+      cache and ``'setup'`` is creating the refactoring tools, which happens
+      once. ``'exec'`` includes the time spent importing other modules while
+      the module is executed.
+    - ``'cache'``: ``'hit'`` or ``'miss'``, or None if the cache is disabled
+    - ``'translated'``: whether it was translated, or None if it was loaded
+      from the cache
+    """
+    with _hook._records_lock:
+        return [dict(record) for record in _hook.records]
+
+
+def print_stats(file=None):
+    """
+    Prints a summary of ``stats()`` to ``file`` (by default, stderr), with
+    the times in milliseconds. The totals include the modules that are no
+    longer in ``stats()``.
+    """
+    if file is None:
+        file = sys.stderr
+    with _hook._records_lock:
+        records = [dict(record) for record in _hook.records]
+        n_records = _hook.n_records
+        totals = dict(_hook.totals)
+    if not records:
+        return
+    header = ''.join('{0:>10}'.format(phase) for phase in PHASES)
+    file.write('past.translation [ms]{0}{1:>7}  module\n'.format(header,
+                                                                 'cache'))
+    for record in records:
+        times = ''
+        for phase in PHASES:
+            times += '{0:>10.1f}'.format(record[phase] * 1000)
+        file.write('{0:<21}{1}{2:>7}  {3}\n'.format(
+            '', times, record['cache'] or '-', record['module']))
+    times = ''.join('{0:>10.1f}'.format(totals[phase] * 1000)
+                    for phase in PHASES)
+    file.write('{0:<21}{1}{2:>7}  {3} modules\n'.format('total', times, '',
+                                                        n_records))
+
+
 def remove_hooks():
     if _hook in sys.meta_path:
         sys.meta_path.remove(_hook)
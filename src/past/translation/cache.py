@@ -0,0 +1,234 @@
+"""
+A content-addressed cache of the code objects produced by the
+``past.translation`` import hook.
+
+Each entry is keyed by a hash of the module's source text and file name,
+and of everything else that can change the compiled code: the ``future``
+version, the fixers that detect and translate Python 2 code, the class
+that does the translation, and the interpreter's bytecode magic number.
+File modification times are not part of the key, so restoring a tree with
+reset mtimes (e.g. in a container image) doesn't cause modules to be
+translated again.
+
+The entries are stored in their own directory, not in ``__pycache__``, so
+that an ordinary import of the same module can't overwrite a translated
+module with an untranslated one, or vice versa.
+
+The total size of the entries is bounded: when it exceeds ``max_size``
+bytes, the least recently used entries are removed.
+
+A cache can be used by several threads at once, and several processes can
+share a cache directory.
+"""
+
+from __future__ import absolute_import
+
+import hashlib
+import marshal
+import os
+import tempfile
+import threading
+
+from future import __version__
+
+try:
+    from importlib.util import MAGIC_NUMBER
+except ImportError:     # Python 2
+    import imp
+    MAGIC_NUMBER = imp.get_magic()
+
+
+# Bump this if the layout of the cache entries changes:
+CACHE_FORMAT = 1
+
+# The default bound on the total size of the entries, in bytes:
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+
+_SUFFIX = '.code'
+
+
+def default_cache_dir():
+    """
+    Returns the directory used for the translation cache unless another one
+    is passed to ``install_hooks()``: ``python-future/translation`` in the
+    user's cache directory (``$XDG_CACHE_HOME`` or ``~/.cache``).
+    """
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(
+        os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'python-future', 'translation')
+
+
+class TranslationCache(object):
+    """
+    Maps hashes of source texts to the code objects compiled from their
+    translations.
+
+    Usage::
+
+        >>> cache = TranslationCache(cache_dir, fixer_names, translator=name)
+        >>> key = cache.key(source, pathname)
+        >>> code = cache.get(key)
+        >>> if code is None:
+        ...     code = compile(translate(source), pathname, 'exec')
+        ...     cache.put(key, code)
+    """
+    def __init__(self, cache_dir, fixer_names, max_size=DEFAULT_MAX_SIZE,
+                 translator=''):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        # The total size of the entries, found by the first put()
+        self._size = None
+        # Guards the counters and the size
+        self._lock = threading.Lock()
+        self._magic = MAGIC_NUMBER
+        signature = '\n'.join([
+            'format=%d' % CACHE_FORMAT,
+            'version=%s' % __version__,
+            'magic=%r' % (self._magic,),
+            'fixers=%s' % ','.join(sorted(fixer_names)),
+            # E.g. a subclass of Py2Fixer that overrides transform()
+            'translator=%s' % translator,
+        ])
+        self._signature = hashlib.sha1(signature.encode('utf-8'))
+
+    def key(self, source, pathname):
+        """
+        Returns the cache key for the source text of the module at
+        ``pathname``. The file name is part of the key because it is
+        recorded in the code object (for tracebacks).
+        """
+        h = self._signature.copy()
+        h.update(pathname.encode('utf-8', 'backslashreplace') + b'\0')
+        if not isinstance(source, bytes):
+            source = source.encode('utf-8', 'backslashreplace')
+        h.update(source)
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + _SUFFIX)
+
+    def get(self, key):
+        """
+        Returns the code object stored under the key, or None if there is no
+        usable entry for it.
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            if data[:len(self._magic)] != self._magic:
+                raise ValueError('bad magic number')
+            code = marshal.loads(data[len(self._magic):])
+        except (IOError, OSError, ValueError, EOFError, TypeError):
+            # Missing, unreadable or corrupt entry
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            # Mark the entry as recently used, for eviction
+            os.utime(path, None)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return code
+
+    def put(self, key, code):
+        """
+        Stores the code object under the given key, then evicts the least
+        recently used entries if the cache has grown beyond ``max_size``.
+        """
+        path = self._path(key)
+        dirname = os.path.dirname(path)
+        data = self._magic + marshal.dumps(code)
+        tmpname = None
+        try:
+            if not os.path.isdir(dirname):
+                os.makedirs(dirname)
+            fd, tmpname = tempfile.mkstemp(dir=dirname, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.rename(tmpname, path)
+        except (IOError, OSError):
+            # The cache is an optimization only: e.g. another process may
+            # have created the directory first, or the cache directory may
+            # be read-only.
+            if tmpname is not None and os.path.exists(tmpname):
+                os.remove(tmpname)
+            return
+        with self._lock:
+            self.writes += 1
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._entries())
+            else:
+                self._size += len(data)
+            if self._size > self.max_size:
+                self._evict(self.max_size * 3 // 4)
+
+    def _entries(self):
+        """
+        Yields ``(mtime, size, path)`` for each entry in the cache.
+        """
+        try:
+            subdirs = os.listdir(self.cache_dir)
+        except OSError:
+            return
+        for subdir in subdirs:
+            subdir = os.path.join(self.cache_dir, subdir)
+            try:
+                names = os.listdir(subdir)
+            except OSError:
+                continue
+            for name in names:
+                if not name.endswith(_SUFFIX):
+                    continue
+                path = os.path.join(subdir, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                yield st.st_mtime, st.st_size, path
+
+    def evict(self, max_size=None):
+        """
+        Removes the least recently used entries until their total size is at
+        most ``max_size`` bytes (by default, three quarters of the cache's
+        ``max_size``, so that evicting isn't needed again on the next put).
+        """
+        if max_size is None:
+            max_size = self.max_size * 3 // 4
+        with self._lock:
+            self._evict(max_size)
+
+    def _evict(self, max_size):
+        entries = sorted(self._entries())
+        size = sum(entry[1] for entry in entries)
+        for _, entry_size, path in entries:
+            if size <= max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            size -= entry_size
+            self.evictions += 1
+        self._size = size
+
+    def clear(self):
+        """
+        Removes all entries.
+        """
+        self.evict(max_size=0)
+
+    def stats(self):
+        """
+        Returns a dict with the numbers of hits, misses, writes and evicted
+        entries since the cache was created.
+        """
+        return {'hits': self.hits, 'misses': self.misses,
+                'writes': self.writes, 'evictions': self.evictions,
+                'cache_dir': self.cache_dir}
@@ -0,0 +1,215 @@
+"""
+Ahead-of-time translation for ``past.translation``.
+
+Translating Python 2 modules on their first import can take a long time
+for a large package. This translates every module in a package tree up
+front (e.g. when building a container image) and stores the results in the
+translation cache that the import hook consults, so that importing the
+modules later only needs cache lookups.
+
+Usage::
+
+    $ python -m past.translation.precompile -j 4 /path/to/site-packages/mypy2package
+
+or::
+
+    >>> from past.translation.precompile import precompile
+    >>> results = precompile(['/path/to/site-packages/mypy2package'],
+    ...                      num_processes=4)
+
+The cache keys include the path of each module, so translate the modules
+where they will be imported from, and use the same ``cache_dir`` (and
+version of Python and ``future``) as the import hook.
+"""
+
+from __future__ import absolute_import, print_function
+
+import io
+import optparse
+import os
+import sys
+import time
+
+from past.translation import Py2Fixer, RTs
+
+try:
+    from importlib.util import decode_source
+except ImportError:     # Python < 3.4
+    decode_source = None
+
+
+# The outcomes for a module:
+TRANSLATED = 'translated'   # translated and cached
+PYTHON3 = 'python3'         # detected as Python 3 code and cached unchanged
+CACHED = 'cached'           # already in the cache
+ERROR = 'error'             # couldn't be read, translated or compiled
+
+
+class Result(object):
+    """
+    The outcome of translating one module, with the time it took in seconds.
+    """
+    def __init__(self, pathname, status, seconds, message=None):
+        self.pathname = pathname
+        self.status = status
+        self.seconds = seconds
+        self.message = message
+
+    def __repr__(self):
+        return 'Result(%r, %r, %.3f)' % (self.pathname, self.status,
+                                         self.seconds)
+
+
+def find_modules(paths):
+    """
+    Returns the absolute paths of the Python modules in ``paths`` (files or
+    directories, searched recursively, skipping hidden directories), sorted.
+    """
+    modules = set()
+    for path in paths:
+        path = os.path.abspath(path)
+        if not os.path.isdir(path):
+            modules.add(path)
+            continue
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+            for name in filenames:
+                if name.endswith('.py') and not name.startswith('.'):
+                    modules.add(os.path.join(dirpath, name))
+    return sorted(modules)
+
+
+def read_source(pathname):
+    """
+    Reads a module's source the way the import system does, so that its
+    cache key matches the one the import hook computes.
+    """
+    with open(pathname, 'rb') as f:
+        data = f.read()
+    if decode_source is not None:
+        return decode_source(data)
+    with io.open(pathname, 'r') as f:
+        return f.read()
+
+
+# The import hook used by translate_module() in each process
+_fixer = None
+
+
+def _setup(cache_dir, cache_size):
+    global _fixer
+    _fixer = Py2Fixer()
+    _fixer.set_cache(cache_dir, cache_size)
+    # Create a set of refactoring tools now, so that this isn't counted in
+    # the time of the first module
+    with RTs.tools():
+        pass
+
+
+def translate_module(pathname):
+    """
+    Translates the module at ``pathname`` (an absolute path) and stores the
+    compiled code in the cache, unless it is already there. Returns a
+    ``Result``.
+    """
+    start = time.time()
+    try:
+        source = read_source(pathname)
+        cache = _fixer.cache
+        key = cache.key(source, pathname)
+        if cache.get(key) is not None:
+            status = CACHED
+        else:
+            _fixer.pathname = pathname
+            translated = _fixer.translate(source)
+            if translated is None:
+                status = PYTHON3
+            else:
+                source = translated
+                status = TRANSLATED
+            cache.put(key, compile(source, pathname, 'exec'))
+    except Exception as e:
+        return Result(pathname, ERROR, time.time() - start,
+                      '{0}: {1}'.format(type(e).__name__, e))
+    return Result(pathname, status, time.time() - start)
+
+
+def precompile(paths, cache_dir=None, cache_size=None, num_processes=1):
+    """
+    Translates the Python modules in ``paths`` (files or directories) into
+    the translation cache, in ``num_processes`` processes. The cache
+    directory and size default to those of the import hook.
+
+    Returns a list of ``Result`` objects, in the order of ``find_modules()``.
+    """
+    from past.translation import _hook
+    if cache_dir is None:
+        cache_dir = _hook.cache_dir
+    if not cache_dir:
+        raise ValueError('the translation cache is disabled')
+    if cache_size is None:
+        cache_size = _hook.cache_size
+    modules = find_modules(paths)
+    if num_processes <= 1 or len(modules) <= 1:
+        _setup(cache_dir, cache_size)
+        return [translate_module(pathname) for pathname in modules]
+
+    import multiprocessing
+    # Start with the largest modules, so that no process is left with a big
+    # one at the end
+    by_size = sorted(modules, key=os.path.getsize, reverse=True)
+    pool = multiprocessing.Pool(num_processes, _setup,
+                                (cache_dir, cache_size))
+    try:
+        results = dict((result.pathname, result) for result in
+                       pool.imap_unordered(translate_module, by_size))
+    finally:
+        pool.close()
+        pool.join()
+    return [results[pathname] for pathname in modules]
+
+
+def main(args=None):
+    """
+    Translates the modules in the given paths into the translation cache
+    and prints the time taken by each module. Returns 1 if any module
+    couldn't be translated, otherwise 0.
+    """
+    parser = optparse.OptionParser(
+        usage='python -m past.translation.precompile [options] path ...')
+    parser.add_option('-j', '--processes', type='int', default=1,
+                      help='run in this many processes (default: 1)')
+    parser.add_option('--cache-dir',
+                      help='the translation cache directory (default: the '
+                           'import hook\'s, {0})'.format(
+                               Py2Fixer().cache_dir))
+    parser.add_option('--cache-size', type='int',
+                      help='the maximum size of the cache, in bytes')
+    parser.add_option('-q', '--quiet', action='store_true',
+                      help='only print the summary and any errors')
+    options, args = parser.parse_args(args)
+    if not args:
+        parser.error('no paths given')
+
+    start = time.time()
+    results = precompile(args, options.cache_dir, options.cache_size,
+                         options.processes)
+    counts = {}
+    for result in results:
+        counts[result.status] = counts.get(result.status, 0) + 1
+        if result.status == ERROR:
+            print('{0:8.3f}s {1:<10} {2}: {3}'.format(
+                result.seconds, result.status, result.pathname,
+                result.message), file=sys.stderr)
+        elif not options.quiet:
+            print('{0:8.3f}s {1:<10} {2}'.format(
+                result.seconds, result.status, result.pathname))
+    print('{0} modules in {1:.3f}s: {2}'.format(
+        len(results), time.time() - start,
+        ', '.join('{0} {1}'.format(counts.get(status, 0), status)
+                  for status in (TRANSLATED, PYTHON3, CACHED, ERROR))))
+    return 1 if counts.get(ERROR) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,6 +5,7 @@ import pprint
 import tempfile
 from subprocess import Popen, PIPE
 import os
+from itertools import chain
 
 from libfuturize.fixer_util import is_shebang_comment, is_encoding_comment
 from lib2to3.fixer_util import FromImport
@@ -83,6 +84,664 @@ class TestLibFuturize(unittest.TestCase):
             self.assertFalse(is_encoding_comment(node))
 
 
+class TestFuturizeCache(CodeHandler):
+    """
+    Tests for the persistent cache of refactoring results used by
+    ``futurize --cache-dir``.
+    """
+    def setUp(self):
+        super(TestFuturizeCache, self).setUp()
+        self.cache_dir = os.path.join(self.tempdir, 'cache')
+        self.filename = self._write_test_script("print 'Hello'\n",
+                                                'mymodule.py')
+
+    def refactoring_tool(self, fixers=('libfuturize.fixes.fix_print_with_import',)):
+        return self._refactoring_tool(fixers, cache_dir=self.cache_dir)
+
+    def test_second_run_is_a_cache_hit(self):
+        rt = self.refactoring_tool()
+        rt.refactor([self.filename])
+        self.assertEqual((rt.cache.hits.value, rt.cache.misses.value), (0, 1))
+
+        rt = self.refactoring_tool()
+        rt.refactor([self.filename])
+        self.assertEqual((rt.cache.hits.value, rt.cache.misses.value), (1, 0))
+        # The file is still reported as needing changes:
+        self.assertEqual(rt.files, [self.filename])
+
+    def test_cached_result_is_written(self):
+        self.refactoring_tool().refactor([self.filename])
+        rt = self.refactoring_tool()
+        rt.refactor([self.filename], write=True)
+        self.assertEqual(rt.cache.hits.value, 1)
+        self.assertIn("print('Hello')", self._read_test_script('mymodule.py'))
+
+    def test_changed_source_is_a_cache_miss(self):
+        self.refactoring_tool().refactor([self.filename])
+        self._write_test_script("print 'Hello'\nprint 'Goodbye'\n",
+                                'mymodule.py')
+        rt = self.refactoring_tool()
+        rt.refactor([self.filename])
+        self.assertEqual((rt.cache.hits.value, rt.cache.misses.value), (0, 1))
+
+    def test_different_fixers_are_a_cache_miss(self):
+        self.refactoring_tool().refactor([self.filename])
+        rt = self.refactoring_tool(fixers=['lib2to3.fixes.fix_print'])
+        rt.refactor([self.filename])
+        self.assertEqual((rt.cache.hits.value, rt.cache.misses.value), (0, 1))
+
+    def test_sibling_modules_are_part_of_the_key(self):
+        # fix_absolute_import changes "import spam" only in a package with a
+        # spam module, so two identical files can have different results
+        for filename in ['pkgA/__init__.py', 'pkgA/spam.py',
+                         'pkgB/__init__.py']:
+            self._write_test_script('', filename)
+        fixers = ['libfuturize.fixes.fix_absolute_import']
+        for package in ['pkgB', 'pkgA']:
+            filename = self._write_test_script("import spam\n",
+                                               package + '/m.py')
+            self.refactoring_tool(fixers).refactor([filename], write=True)
+        self.assertEqual(self._read_test_script('pkgB/m.py'), "import spam\n")
+        self.assertIn("from . import spam", self._read_test_script('pkgA/m.py'))
+
+
+class TestFixerIndex(CodeHandler):
+    """
+    Tests for the dispatch index of the fixers that are matched node by node
+    (libfuturize.dispatch.FixerIndex).
+    """
+    def setUp(self):
+        super(TestFixerIndex, self).setUp()
+        from libpasteurize.fixes import fix_names
+        self.fixer_names = sorted(fix_names)
+        self.rt = self._refactoring_tool(self.fixer_names,
+                                         {'print_function': True})
+
+    def fixer_classes(self, node):
+        index = self.rt.bmi_post_order_heads
+        return set(type(f).__name__ for f in index.fixers_for(node))
+
+    def test_leaf_values_are_indexed(self):
+        self.assertIn('FixFullargspec',
+                      self.fixer_classes(Leaf(token.NAME, u'getfullargspec')))
+        self.assertNotIn('FixFullargspec',
+                         self.fixer_classes(Leaf(token.NAME, u'spam')))
+        # Patterns like name='queue' match leaves of any type with that value:
+        self.assertIn('FixImports',
+                      self.fixer_classes(Leaf(token.NAME, u'queue')))
+        self.assertNotIn('FixImports',
+                         self.fixer_classes(Leaf(token.NAME, u'spam')))
+
+    def test_same_output_as_lib2to3(self):
+        from lib2to3.main import StdoutRefactoringTool
+        code = reformat_code("""
+        import queue, configparser
+        from inspect import getfullargspec
+        def f(a, *, b=1) -> int:
+            print(a / b, file=None)
+            return queue.Queue(getfullargspec(f))
+        """)
+        stock = StdoutRefactoringTool(self.fixer_names,
+                                      {'print_function': True}, [],
+                                      True, False)
+        expected = stock.refactor_string(code, '<test>')
+        output = self.rt.refactor_string(code, '<test>')
+        self.assertTrue(output.was_changed)
+        self.assertEqual(str(output), str(expected))
+
+
+class TestPreFilter(CodeHandler):
+    """
+    Tests for the token-level pre-filter used by ``futurize --prefilter``
+    (libfuturize.prefilter).
+    """
+    def refactoring_tool(self, fixers, prefilter=True):
+        return self._refactoring_tool(fixers, prefilter=prefilter)
+
+    def stage1_fixers(self):
+        from libfuturize.fixes import (lib2to3_fix_names_stage1,
+                                       libfuturize_fix_names_stage1)
+        return lib2to3_fix_names_stage1 | libfuturize_fix_names_stage1
+
+    def test_pseudo_tokens(self):
+        from libfuturize import prefilter
+        tokens = prefilter.source_tokens(reformat_code("""
+        try:
+            x = 0755 + 10L
+        except (TypeError, ValueError), e:
+            raise ValueError, e
+        def f(a, (b, c)):
+            return [i for i in a, b]
+        """))
+        for t in [prefilter.PY2_NUMBER, prefilter.EXCEPT_COMMA,
+                  prefilter.PY2_RAISE, prefilter.COMP_TUPLE,
+                  prefilter.TUPLE_PARAMS]:
+            self.assertIn(t, tokens)
+
+        tokens = prefilter.source_tokens(reformat_code("""
+        try:
+            x = 0o755 + 10 + 0
+        except (TypeError, ValueError) as e:
+            raise ValueError(e, x)
+        def f(a, b: int) -> int:
+            return {k: v for k, v in [(a, b)]}
+        """))
+        for t in [prefilter.PY2_NUMBER, prefilter.EXCEPT_COMMA,
+                  prefilter.PY2_RAISE, prefilter.COMP_TUPLE,
+                  prefilter.TUPLE_PARAMS]:
+            self.assertNotIn(t, tokens)
+
+    def test_py3_clean_module_is_skipped(self):
+        code = reformat_code("""
+        import os
+        def f(values):
+            try:
+                return sum(int(v, base=8) for v in values)
+            except ValueError as e:
+                raise TypeError('invalid values: %r' % (values,))
+        """)
+        rt = self.refactoring_tool(self.stage1_fixers())
+        self.assertTrue(rt.prefilter.enabled)
+        filename = os.path.join(self.tempdir, 'mymodule.py')
+        tree = rt.refactor_string(code, filename)
+        self.assertFalse(tree.was_changed)
+        self.assertEqual(str(tree), code)
+        self.assertEqual(rt.prefilter.skipped.value, 1)
+
+    def test_same_output_as_without_prefilter(self):
+        code = reformat_code("""
+        import os
+        def f(values):
+            try:
+                return [int(v, base=8) for v in values]
+            except ValueError, e:
+                print 'Error:', e
+        """)
+        fixers = self.stage1_fixers()
+        filename = os.path.join(self.tempdir, 'mymodule.py')
+        expected = self.refactoring_tool(fixers, prefilter=False
+                                         ).refactor_string(code, filename)
+        rt = self.refactoring_tool(fixers)
+        output = rt.refactor_string(code, filename)
+        self.assertEqual(rt.prefilter.skipped.value, 0)
+        self.assertTrue(output.was_changed)
+        self.assertEqual(str(output), str(expected))
+
+    def test_local_imports_are_triggers(self):
+        # fix_absolute_import changes modules that import sibling modules
+        self._write_test_script('', '__init__.py')
+        self._write_test_script('', 'spam.py')
+        filename = os.path.join(self.tempdir, 'mymodule.py')
+        rt = self.refactoring_tool(['libfuturize.fixes.fix_absolute_import'])
+        self.assertTrue(rt.prefilter.can_skip(u'import os\n', filename))
+        self.assertFalse(rt.prefilter.can_skip(u'import spam\n', filename))
+        tree = rt.refactor_string(u'import spam\n', filename)
+        self.assertIn(u'from . import spam', str(tree))
+
+    def test_string_exception_is_not_skipped(self):
+        # fix_raise can't convert string exceptions, but it warns about them
+        code = u'raise "message"\n'
+        rt = self.refactoring_tool(['libfuturize.fixes.fix_raise'])
+        self.assertFalse(rt.prefilter.can_skip(code))
+        filename = os.path.join(self.tempdir, 'mymodule.py')
+        rt.refactor_string(code, filename)
+        self.assertTrue(any('string exceptions' in message
+                            for message in rt.fixer_log))
+        self.assertTrue(rt.prefilter.can_skip(u'raise ValueError("x")\n'))
+
+    def test_fixers_without_triggers_disable_prefilter(self):
+        fixers = ['libfuturize.fixes.fix_print_with_import',
+                  'libpasteurize.fixes.fix_add_all__future__imports']
+        rt = self.refactoring_tool(fixers)
+        self.assertFalse(rt.prefilter.enabled)
+        self.assertFalse(rt.prefilter.can_skip(u'x = 1\n'))
+        self.assertIn('fix_add_all__future__imports', rt.prefilter.summary())
+
+
+class TestWorkStealingScheduler(CodeHandler):
+    """
+    Tests for the scheduler used by ``futurize -j N``
+    (libfuturize.scheduler).
+    """
+    def test_assign_largest_first(self):
+        from libfuturize.scheduler import assign
+        sizes = [1, 100, 5, 60, 50, 2]
+        self.assertEqual(assign(sizes, 2), [[1, 2, 5, 0], [3, 4]])
+
+    def test_idle_worker_steals_from_the_back(self):
+        from libfuturize.scheduler import WorkStealingQueue
+        tasks = WorkStealingQueue([[0, 1, 2, 3], [4]])
+        self.assertEqual(tasks.take(1), 4)
+        self.assertEqual(tasks.take(1), 3)
+        self.assertEqual(tasks.take(0), 0)
+        self.assertEqual(tasks.take(1), 2)
+        self.assertEqual(tasks.take(0), 1)
+        self.assertIsNone(tasks.take(0))
+        self.assertIsNone(tasks.take(1))
+        self.assertEqual(tasks.steals.value, 2)
+
+    def test_same_output_as_single_process(self):
+        code = "print 'Hello'\nfor i in xrange(10): pass\n"
+        names = ['module%d.py' % i for i in range(6)]
+        filenames = [self._write_test_script(code * (i + 1), name)
+                     for i, name in enumerate(names)]
+        fixers = ['libfuturize.fixes.fix_print_with_import',
+                  'libfuturize.fixes.fix_xrange_with_import']
+        rt = self._refactoring_tool(fixers)
+        expected = [str(rt.refactor_string(code * (i + 1) + '\n',
+                                           '<test>'))[:-1]
+                    for i in range(6)]
+
+        rt = self._refactoring_tool(fixers)
+        rt.refactor([self.tempdir], write=True, num_processes=3)
+        self.assertEqual(sorted(rt.files), filenames)
+        self.assertTrue(rt.wrote)
+        for name, text in zip(names, expected):
+            self.assertEqual(self._read_test_script(name), text)
+        stats = rt.pool_stats
+        self.assertEqual(sum(stats.counts), 6)
+        self.assertEqual(len(stats.slowest(3)), 3)
+        self.assertIn('Worker utilisation', '\n'.join(stats.report()))
+
+    def test_files_of_a_crashed_worker_are_errors(self):
+        from libfuturize.tool import FuturizeRefactoringTool
+        class CrashingTool(FuturizeRefactoringTool):
+            def refactor_string(self, data, name):
+                if os.path.basename(name) == 'crash.py':
+                    os._exit(1)
+                return super(CrashingTool, self).refactor_string(data, name)
+        for name in ['a.py', 'crash.py', 'b.py', 'c.py']:
+            self._write_test_script("print 'Hello'\n", name)
+        rt = self._refactoring_tool(['libfuturize.fixes.fix_print_with_import'],
+                                    tool_class=CrashingTool)
+        rt.refactor([self.tempdir], num_processes=2)
+        errors = [msg % args for (msg, args, kwargs) in rt.errors]
+        self.assertTrue([e for e in errors if e.startswith('Worker process')
+                         and e.endswith('exited with code 1')], errors)
+        # The crashed worker's results that weren't sent yet are lost too,
+        # but every file is either refactored or reported
+        for name in ['a.py', 'crash.py', 'b.py', 'c.py']:
+            filename = os.path.join(self.tempdir, name)
+            missing = ("Can't refactor %s: its worker process exited before "
+                       "finishing it" % filename)
+            self.assertTrue(filename in rt.files or missing in errors, name)
+        self.assertNotIn(os.path.join(self.tempdir, 'crash.py'), rt.files)
+
+
+class TestFixerProfiler(CodeHandler):
+    """
+    Tests for ``futurize --profile-fixers`` (libfuturize.profiling).
+    """
+    def refactoring_tool(self, profile_fixers='table'):
+        fixers = ['libfuturize.fixes.fix_print_with_import',
+                  'libfuturize.fixes.fix_xrange_with_import']
+        return self._refactoring_tool(fixers, profile_fixers=profile_fixers)
+
+    def test_counts_matches(self):
+        rt = self.refactoring_tool()
+        code = "print 'Hello'\nprint 'Goodbye'\nx = 1\n"
+        self.assertIn("print('Hello')", str(rt.refactor_string(code, '<test>')))
+        stats = rt.profiler.fixers['libfuturize.fixes.fix_print_with_import']
+        nodes, matches, match_time, transform_time = stats
+        self.assertEqual(matches, 2)
+        self.assertTrue(nodes >= matches)
+        self.assertTrue(transform_time > 0)
+        self.assertEqual(
+            rt.profiler.fixers['libfuturize.fixes.fix_xrange_with_import'][1],
+            0)
+        self.assertEqual(rt.profiler.other['files'], 1)
+        self.assertTrue(rt.profiler.other['parse_time'] > 0)
+
+    def test_json_report(self):
+        import json
+        rt = self.refactoring_tool('json')
+        rt.refactor_string("for i in xrange(3): pass\n", '<test>')
+        report = json.loads(rt.profiler.to_json())
+        fixer = report['fixers']['libfuturize.fixes.fix_xrange_with_import']
+        self.assertEqual(fixer['matches'], 1)
+        self.assertEqual(sorted(fixer), ['match_time', 'matches', 'nodes',
+                                         'transform_time'])
+
+    def test_merge(self):
+        from libfuturize.profiling import FixerProfiler
+        rt = self.refactoring_tool()
+        rt.refactor_string("print 'Hello'\n", '<test>')
+        total = FixerProfiler()
+        total.merge(rt.profiler.take())
+        rt.refactor_string("print 'Hello'\n", '<test>')
+        total.merge(rt.profiler.take())
+        name = 'libfuturize.fixes.fix_print_with_import'
+        self.assertEqual(total.fixers[name][1], 2)
+        self.assertEqual(rt.profiler.fixers[name][1], 0)
+        self.assertEqual(total.other['files'], 2)
+
+
+class TestCheckMode(CodeHandler):
+    """
+    Tests for ``futurize --check``.
+    """
+    def refactoring_tool(self, fail_fast=False):
+        from libfuturize.fixes import (lib2to3_fix_names_stage1,
+                                       libfuturize_fix_names_stage1)
+        fixers = lib2to3_fix_names_stage1 | libfuturize_fix_names_stage1
+        return self._refactoring_tool(fixers, check=True, fail_fast=fail_fast)
+
+    def test_would_change(self):
+        rt = self.refactoring_tool()
+        code = "print 'Hello'\nprint 'Goodbye'\n"
+        tree = rt.refactor_string(code, '<test>')
+        self.assertTrue(tree.was_changed)
+        # Refactoring stopped before the text was rendered:
+        self.assertEqual(str(tree), code)
+
+    def test_unchanged_text_is_not_a_change(self):
+        # fix_except marks the tree as changed, but leaves this text as is:
+        rt = self.refactoring_tool()
+        code = reformat_code("""
+        try:
+            pass
+        except ValueError as e:
+            raise TypeError(e)
+        """)
+        self.assertFalse(rt.refactor_string(code, '<test>').was_changed)
+
+    def test_exit_status(self):
+        from libfuturize.main import main
+        clean = self._write_test_script("x = 1\n", 'clean.py')
+        py2 = self._write_test_script("print 'Hello'\n", 'py2.py')
+        self.assertEqual(main(['--check', '--stage1', clean]), 0)
+        self.assertEqual(main(['--check', '--stage1', clean, py2]), 1)
+        self.assertEqual(self._read_test_script('py2.py'), "print 'Hello'\n")
+
+    def test_fail_fast(self):
+        for name in ['a.py', 'b.py', 'c.py']:
+            self._write_test_script("print 'Hello'\n", name)
+        rt = self.refactoring_tool(fail_fast=True)
+        rt.refactor([self.tempdir])
+        self.assertEqual(len(rt.files), 1)
+
+
+class TestPatternCache(CodeHandler):
+    """
+    Tests for the cache of compiled fixer patterns (libfuturize.patcache).
+    """
+    def setUp(self):
+        super(TestPatternCache, self).setUp()
+        from libfuturize.fixes import (lib2to3_fix_names_stage1,
+                                       libfuturize_fix_names_stage1)
+        self.fixers = lib2to3_fix_names_stage1 | libfuturize_fix_names_stage1
+
+    def refactoring_tool(self, cache_dir=None):
+        return self._refactoring_tool(self.fixers, cache_dir=cache_dir)
+
+    def test_second_tool_uses_cached_patterns(self):
+        rt = self.refactoring_tool(self.tempdir)
+        self.assertEqual(rt.pattern_cache.hits, 0)
+        self.assertTrue(rt.pattern_cache.misses > 0)
+        rt = self.refactoring_tool(self.tempdir)
+        self.assertTrue(rt.pattern_cache.hits > 0)
+        self.assertEqual(rt.pattern_cache.misses, 0)
+
+    def test_same_output(self):
+        code = reformat_code("""
+        import ConfigParser
+        class A:
+            def next(self):
+                print 'Hello', 10L
+                return self.x.has_key(1)
+        """)
+        expected = str(self.refactoring_tool().refactor_string(code, '<test>'))
+        self.refactoring_tool(self.tempdir)
+        rt = self.refactoring_tool(self.tempdir)
+        self.assertTrue(rt.pattern_cache.hits > 0)
+        self.assertEqual(str(rt.refactor_string(code, '<test>')), expected)
+
+    def test_corrupt_cache_file_is_ignored(self):
+        from libfuturize.tool import PATTERN_CACHE_FILE
+        self._write_test_script('garbage', PATTERN_CACHE_FILE)
+        rt = self.refactoring_tool(self.tempdir)
+        self.assertEqual(rt.pattern_cache.hits, 0)
+        self.assertIn("print('Hello')",
+                      str(rt.refactor_string("print 'Hello'\n", '<test>')))
+
+
+class TestImportIndex(unittest.TestCase):
+    """
+    Tests for the per-tree index of imports used by touch_import_top() and
+    future_import() (libfuturize.fixer_util.ImportIndex).
+    """
+    def parse(self, code):
+        from lib2to3 import pygram, pytree
+        from lib2to3.pgen2 import driver
+        d = driver.Driver(pygram.python_grammar_no_print_statement,
+                          convert=pytree.convert)
+        return d.parse_string(reformat_code(code))
+
+    def test_same_answers_as_does_tree_import(self):
+        from lib2to3.fixer_util import does_tree_import
+        from libfuturize.fixer_util import import_index
+        tree = self.parse("""
+        from __future__ import print_function
+        import os
+        from os import path as p
+        def f():
+            from a import hidden
+        if os.name == 'nt':
+            from b import windows
+        else:
+            from c import posix
+        try:
+            from d import tried
+        except ImportError:
+            from e import fallback
+        for looped in range(3):
+            from f import inloop
+        from g import *
+        x = 1; from h import semi
+        """)
+        index = import_index(tree)
+        for package, name in [('__future__', 'print_function'),
+                              ('__future__', 'division'), ('os', 'path'),
+                              ('os', 'p'), ('a', 'hidden'),
+                              ('b', 'windows'), ('c', 'posix'),
+                              ('d', 'tried'), ('e', 'fallback'),
+                              ('f', 'inloop'), ('x', 'looped'),
+                              ('g', 'anything'), ('h', 'semi'),
+                              ('h', 'x')]:
+            self.assertEqual(index.imports(package, name),
+                             does_tree_import(package, name, tree),
+                             (package, name))
+
+    def test_helpers_update_index(self):
+        from libfuturize.fixer_util import (future_import, import_index,
+                                            touch_import_top)
+        tree = self.parse("""
+        '''Docstring'''
+        import os
+        x = 1
+        """)
+        index = import_index(tree)
+        future_import(u'division', tree.children[-2])
+        touch_import_top(u'builtins', u'range', tree.children[-2])
+        touch_import_top(u'future', u'standard_library', tree.children[-2])
+        touch_import_top(u'builtins', u'range', tree.children[-2])
+        future_import(u'division', tree.children[-2])
+        self.assertEqual(index.builds, 1)
+        self.assertTrue(index.imports(u'builtins', u'range'))
+        self.assertTrue(index.imports(u'__future__', u'division'))
+        self.assertEqual(str(tree), reformat_code("""
+        '''Docstring'''
+        from __future__ import division
+        from future import standard_library
+        standard_library.install_aliases()
+        from builtins import range
+        import os
+        x = 1
+        """))
+
+    def test_rebuilt_after_other_changes(self):
+        from libfuturize.fixer_util import import_index
+        tree = self.parse("""
+        import os
+        if os.name == 'nt':
+            from b import windows
+        x = 1
+        """)
+        index = import_index(tree)
+        self.assertTrue(index.imports('b', 'windows'))
+        # Replace the import inside the if statement:
+        suite = tree.children[1].children[-1]
+        new_stmt = self.parse("from c import posix\n").children[0]
+        suite.children[2].replace(new_stmt)
+        self.assertFalse(index.imports('b', 'windows'))
+        self.assertTrue(index.imports('c', 'posix'))
+        self.assertEqual(index.builds, 2)
+        # Insert an import at the top level:
+        tree.insert_child(0, self.parse("from d import new\n").children[0])
+        self.assertTrue(index.imports('d', 'new'))
+        self.assertEqual(index.builds, 3)
+
+
+def _have_git():
+    try:
+        Popen(['git', '--version'], stdout=PIPE, stderr=PIPE).communicate()
+    except OSError:
+        return False
+    return True
+
+
+@unittest.skipIf(not _have_git(), 'git is not available')
+class TestSince(CodeHandler):
+    """
+    Tests for ``futurize --since REV`` (libfuturize.gitfiles).
+    """
+    def setUp(self):
+        super(TestSince, self).setUp()
+        self.cwd = os.getcwd()
+        os.chdir(self.tempdir)
+        self.git('init', '-q')
+        self.git('config', 'user.email', 'futurize@example.com')
+        self.git('config', 'user.name', 'futurize')
+        for filename in ['pkg/a.py', 'pkg/b.py', 'pkg/sub/c.py',
+                         'pkg/.hidden/d.py', 'other.py']:
+            self._write_test_script("print 'Hello'\n", filename)
+        self.git('add', '.')
+        self.git('commit', '-q', '-m', 'Initial commit')
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        super(TestSince, self).tearDown()
+
+    def git(self, *args):
+        p = Popen(('git',) + args, stdout=PIPE, stderr=PIPE)
+        p.communicate()
+        self.assertEqual(p.returncode, 0)
+
+    def test_changed_files(self):
+        from libfuturize.gitfiles import changed_files
+        self._write_test_script("print 'Changed'\n", 'pkg/a.py')
+        self._write_test_script("print 'New'\n", 'pkg/sub/new.py')
+        self._write_test_script("print 'Hidden'\n", 'pkg/.hidden/d.py')
+        self._write_test_script("Not Python\n", 'pkg/notes.txt')
+        self._write_test_script("print 'Outside'\n", 'other.py')
+        self.git('rm', '-q', 'pkg/b.py')
+        self.assertEqual(changed_files('HEAD', ['pkg']),
+                         [os.path.join('pkg', 'a.py'),
+                          os.path.join('pkg', 'sub', 'new.py')])
+        self.git('add', '.')
+        self.git('commit', '-q', '-m', 'Second commit')
+        self.assertEqual(changed_files('HEAD', ['pkg']), [])
+        self.assertEqual(changed_files('HEAD~1', ['pkg/sub', 'other.py']),
+                         ['other.py', os.path.join('pkg/sub', 'new.py')])
+
+    def test_unknown_revision(self):
+        from libfuturize.gitfiles import GitError, changed_files
+        self.assertRaises(GitError, changed_files, 'no-such-rev', ['pkg'])
+
+    def test_only_changed_files_are_written(self):
+        from libfuturize.main import main
+        self._write_test_script("print 'Changed'\n", 'pkg/a.py')
+        self.assertEqual(main(['--since', 'HEAD', '-w', '-n', '-j', '2',
+                               '--no-diffs', 'pkg']), 0)
+        self.assertIn("print('Changed')", self._read_test_script('pkg/a.py'))
+        self.assertEqual(self._read_test_script('pkg/b.py'),
+                         "print 'Hello'\n")
+
+
+class TestJSONLinesReport(CodeHandler):
+    """
+    Tests for the report written with ``futurize --report-jsonl FILE``
+    (libfuturize.report).
+    """
+    def setUp(self):
+        super(TestJSONLinesReport, self).setUp()
+        self.report = os.path.join(self.tempdir, 'report.jsonl')
+        self.files = {}
+        for name, code in [('changed.py', "x = 1\nprint 'Hello'\n"),
+                           ('unchanged.py', "x = 1\n"),
+                           ('broken.py', "print 'Hello\n")]:
+            self.files[name] = self._write_test_script(code, name)
+
+    def records(self, num_processes=1, **kwargs):
+        import json
+        rt = self._refactoring_tool(
+            ['lib2to3.fixes.fix_numliterals',
+             'libfuturize.fixes.fix_print_with_import'],
+            report_output=self.report, **kwargs)
+        rt.refactor(sorted(self.files.values()),
+                    num_processes=num_processes)
+        rt.summarize()
+        with open(self.report) as f:
+            records = [json.loads(line) for line in f]
+        return dict((os.path.basename(r['path']), r) for r in records)
+
+    def test_changed_lines(self):
+        from libfuturize.report import changed_lines
+        self.assertEqual(changed_lines("a\nb\nc\n", "a\nB\nc\n"),
+                         [[2, 1, 2, 1]])
+        self.assertEqual(changed_lines("a\nb\n", "x\na\nb\n"),
+                         [[0, 0, 1, 1]])
+        self.assertEqual(changed_lines("a\nb\nc\n", "a\nc\n"),
+                         [[2, 1, 1, 0]])
+        self.assertEqual(changed_lines("a\n", "a\n"), [])
+
+    def test_records(self):
+        records = self.records()
+        self.assertEqual(sorted(records), ['broken.py', 'changed.py',
+                                           'unchanged.py'])
+        changed = records['changed.py']
+        self.assertTrue(changed['changed'])
+        self.assertEqual(changed['fixers'],
+                         ['libfuturize.fixes.fix_print_with_import'])
+        # The import is added at the top and the print statement changed:
+        self.assertEqual(changed['lines'], [[0, 0, 1, 1], [2, 1, 3, 1]])
+        self.assertEqual(changed['errors'], [])
+        self.assertTrue(changed['time'] >= 0)
+        unchanged = records['unchanged.py']
+        self.assertEqual((unchanged['changed'], unchanged['fixers'],
+                          unchanged['lines']), (False, [], []))
+        broken = records['broken.py']
+        self.assertFalse(broken['changed'])
+        self.assertEqual(len(broken['errors']), 1)
+        self.assertIn("Can't parse", broken['errors'][0])
+
+    def test_same_records_with_processes(self):
+        expected = self.records()
+        records = self.records(num_processes=2)
+        for record in chain(expected.values(), records.values()):
+            del record['time']
+        self.assertEqual(records, expected)
+
+    def test_cached_results_keep_fixers(self):
+        cache_dir = os.path.join(self.tempdir, 'cache')
+        expected = self.records(cache_dir=cache_dir)
+        records = self.records(cache_dir=cache_dir)
+        self.assertEqual(records['changed.py']['fixers'],
+                         expected['changed.py']['fixers'])
+        self.assertEqual(records['changed.py']['lines'],
+                         expected['changed.py']['lines'])
+
+
 class TestFuturizeSimple(CodeHandler):
     """
     This class contains snippets of Python 2 code (invalid Python 3) and
@@ -557,6 +557,43 @@ class IntTestCases(unittest.TestCase):
         self.assertEqual(type(e), int)         # i.e. another newint
         self.assertTrue(isinstance(e, int))
 
+        g = int(7) // 2.0
+        self.assertEqual(g, 3.0)
+        self.assertTrue(isinstance(g, float))
+        h = 7.0 // int(2)
+        self.assertEqual(h, 3.0)
+        self.assertTrue(isinstance(h, float))
+
+    def test_pow(self):
+        a = int(2)
+        self.assertEqual(a ** 3, 8)
+        self.assertEqual(type(a ** 3), int)    # i.e. another newint
+        self.assertEqual(3 ** a, 9)
+        self.assertEqual(type(3 ** a), int)
+        # Not pow(), which is future.builtins.pow here and unwraps newints:
+        self.assertEqual(a.__pow__(10, 1000), 24)
+        self.assertEqual(type(a.__pow__(10, 1000)), int)
+        # A negative exponent gives a float:
+        self.assertEqual(a ** -1, 0.5)
+        self.assertTrue(isinstance(a ** -1, float))
+
+    def test_newints(self):
+        from future.types.newint import newint, newints, newint_sum
+        values = newints([1, 2, int(3), True])
+        self.assertEqual(values, [1, 2, 3, 1])
+        for value in values:
+            self.assertEqual(type(value), newint)
+        self.assertRaises(TypeError, newints, [1.5])
+
+        total = newint_sum(values, 10)
+        self.assertEqual(total, 17)
+        self.assertEqual(type(total), newint)
+        self.assertEqual(newint_sum([]), 0)
+        self.assertEqual(newint_sum([2 ** 70, newint(1)], newint(2)),
+                         2 ** 70 + 3)
+        self.assertRaises(TypeError, newint_sum, ['1'])
+        self.assertRaises(TypeError, newint_sum, [1.5])
+
 
     def test_div(self):
         """
@@ -1059,6 +1096,38 @@ class IntTestCases(unittest.TestCase):
             self.assertRaises(TypeError, myint.from_bytes, mytype(0), 'big')
             # self.assertRaises(TypeError, int.from_bytes, mytype(0), 'big', True)
 
+    def test_ints_to_bytes(self):
+        from future.types.newint import ints_to_bytes, ints_from_bytes
+        values = [0, 1, -1, 127, -128, 1000, -1000]
+        for length in (2, 3, 4, 8, 9):
+            for byteorder in ('big', 'little'):
+                expected = b''.join(
+                    bytes(int(value).to_bytes(length, byteorder, signed=True))
+                    for value in values)
+                data = ints_to_bytes(values, length, byteorder, signed=True)
+                self.assertEqual(data, expected)
+                self.assertTrue(isinstance(data, bytes))
+                self.assertEqual(ints_from_bytes(data, length, byteorder,
+                                                 signed=True), values)
+                self.assertEqual(ints_from_bytes(bytearray(data), length,
+                                                 byteorder, signed=True),
+                                 values)
+
+        unsigned = [0, 1, 255, 65535]
+        data = ints_to_bytes(array.array('H', unsigned), 2, 'little')
+        self.assertEqual(data, bytes(b'\x00\x00\x01\x00\xff\x00\xff\xff'))
+        self.assertEqual(ints_from_bytes(data, 2, 'little'), unsigned)
+        self.assertEqual(ints_to_bytes(iter(unsigned), 3, 'big'),
+                         bytes(b'\x00\x00\x00\x00\x00\x01'
+                               b'\x00\x00\xff\x00\xff\xff'))
+
+        self.assertRaises(OverflowError, ints_to_bytes, [1, 256], 1)
+        self.assertRaises(OverflowError, ints_to_bytes, [1, -1], 3)
+        self.assertRaises(OverflowError, ints_to_bytes, [1, 1 << 23], 3,
+                          signed=True)
+        self.assertRaises(ValueError, ints_to_bytes, [1], 2, 'middle')
+        self.assertRaises(ValueError, ints_from_bytes, b'\x00' * 5, 2)
+
     @expectedFailurePY2
     def test_multiple_inheritance(self):
         """
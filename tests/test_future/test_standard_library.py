@@ -12,6 +12,7 @@ import tempfile
 import os
 import copy
 import textwrap
+import types
 from subprocess import CalledProcessError
 
 
@@ -64,6 +65,72 @@ class TestStandardLibraryReorganization(CodeHandler):
                     not any ([standard_library.is_py2_stdlib_module(module)
                               for module in py2modules]))
 
+    @unittest.skipIf(utils.PY3, 'is_py2_stdlib_module() is for Py2 only')
+    def test_is_py2_stdlib_module_index(self):
+        """
+        Each module is only inspected once, unless another module file
+        appears under its name. The index doesn't keep the modules alive.
+        """
+        index = standard_library._py2_stdlib_index
+        self.assertTrue(standard_library.is_py2_stdlib_module(tempfile))
+        key = ('tempfile', tempfile.__file__)
+        self.assertTrue(index[key] is True)
+        self.assertFalse(tempfile in index.values())
+        # A cached result is returned as is:
+        index[key] = 'cached'
+        self.assertEqual(standard_library.is_py2_stdlib_module(tempfile),
+                         'cached')
+        # ... but only for the same file
+        other = types.ModuleType('tempfile')
+        other.__file__ = utils.__file__
+        self.assertTrue(standard_library.is_py2_stdlib_module(other) is False)
+        del index[key]
+
+    def test_restore_sys_modules(self):
+        """
+        restore_sys_modules() puts scrubbed modules back unless that would
+        replace a module imported since.
+        """
+        name = 'future._test_scrubbed'
+        standard_library.restore_sys_modules({name: utils})
+        try:
+            self.assertTrue(sys.modules[name] is utils)
+            with self.assertRaises(ImportError):
+                standard_library.restore_sys_modules({name: copy})
+            self.assertTrue(sys.modules[name] is utils)
+        finally:
+            del sys.modules[name]
+
+    def test_import_cache_invalidation(self):
+        """
+        Modules cached by import_() and from_import() are looked up in
+        sys.modules, and only used while each is still an attribute of its
+        parent package.
+        """
+        key = ('import_', 'test.cache', False)
+        cache = standard_library._import_cache
+        cache[key] = ['future', 'future.utils']
+        try:
+            self.assertEqual(standard_library._cached_modules(key),
+                             [sys.modules['future'], utils])
+            sys.modules['future.utils'] = copy
+            self.assertTrue(standard_library._cached_modules(key) is None)
+            del sys.modules['future.utils']
+            self.assertTrue(standard_library._cached_modules(key) is None)
+        finally:
+            sys.modules['future.utils'] = utils
+            del cache[key]
+
+    @unittest.skipIf(utils.PY3, 'import_() is only cached on Py2')
+    def test_import_cache(self):
+        http = standard_library.import_('http.client')
+        self.assertTrue(standard_library.import_('http.client') is http)
+        del sys.modules['future.moves.http.client']
+        self.assertTrue(standard_library.import_('http.client').client
+                        is sys.modules['future.moves.http.client'])
+        quote = standard_library.from_import('urllib.parse', 'quote')
+        self.assertEqual(quote('a b'), 'a%20b')
+
     # @unittest.skip("No longer relevant")
     # def test_all_modules_identical(self):
     #     """
@@ -479,6 +546,77 @@ class TestStandardLibraryReorganization(CodeHandler):
 
         self.assertTrue('urlopen' in dir(urllib.request))
 
+    def test_lazy_alias(self):
+        """
+        A lazy module alias imports its module on first use and then
+        replaces itself with it.
+        """
+        import future
+        from future.standard_library import _alias_module, _LazyModule
+        name = 'future._test_lazy_alias'
+        _alias_module(name, 'future.utils', lazy=True)
+        try:
+            alias = sys.modules[name]
+            self.assertTrue(isinstance(alias, _LazyModule))
+            self.assertTrue(future._test_lazy_alias is alias)
+
+            self.assertTrue(alias.with_metaclass is utils.with_metaclass)
+            self.assertTrue(sys.modules[name] is utils)
+            self.assertTrue(future._test_lazy_alias is utils)
+            self.assertTrue('with_metaclass' in dir(alias))
+        finally:
+            sys.modules.pop(name, None)
+            if hasattr(future, '_test_lazy_alias'):
+                del future._test_lazy_alias
+
+    @unittest.skipIf(utils.PY3, 'install_aliases() does nothing on Py3')
+    def test_install_aliases_lazy(self):
+        """
+        The urllib backports are only imported when first used.
+        """
+        from future.standard_library import _LazyModule
+        saved = dict(sys.modules)
+        try:
+            for name in list(sys.modules):
+                if (name.startswith('future.backports.urllib') or
+                        name.startswith('urllib.')):
+                    del sys.modules[name]
+            standard_library.install_aliases()
+            self.assertTrue(isinstance(sys.modules['urllib.parse'],
+                                       _LazyModule))
+            self.assertFalse('future.backports.urllib.parse' in sys.modules)
+
+            import urllib.parse
+            self.assertEqual(urllib.parse.quote('a b'), 'a%20b')
+            self.assertTrue('future.backports.urllib.parse' in sys.modules)
+            self.assertFalse(isinstance(sys.modules['urllib.parse'],
+                                        _LazyModule))
+        finally:
+            sys.modules.clear()
+            sys.modules.update(saved)
+            standard_library.install_aliases(lazy=False)
+
+    @unittest.skipIf(utils.PY3, 'install_aliases() does nothing on Py3')
+    def test_install_aliases_test_support(self):
+        """
+        test.support works after install_aliases(), although Py2.7.18's
+        test.test_support imports test.support itself.
+        """
+        saved = dict(sys.modules)
+        try:
+            for name in list(sys.modules):
+                if (name.startswith('test.support') or
+                        name.startswith('test.test_support') or
+                        name.startswith('future.moves.test')):
+                    del sys.modules[name]
+            standard_library.install_aliases()
+            import test.support
+            self.assertTrue(callable(test.support.run_unittest))
+        finally:
+            sys.modules.clear()
+            sys.modules.update(saved)
+            standard_library.install_aliases(lazy=False)
+
 
 class TestFutureMoves(CodeHandler):
     def test_future_moves_urllib_request(self):
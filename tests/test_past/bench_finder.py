@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+"""
+Microbenchmark of the overhead of the ``past.translation`` import hook on
+imports of modules that it doesn't translate.
+
+It measures:
+
+1. the time to decide whether a module name should be translated, with the
+   ``PrefixTrie`` of the hook and with a linear scan of the include and
+   exclude prefixes like the one the hook used before, for the names in
+   ``sys.modules``;
+
+2. the time per import of small generated modules that don't match the
+   include prefixes, with and without the hook installed.
+
+This is not run by the test suite. Usage:
+
+    $ python tests/test_past/bench_finder.py [--prefixes N] [--modules N]
+"""
+
+from __future__ import absolute_import, print_function
+
+import gc
+import optparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+
+warnings.simplefilter('ignore', DeprecationWarning)
+from past.translation import install_hooks, remove_hooks, PrefixTrie, _hook
+
+
+def linear_match(fullname, include_paths, exclude_paths):
+    # The previous test in Py2Fixer.load_module()
+    if any([fullname.startswith(path) for path in exclude_paths]):
+        return False
+    return any([fullname.startswith(path) for path in include_paths])
+
+
+def bench_match(names, include_paths, exclude_paths, repeat):
+    """
+    Returns the best time per name of the two ways of matching.
+    """
+    trie = PrefixTrie(include_paths, exclude_paths)
+    assert ([trie.match(name) for name in names] ==
+            [linear_match(name, include_paths, exclude_paths)
+             for name in names]), 'matches differ'
+    best_linear = best_trie = None
+    for _ in range(repeat):
+        start = time.time()
+        for name in names:
+            linear_match(name, include_paths, exclude_paths)
+        linear = (time.time() - start) / len(names)
+        start = time.time()
+        for name in names:
+            trie.match(name)
+        trie_time = (time.time() - start) / len(names)
+        best_linear = linear if best_linear is None else min(best_linear, linear)
+        best_trie = trie_time if best_trie is None else min(best_trie, trie_time)
+    return best_linear, best_trie
+
+
+def bench_imports(dirname, names, hook):
+    """
+    Returns the time per import of the modules.
+    """
+    if hook:
+        install_hooks(_hook.include_paths or ['nomatch'])
+    sys.path.insert(0, dirname)
+    gc.collect()
+    try:
+        start = time.time()
+        for name in names:
+            __import__(name)
+        return (time.time() - start) / len(names)
+    finally:
+        if hook:
+            remove_hooks()
+        sys.path.remove(dirname)
+
+
+def main():
+    parser = optparse.OptionParser(usage='%prog [options]')
+    parser.add_option('--prefixes', type='int', default=20,
+                      help='number of include prefixes (default: 20)')
+    parser.add_option('--modules', type='int', default=500,
+                      help='number of modules to import (default: 500)')
+    parser.add_option('--repeat', type='int', default=3,
+                      help='report the best of this many runs (default: 3)')
+    options, args = parser.parse_args()
+
+    include_paths = ['py2package%d' % i for i in range(options.prefixes)]
+    exclude_paths = _hook.base_exclude_paths + ['py2package0.py3']
+    names = sorted(sys.modules) * 20
+    linear, trie = bench_match(names, include_paths, exclude_paths,
+                               options.repeat)
+    print('Matching {0} names against {1} prefixes'.format(
+        len(names), len(include_paths) + len(exclude_paths)))
+    print('{0:<20} {1:>8.0f}ns per name'.format('linear scan', linear * 1e9))
+    print('{0:<20} {1:>8.0f}ns per name'.format('PrefixTrie', trie * 1e9))
+    print('{0:<20} {1:>8.2f}x'.format('speedup', linear / trie))
+
+    _hook.include(include_paths)
+    dirname = tempfile.mkdtemp()
+    try:
+        # Each run imports modules of its own, as imported modules are cached
+        runs = []
+        for run in range(options.repeat):
+            for hook in (False, True):
+                run_names = ['plain%d_%d_%d' % (run, hook, i)
+                             for i in range(options.modules)]
+                for name in run_names:
+                    with open(os.path.join(dirname, name + '.py'), 'w') as f:
+                        f.write('x = 1\n')
+                runs.append((hook, run_names))
+        best = {}
+        # Alternate between the configurations, so that they run under the
+        # same conditions
+        for hook, run_names in runs:
+            seconds = bench_imports(dirname, run_names, hook)
+            best[hook] = min(best.get(hook, seconds), seconds)
+    finally:
+        shutil.rmtree(dirname)
+
+    print()
+    print('Importing {0} modules that are not translated'.format(
+        options.modules))
+    print('{0:<20} {1:>8.1f}us per import'.format('without the hook',
+                                                  best[False] * 1e6))
+    print('{0:<20} {1:>8.1f}us per import'.format('with the hook',
+                                                  best[True] * 1e6))
+    print('{0:<20} {1:>8.1f}us per import'.format(
+        'overhead', (best[True] - best[False]) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
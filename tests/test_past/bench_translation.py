@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+"""
+Benchmark of importing a package of Python 2 modules with the
+``past.translation`` import hook, with each module parsed once (by
+``past.translation.translate()``) and with each module parsed twice, once
+by ``detect_python2()`` and once by ``Py2Fixer.transform()``.
+
+The package is generated in a temporary directory. The translation cache is
+disabled, so that every module is translated on each import. The imported
+modules are checked to be the same in both configurations.
+
+This is not run by the test suite. Usage:
+
+    $ python tests/test_past/bench_translation.py [--modules N]
+"""
+
+from __future__ import absolute_import, print_function
+
+import gc
+import optparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+
+warnings.simplefilter('ignore', DeprecationWarning)
+from past.translation import (install_hooks, remove_hooks, detect_python2,
+                              _hook)
+
+
+PACKAGE = 'benchpy2package'
+
+MODULE = '''\
+"""
+Generated Python 2 module number {0}.
+"""
+import os
+
+LIMIT = 10L
+
+
+class Counter:
+    def __init__(self, name):
+        self.name = name
+        self.counts = {{}}
+
+    def add(self, key):
+        if self.counts.has_key(key):
+            self.counts[key] += 1
+        else:
+            self.counts[key] = 1
+
+    def next(self):
+        return max(self.counts.values())
+
+    def report(self):
+        for key, value in sorted(self.counts.items()):
+            print '%s: %d' % (key, value)
+
+
+def total(n):
+    result = 0
+    for i in xrange(n):
+        result += i
+    return result
+
+
+def safe_int(value):
+    try:
+        return int(value)
+    except ValueError, e:
+        return None
+
+
+def describe(value):
+    if isinstance(value, basestring):
+        return 'string'
+    return `value`
+
+
+VALUE = total({0} % LIMIT)
+'''
+
+
+def make_package(dirname, n_modules):
+    package = os.path.join(dirname, PACKAGE)
+    os.mkdir(package)
+    with open(os.path.join(package, '__init__.py'), 'w') as f:
+        f.write('')
+    for i in range(n_modules):
+        with open(os.path.join(package, 'module%d.py' % i), 'w') as f:
+            f.write(MODULE.format(i))
+
+
+def translate_twice(source):
+    # The previous behaviour of Py2Fixer.translate()
+    if detect_python2(source, _hook.pathname):
+        return _hook.transform(source)
+    return None
+
+
+def run(dirname, n_modules, translate):
+    """
+    Imports the package's modules and returns the time taken and the
+    modules' values.
+    """
+    for name in list(sys.modules):
+        if name == PACKAGE or name.startswith(PACKAGE + '.'):
+            del sys.modules[name]
+    if translate is not None:
+        _hook.translate = translate
+    install_hooks([PACKAGE], cache_dir=False)
+    sys.path.insert(0, dirname)
+    gc.collect()
+    try:
+        start = time.time()
+        values = []
+        for i in range(n_modules):
+            name = '%s.module%d' % (PACKAGE, i)
+            __import__(name)
+            values.append(sys.modules[name].VALUE)
+        return time.time() - start, values
+    finally:
+        remove_hooks()
+        sys.path.remove(dirname)
+        if translate is not None:
+            del _hook.translate
+
+
+def main():
+    parser = optparse.OptionParser(usage='%prog [options]')
+    parser.add_option('--modules', type='int', default=300,
+                      help='number of modules in the package (default: 300)')
+    parser.add_option('--repeat', type='int', default=3,
+                      help='report the best of this many runs (default: 3)')
+    options, args = parser.parse_args()
+
+    dirname = tempfile.mkdtemp()
+    try:
+        make_package(dirname, options.modules)
+        configurations = [('parse twice', translate_twice),
+                          ('parse once', None)]
+        best = [None] * len(configurations)
+        results = set()
+        # Alternate between the configurations, so that they run under the
+        # same conditions
+        for _ in range(options.repeat):
+            for i, (label, translate) in enumerate(configurations):
+                seconds, values = run(dirname, options.modules, translate)
+                best[i] = seconds if best[i] is None else min(best[i], seconds)
+                results.add(tuple(values))
+        assert len(results) == 1, 'imported modules differ'
+    finally:
+        shutil.rmtree(dirname)
+
+    print('Importing {0} modules'.format(options.modules))
+    for (label, _), seconds in zip(configurations, best):
+        print('{0:<12} {1:>8.3f}s'.format(label, seconds))
+    print('{0:<12} {1:>8.2f}x'.format('speedup', best[0] / best[1]))
+
+
+if __name__ == '__main__':
+    main()
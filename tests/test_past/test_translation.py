@@ -11,22 +11,45 @@ import pprint
 import tempfile
 import os
 import io
+import shutil
 from subprocess import Popen, PIPE
 
 from past import utils
 from past.builtins import basestring, str as oldstr, unicode
 
-from past.translation import install_hooks, remove_hooks, common_substring
+from past.translation import (install_hooks, remove_hooks, common_substring,
+                              detect_python2, translate, Py2Fixer, PrefixTrie,
+                              stats, print_stats, _hook)
+from past.translation.cache import TranslationCache
+from past.translation.precompile import precompile
 from future.tests.base import (unittest, CodeHandler, skip26,
                                expectedFailurePY3, expectedFailurePY26)
 
 
-class TestTranslate(unittest.TestCase):
+class HookCacheTestCase(unittest.TestCase):
+    """
+    Points the translation cache of the import hook at a temporary
+    directory for each test, instead of the user's cache directory, and
+    restores the previous cache settings afterwards.
+    """
     def setUp(self):
+        self.saved_cache = (_hook.cache_dir, _hook.cache_size)
+        self.hook_cache_dir = tempfile.mkdtemp()
+        _hook.set_cache(self.hook_cache_dir)
+
+    def tearDown(self):
+        _hook.set_cache(*self.saved_cache)
+        shutil.rmtree(self.hook_cache_dir)
+
+
+class TestTranslate(HookCacheTestCase):
+    def setUp(self):
+        super(TestTranslate, self).setUp()
         self.tempdir = tempfile.mkdtemp() + os.path.sep
 
-    # def tearDown(self):
-    #     remove_hooks()
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+        super(TestTranslate, self).tearDown()
 
     def test_common_substring(self):
         s1 = '/home/user/anaconda/envs/future3/lib/python3.3/lib-dynload/math.cpython-33m.so'
@@ -173,7 +196,395 @@ class TestTranslate(unittest.TestCase):
         module = self.write_and_import(code, 'py2_exceptions')
         self.assertEqual(module.value, 'string: success!')
 
+
+class TestPrefixTrie(unittest.TestCase):
+    """
+    Tests for the matching of module names against the include and exclude
+    paths of the import hook.
+    """
+    def test_match(self):
+        prefixes = PrefixTrie(include=['mypkg', 'other.sub'],
+                              exclude=['future', 'past', 'mypkg.py3'])
+        for name in ['mypkg', 'mypkg.module', 'mypkgextra', 'other.sub',
+                     'other.submodule']:
+            self.assertTrue(prefixes.match(name), name)
+        for name in ['', 'os', 'my', 'other', 'mypkg.py3', 'mypkg.py3.module',
+                     'future', 'past.builtins']:
+            self.assertFalse(prefixes.match(name), name)
+
+    def test_exclude_takes_precedence(self):
+        prefixes = PrefixTrie(include=['mypkg.sub'], exclude=['mypkg'])
+        self.assertFalse(prefixes.match('mypkg.sub.module'))
+        prefixes = PrefixTrie(include=['mypkg'], exclude=['mypkg'])
+        self.assertFalse(prefixes.match('mypkg'))
+
+    def test_empty_prefix(self):
+        self.assertTrue(PrefixTrie(include=['']).match('os'))
+        self.assertFalse(PrefixTrie(include=[''], exclude=['o']).match('os'))
+
+    def test_unmatched_modules_are_not_found(self):
+        fixer = Py2Fixer()
+        fixer.include(['mypkg'])
+        self.assertIsNone(fixer.find_spec('os'))
+        self.assertIsNone(fixer.find_spec('past.builtins'))
+
+
+class TestSingleParse(unittest.TestCase):
+    """
+    Tests for translate(), which detects and translates Python 2 code with a
+    single parse.
+    """
+    def translate_twice(self, source, pathname):
+        if detect_python2(source, pathname):
+            fixer = Py2Fixer()
+            fixer.pathname = pathname
+            return fixer.transform(source)
+        return None
+
+    def test_same_as_detect_and_transform(self):
+        for code in ["print 'Hello'\n",
+                     "x = 10L\nfor i in xrange(x):\n    pass\n",
+                     "from __future__ import print_function\n"
+                     "print('Hello', file=None)\n",
+                     "print('Hello', end='')\n",
+                     "x = 3 / 2\n"]:
+            self.assertEqual(translate(code, 'mymodule.py'),
+                             self.translate_twice(code, 'mymodule.py'))
+
+    def test_overridden_transform_is_used(self):
+        class MyFixer(Py2Fixer):
+            def transform(self, source):
+                return 'transformed = True\n'
+        fixer = MyFixer()
+        fixer.pathname = 'mymodule.py'
+        self.assertEqual(fixer.translate("print 'Hello'\n"),
+                         'transformed = True\n')
+
+
+class TestDebugDumps(unittest.TestCase):
+    """
+    Tests for the files written with install_hooks(..., debug_dir=...).
+    """
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.debug_dir = os.path.join(self.tempdir, 'debug')
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_no_files_by_default(self):
+        translate("print 'Hello'\n", 'mymodule.py')
+        self.assertFalse(os.path.exists(self.debug_dir))
+
+    def test_files_per_module(self):
+        pathname = os.path.join(self.tempdir, 'mymodule.py')
+        translate("print 'Hello'\n", pathname, debug_dir=self.debug_dir)
+        prefix = os.path.splitdrive(pathname)[1][:-3].strip(os.sep)
+        prefix = prefix.replace(os.sep, '_')
+        self.assertEqual(sorted(os.listdir(self.debug_dir)),
+                         [prefix + '.futurized.py', prefix + '.original.py',
+                          prefix + '.py2_detection.py'])
+        with open(os.path.join(self.debug_dir,
+                               prefix + '.futurized.py')) as f:
+            self.assertIn("print('Hello')", f.read())
+
+
+class TestTranslationCache(HookCacheTestCase):
+    """
+    Tests for the cache of translated modules (past.translation.cache).
+    """
+    def setUp(self):
+        super(TestTranslationCache, self).setUp()
+        self.tempdir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.tempdir, 'cache')
+        self.cache = TranslationCache(self.cache_dir, ['lib2to3.fixes.fix_print'])
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+        super(TestTranslationCache, self).tearDown()
+
+    def test_hit_and_miss(self):
+        key = self.cache.key('x = 1\n', 'mymodule.py')
+        self.assertIsNone(self.cache.get(key))
+        self.cache.put(key, compile('x = 1\n', 'mymodule.py', 'exec'))
+        code = self.cache.get(key)
+        namespace = {}
+        exec(code, namespace)
+        self.assertEqual(namespace['x'], 1)
+        self.assertEqual(code.co_filename, 'mymodule.py')
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['writes']),
+                         (1, 1, 1))
+
+    def test_key(self):
+        key = self.cache.key('x = 1\n', 'mymodule.py')
+        self.assertEqual(key, self.cache.key(u'x = 1\n', 'mymodule.py'))
+        self.assertNotEqual(key, self.cache.key('x = 2\n', 'mymodule.py'))
+        self.assertNotEqual(key, self.cache.key('x = 1\n', 'other.py'))
+        other = TranslationCache(self.cache_dir, ['lib2to3.fixes.fix_print',
+                                                  'lib2to3.fixes.fix_exec'])
+        self.assertNotEqual(key, other.key('x = 1\n', 'mymodule.py'))
+        other = TranslationCache(self.cache_dir, ['lib2to3.fixes.fix_print'],
+                                 translator='mymodule.MyFixer')
+        self.assertNotEqual(key, other.key('x = 1\n', 'mymodule.py'))
+
+    def test_subclass_has_own_entries(self):
+        class MyFixer(Py2Fixer):
+            pass
+        fixer = MyFixer()
+        fixer.set_cache(self.cache_dir)
+        self.assertNotEqual(fixer.cache.key('x = 1\n', 'mymodule.py'),
+                            Py2Fixer().cache.key('x = 1\n', 'mymodule.py'))
+
+    def test_corrupt_entry_is_a_miss(self):
+        key = self.cache.key('x = 1\n', 'mymodule.py')
+        self.cache.put(key, compile('x = 1\n', 'mymodule.py', 'exec'))
+        with open(self.cache._path(key), 'wb') as f:
+            f.write(b'garbage')
+        self.assertIsNone(self.cache.get(key))
+
+    def test_eviction(self):
+        code = compile('x = 1\n' * 100, 'mymodule.py', 'exec')
+        self.cache.put(self.cache.key('first', 'mymodule.py'), code)
+        size = self.cache._size
+        self.cache.max_size = 5 * size
+        for i in range(10):
+            self.cache.put(self.cache.key(str(i), 'mymodule.py'), code)
+        self.assertTrue(self.cache.stats()['evictions'] > 0)
+        total = sum(entry[1] for entry in self.cache._entries())
+        self.assertTrue(total <= self.cache.max_size)
+        # The most recently written entry is kept:
+        self.assertIsNotNone(self.cache.get(self.cache.key('9', 'mymodule.py')))
+
+    @unittest.skipIf(not utils.PY3, 'the import hook is only installed on Py3')
+    def test_import_uses_cache_not_pycache(self):
+        moduledir = os.path.join(self.tempdir, 'modules')
+        os.mkdir(moduledir)
+        with open(os.path.join(moduledir, 'cachedprinter.py'), 'w') as f:
+            f.write("print 'Hello'\nfinished = True\n")
+        install_hooks('cachedprinter', cache_dir=self.cache_dir)
+        sys.path.insert(0, moduledir)
+        try:
+            for _ in range(2):
+                sys.modules.pop('cachedprinter', None)
+                module = __import__('cachedprinter')
+                self.assertTrue(module.finished)
+        finally:
+            remove_hooks()
+            sys.path.remove(moduledir)
+            sys.modules.pop('cachedprinter', None)
+        stats = _hook.cache.stats()
+        self.assertEqual((stats['hits'], stats['writes']), (1, 1))
+        self.assertFalse(os.path.exists(os.path.join(moduledir, '__pycache__')))
+
  
+class TestStats(HookCacheTestCase):
+    """
+    Tests for the timings of the modules loaded by the import hook
+    (past.translation.stats()).
+    """
+    def setUp(self):
+        super(TestStats, self).setUp()
+        self.tempdir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.tempdir, 'cache')
+        with open(os.path.join(self.tempdir, 'timedmodule.py'), 'w') as f:
+            f.write("print 'Hello'\nfinished = True\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+        super(TestStats, self).tearDown()
+
+    def import_module(self):
+        install_hooks('timedmodule', cache_dir=self.cache_dir)
+        sys.path.insert(0, self.tempdir)
+        try:
+            return __import__('timedmodule')
+        finally:
+            remove_hooks()
+            sys.path.remove(self.tempdir)
+            sys.modules.pop('timedmodule', None)
+
+    def records(self):
+        return [record for record in stats()
+                if record['module'] == 'timedmodule']
+
+    @unittest.skipIf(not utils.PY3, 'the import hook is only installed on Py3')
+    def test_stats(self):
+        self.import_module()
+        self.import_module()
+        miss, hit = self.records()[-2:]
+        self.assertEqual(miss['path'],
+                         os.path.join(self.tempdir, 'timedmodule.py'))
+        self.assertEqual((miss['cache'], miss['translated']), ('miss', True))
+        self.assertEqual((hit['cache'], hit['translated']), ('hit', None))
+        for phase in ['find', 'read', 'lookup', 'parse', 'detect',
+                      'transform', 'compile', 'exec']:
+            self.assertTrue(miss[phase] > 0, phase)
+        for phase in ['parse', 'detect', 'transform', 'compile']:
+            self.assertEqual(hit[phase], 0.0, phase)
+
+    @unittest.skipIf(not utils.PY3, 'the import hook is only installed on Py3')
+    def test_print_stats(self):
+        self.import_module()
+        output = io.StringIO()
+        print_stats(output)
+        lines = output.getvalue().splitlines()
+        self.assertTrue(lines[0].startswith('past.translation [ms]'))
+        self.assertTrue(lines[-2].endswith('  timedmodule'))
+        self.assertTrue(lines[-1].startswith('total'))
+
+    def test_records_are_bounded(self):
+        from past.translation import MAX_RECORDS
+        fixer = Py2Fixer()
+        for i in range(MAX_RECORDS + 1):
+            record = fixer._new_record('module%d' % i, 'module%d.py' % i)
+            record['exec'] = 1.0
+            fixer._add_record(record)
+        self.assertEqual(len(fixer.records), MAX_RECORDS)
+        self.assertEqual(fixer.records[0]['module'], 'module1')
+        # The totals include the records that were dropped:
+        self.assertEqual(fixer.n_records, MAX_RECORDS + 1)
+        self.assertEqual(fixer.totals['exec'], MAX_RECORDS + 1.0)
+
+
+class TestConcurrentImports(HookCacheTestCase):
+    """
+    A stress test of imports through the hook from several threads at once.
+    """
+    n_modules = 40
+    n_threads = 8
+
+    def setUp(self):
+        super(TestConcurrentImports, self).setUp()
+        self.tempdir = tempfile.mkdtemp()
+        package = os.path.join(self.tempdir, 'threadedpkg')
+        os.mkdir(package)
+        with open(os.path.join(package, '__init__.py'), 'w') as f:
+            f.write('')
+        for i in range(self.n_modules):
+            with open(os.path.join(package, 'module%d.py' % i), 'w') as f:
+                f.write(textwrap.dedent("""
+                    VALUE = %dL
+
+                    def total():
+                        result = 0
+                        for i in xrange(VALUE + 1):
+                            result += i
+                        return result
+
+                    class Counter:
+                        def next(self):
+                            return VALUE
+                    """ % i))
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+        for name in list(sys.modules):
+            if name.split('.')[0] == 'threadedpkg':
+                del sys.modules[name]
+        super(TestConcurrentImports, self).tearDown()
+
+    def test_concurrent_imports(self):
+        import random
+        import threading
+        names = ['threadedpkg.module%d' % i for i in range(self.n_modules)]
+        errors = []
+        start = threading.Event()
+
+        def worker(seed):
+            order = list(names)
+            random.Random(seed).shuffle(order)
+            start.wait()
+            try:
+                for name in order:
+                    __import__(name)
+            except Exception as e:
+                errors.append(e)
+
+        install_hooks('threadedpkg', cache_dir=False)
+        sys.path.insert(0, self.tempdir)
+        try:
+            threads = [threading.Thread(target=worker, args=(seed,))
+                       for seed in range(self.n_threads)]
+            for thread in threads:
+                thread.start()
+            start.set()
+            for thread in threads:
+                thread.join()
+        finally:
+            remove_hooks()
+            sys.path.remove(self.tempdir)
+
+        self.assertEqual(errors, [])
+        for i, name in enumerate(names):
+            module = sys.modules[name]
+            self.assertEqual(module.VALUE, i)
+            self.assertEqual(module.total(), i * (i + 1) // 2)
+            self.assertEqual(next(module.Counter()), i)
+            # Each module was compiled with its own file name
+            self.assertEqual(module.total.__code__.co_filename,
+                             os.path.join(self.tempdir, 'threadedpkg',
+                                          'module%d.py' % i))
+
+
+class TestPrecompile(HookCacheTestCase):
+    """
+    Tests for the ahead-of-time translation of modules into the translation
+    cache (past.translation.precompile).
+    """
+    def setUp(self):
+        super(TestPrecompile, self).setUp()
+        self.tempdir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.tempdir, 'cache')
+        self.package = os.path.join(self.tempdir, 'py2package')
+        os.makedirs(os.path.join(self.package, '.hidden'))
+        for name, code in [('__init__.py', "print 'Hello'\n"),
+                           ('module.py', "x = 10L\n"),
+                           ('broken.py', "print 'Hello\n"),
+                           ('README.txt', "Not Python\n"),
+                           (os.path.join('.hidden', 'skipped.py'), "x = 1\n")]:
+            with open(os.path.join(self.package, name), 'w') as f:
+                f.write(code)
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+        super(TestPrecompile, self).tearDown()
+
+    def statuses(self, results):
+        return dict((os.path.basename(result.pathname), result.status)
+                    for result in results)
+
+    def test_precompile(self):
+        results = precompile([self.package], cache_dir=self.cache_dir)
+        self.assertEqual(self.statuses(results),
+                         {'__init__.py': 'translated',
+                          'module.py': 'translated',
+                          'broken.py': 'error'})
+        self.assertTrue(all(result.seconds >= 0 for result in results))
+        results = precompile([self.package], cache_dir=self.cache_dir,
+                             num_processes=2)
+        self.assertEqual(self.statuses(results),
+                         {'__init__.py': 'cached', 'module.py': 'cached',
+                          'broken.py': 'error'})
+
+    @unittest.skipIf(not utils.PY3, 'the import hook is only installed on Py3')
+    def test_import_uses_precompiled_modules(self):
+        os.remove(os.path.join(self.package, 'broken.py'))
+        precompile([self.package], cache_dir=self.cache_dir)
+        install_hooks('py2package', cache_dir=self.cache_dir)
+        sys.path.insert(0, self.tempdir)
+        try:
+            module = __import__('py2package.module', fromlist=['x'])
+            self.assertEqual(module.x, 10)
+        finally:
+            remove_hooks()
+            sys.path.remove(self.tempdir)
+            sys.modules.pop('py2package', None)
+            sys.modules.pop('py2package.module', None)
+        stats = _hook.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (2, 0))
+
+
 # class TestFuturizeSimple(CodeHandler):
 #     """
 #     This class contains snippets of Python 2 code (invalid Python 3) and